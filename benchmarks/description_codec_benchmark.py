@@ -0,0 +1,146 @@
+"""Benchmarks the description codecs: storage size and read latency.
+
+Usage: python benchmarks/description_codec_benchmark.py [companies]
+
+Runs against a throwaway data directory, the real database is not touched.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="nextjob-benchmark-")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from backend.codec import CODECS
+from backend.data_service import DataService
+from backend.datautils import get_blob_dir, get_data_file
+from backend.models import Company, Interview, InterviewType, Person, Role, TITLE
+from backend.qthtml import QT_HTML_HEAD, QT_HTML_TAIL
+from backend.schema import assemble_companies
+
+WORDS = (
+    "python backend distributed systems team experience cloud kubernetes design "
+    "product customers scale remote hybrid benefits salary interview senior engineer "
+    "data pipeline api latency ownership mentoring agile testing deployment"
+).split()
+
+PARAGRAPH = (
+    '<p style=" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; '
+    '-qt-block-indent:0; text-indent:0px;">{}</p>'
+)
+ITEM = (
+    '<li style=" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; '
+    '-qt-block-indent:0; text-indent:0px;">{}</li>'
+)
+
+
+def qt_description(paragraphs: int) -> str:
+    """Returns a Qt document shaped like a pasted job ad."""
+    parts = []
+    for _ in range(paragraphs):
+        text = " ".join(random.choices(WORDS, k=random.randint(20, 60)))
+        parts.append(PARAGRAPH.format(f'<span style=" font-weight:700;">{text[:20]}</span>{text[20:]}'))
+        items = "\n".join(ITEM.format(" ".join(random.choices(WORDS, k=8))) for _ in range(4))
+        parts.append(f'<ul style="margin-top: 0px; margin-bottom: 0px; -qt-list-indent: 1;">\n{items}</ul>')
+    return QT_HTML_HEAD + "\n".join(parts) + QT_HTML_TAIL
+
+
+def make_companies(count: int):
+    """Returns companies with roles, interviews and people which all have descriptions."""
+    random.seed(42)
+    companies = []
+    for number in range(count):
+        applied_date = date(2026, 1, 1) + timedelta(days=number % 300)
+        interviews = [
+            Interview(
+                sequence=sequence,
+                title=f"Interview {sequence}",
+                type=random.choice(list(InterviewType)),
+                date=applied_date + timedelta(days=7 * sequence),
+                description=qt_description(2),
+                interviewers=[Person(name=f"Interviewer {sequence}", title=TITLE.NA,
+                                     description=qt_description(1))],
+            )
+            for sequence in range(1, 4)
+        ]
+        role = Role(title="Software Engineer", applied_date=applied_date,
+                    description=qt_description(8), interviews=interviews)
+        recruiter = Person(name=f"Recruiter {number}", title=TITLE.MS, description=qt_description(1))
+        companies.append(Company(name=f"Company {number}", recruiters=[recruiter], roles=[role]))
+    return companies
+
+
+def directory_size(path: Path) -> int:
+    """Returns the total size of the files in the directory."""
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+def best_of(function, repeat: int = 5) -> float:
+    """Returns the best duration of the function in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations) * 1000
+
+
+def assemble_all_companies(data_service: DataService):
+    """Assembles the models of every company from the rows, as the reads do on a cold cache."""
+    return [Company(**document) for document in assemble_companies(data_service.db.storage.read())]
+
+
+def load_all_descriptions(data_service: DataService):
+    """Reads every company and loads all of its descriptions from a cold blob store, into copies
+    of the shared models."""
+    data_service.blob_store._cache.clear()  # pylint: disable=protected-access
+    for company in data_service.get_companies():
+        company = company.model_copy(deep=True)
+        company.recruiters = data_service.load_descriptions(company.recruiters)
+        company.roles = data_service.load_descriptions(company.roles)
+        for role in company.roles:
+            role.interviews = data_service.load_descriptions(role.interviews)
+            for interview in role.interviews:
+                interview.interviewers = data_service.load_descriptions(interview.interviewers)
+
+
+def main():
+    """Runs the benchmark for every codec."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    companies = make_companies(count)
+    raw_size = sum(
+        len(item.description)
+        for company in companies
+        for item in [*company.recruiters, *company.roles,
+                     *(i for r in company.roles for i in r.interviews),
+                     *(p for r in company.roles for i in r.interviews for p in i.interviewers)]
+    )
+    print(f"{count} companies, {raw_size / 1024:.0f} KiB of raw Qt HTML descriptions\n")
+    print(f"{'codec':<10} {'db.json KiB':>12} {'blobs KiB':>10} {'assemble ms':>17} {'+ descriptions ms':>18}")
+
+    for codec in CODECS:
+        data_file = get_data_file()
+        data_file.unlink(missing_ok=True)
+        data_service = DataService(codec)
+        for company in companies:
+            data_service.insert_company(company.model_copy(deep=True))
+
+        assemble_ms = best_of(lambda ds=data_service: assemble_all_companies(ds))
+        descriptions_ms = best_of(lambda ds=data_service: load_all_descriptions(ds))
+        print(
+            f"{codec:<10} {data_file.stat().st_size / 1024:>12.0f} "
+            f"{directory_size(get_blob_dir()) / 1024:>10.0f} "
+            f"{assemble_ms:>17.1f} {descriptions_ms:>18.1f}"
+        )
+        data_service.db.close()
+        data_service.blob_store.prune([])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmarks scanning nested company documents: flattening them into dictionaries, as the
+search did, compared to walking their leaves with iter_leaves.
+
+Usage: python benchmarks/flatten_benchmark.py [companies]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from backend.datautils import iter_leaves
+
+
+def recursive_flatten_dict(d, parent_key=""):
+    """Flatten a dictionary recursively, building a dictionary at each level, as flatten_dict did."""
+    items = []
+    for k, v in d.items():
+        new_key = f"{parent_key}.{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.extend(recursive_flatten_dict(v, new_key).items())
+        elif isinstance(v, list):
+            for index, item in enumerate(v):
+                if isinstance(item, dict):
+                    items.extend(recursive_flatten_dict(item, f"{new_key}[{index}]").items())
+                else:
+                    items.append((f"{new_key}[{index}]", str(item)))
+        else:
+            items.append((new_key, str(v)))
+    return dict(items)
+
+
+def make_person(number: int) -> dict:
+    """Returns a person document."""
+    return {"uuid": f"person-{number}", "name": f"Person {number}", "email": f"p{number}@example.com",
+            "linkedin": None, "description_ref": None}
+
+
+def make_companies(count: int):
+    """Returns company documents with roles, interviews and people."""
+    random.seed(42)
+    return [
+        {
+            "uuid": f"company-{number}",
+            "name": f"Company {number}",
+            "website": f"https://company{number}.example.com",
+            "recruiters": [make_person(random.randrange(1000)) for _ in range(2)],
+            "roles": [
+                {
+                    "uuid": f"role-{number}-{role}",
+                    "title": f"Engineer {role}",
+                    "applied_date": "2026-01-01",
+                    "description_ref": None,
+                    "interviews": [
+                        {"uuid": f"interview-{number}-{role}-{interview}", "title": "Technical",
+                         "interviewers": [make_person(random.randrange(1000)) for _ in range(2)]}
+                        for interview in range(3)
+                    ],
+                }
+                for role in range(3)
+            ],
+        }
+        for number in range(count)
+    ]
+
+
+def measure(name: str, scan, documents):
+    """Prints the time and the peak of allocated memory of a scan of the documents, the memory
+    is traced in a second scan as tracing slows it down."""
+    start = time.perf_counter()
+    found = sum(1 for doc in documents if scan(doc))
+    duration_ms = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    sum(1 for doc in documents if scan(doc))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<28} {duration_ms:8.1f} ms  peak {peak / 1024:8.1f} KiB  found {found}")
+
+
+def main():
+    """Runs the benchmark, for a term found early in each document and one found nowhere."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    documents = make_companies(count)
+    for term in ("company", "nowhere"):
+        print(f"{count} companies, term {term!r}")
+        measure("recursive flatten_dict", lambda doc, term=term: any(
+            term in value.lower() for value in recursive_flatten_dict(doc).values()), documents)
+        measure("iter_leaves with keys", lambda doc, term=term: any(
+            term in value.lower() for _, value in iter_leaves(doc)), documents)
+        measure("iter_leaves", lambda doc, term=term: any(
+            term in value.lower() for value in iter_leaves(doc, keys=False)), documents)
+        print()
+
+
+if __name__ == "__main__":
+    main()
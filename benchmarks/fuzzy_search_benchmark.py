@@ -0,0 +1,62 @@
+"""Benchmarks the fuzzy word lookup: dictionary build time and lookup latency.
+
+Usage: python benchmarks/fuzzy_search_benchmark.py [words]
+"""
+
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from backend.fuzzyindex import SymmetricDeleteIndex, edit_distance, get_max_distance
+
+
+def make_words(count: int):
+    """Returns distinct random words of 4 to 12 letters."""
+    random.seed(42)
+    words = set()
+    while len(words) < count:
+        words.add("".join(random.choices(string.ascii_lowercase, k=random.randint(4, 12))))
+    return sorted(words)
+
+
+def misspell(word: str) -> str:
+    """Returns the word with one letter changed."""
+    position = random.randrange(len(word))
+    return word[:position] + random.choice(string.ascii_lowercase) + word[position + 1:]
+
+
+def main():
+    """Runs the benchmark, comparing the lookups to a linear scan of the dictionary."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    words = make_words(count)
+    queries = [misspell(word) for word in random.sample(words, 200)]
+
+    start = time.perf_counter()
+    dictionary = SymmetricDeleteIndex(words)
+    build_s = time.perf_counter() - start
+    print(f"{count} words, dictionary of {len(dictionary.deletes)} deletes built in {build_s:.1f} s\n")
+
+    durations = []
+    for query in queries:
+        start = time.perf_counter()
+        dictionary.lookup(query)
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    print(f"{'lookup':<12} median {durations[len(durations) // 2]:.2f} ms, max {durations[-1]:.2f} ms")
+
+    start = time.perf_counter()
+    for query in queries[:5]:
+        max_distance = get_max_distance(query)
+        for word in words:
+            edit_distance(query, word, max_distance)
+    scan_ms = (time.perf_counter() - start) / 5 * 1000
+    print(f"{'linear scan':<12} {scan_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Set
+
+from backend.changes import Subscriber
+from backend.companysearch import CompanySearch
+from backend.data_service import DataService
+
+# Number of threads running the storage work of the coroutines.
+MAX_WORKERS = 4
+
+
+def _read_method(name: str):
+    @functools.wraps(getattr(DataService, name))
+    async def read(self, *args, **kwargs):
+        return await self.read(getattr(self.data_service, name), *args, **kwargs)
+
+    return read
+
+
+def _search_method(name: str):
+    @functools.wraps(getattr(CompanySearch, name))
+    async def read(self, *args, **kwargs):
+        return await self.read(getattr(self.data_service.searcher, name), *args, **kwargs)
+
+    return read
+
+
+def _write_method(name: str):
+    @functools.wraps(getattr(DataService, name))
+    async def write(self, *args, **kwargs):
+        return await self.write(getattr(self.data_service, name), *args, **kwargs)
+
+    return write
+
+
+class AsyncDataService:
+    """Coroutines of the methods of a DataService and of its searcher, running the storage work
+    in a bounded thread pool.
+
+    Operations are ordered as they are called: reads run concurrently with each other, a
+    write waits for the operations called before it and the operations called after it wait
+    for the write, so reads see every write called before them. A failed write does not
+    stop the operations after it. Any asyncio event loop can run the coroutines, including
+    the QtAsyncio loop of the GUI.
+    """
+
+    def __init__(self, data_service: Optional[DataService] = None, max_workers: int = MAX_WORKERS):
+        self.data_service = data_service or DataService()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="data-service")
+        self._reads: Set[asyncio.Future] = set()
+        self._last_write: Optional[asyncio.Future] = None
+
+    async def read(self, function: Callable, *args, **kwargs) -> Any:
+        """Run a function which only reads the data, concurrently with the other reads."""
+        after = [self._last_write] if self._last_write else []
+        task = asyncio.ensure_future(self._run(after, function, args, kwargs))
+        self._reads.add(task)
+        task.add_done_callback(self._reads.discard)
+        return await asyncio.shield(task)
+
+    async def write(self, function: Callable, *args, **kwargs) -> Any:
+        """Run a function which writes the data, after the operations called before."""
+        after = list(self._reads) + ([self._last_write] if self._last_write else [])
+        task = asyncio.ensure_future(self._run(after, function, args, kwargs))
+        self._reads = set()
+        self._last_write = task
+        return await asyncio.shield(task)
+
+    async def transaction(self, function: Callable[[DataService], Any]) -> Any:
+        """Run a function calling the methods of the data service in a transaction, as one write."""
+
+        def run_transaction():
+            with self.data_service.transaction():
+                return function(self.data_service)
+
+        return await self.write(run_transaction)
+
+    async def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """Subscribe to the change events as DataService.subscribe does, the subscriber is
+        called in the event loop."""
+        loop = asyncio.get_running_loop()
+        return self.data_service.subscribe(lambda events: loop.call_soon_threadsafe(subscriber, events))
+
+    async def close(self):
+        """Wait for the operations called before, close the data service and stop the threads."""
+        try:
+            await self.write(self.data_service.close)
+        finally:
+            self._executor.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _run(self, after: List[asyncio.Future], function: Callable, args, kwargs) -> Any:
+        if after:
+            await asyncio.wait(after)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(function, *args, **kwargs)
+        )
+
+    get_companies = _read_method("get_companies")
+    get_company_by_uuid = _read_method("get_company_by_uuid")
+    get_company_by_interview_uuid = _read_method("get_company_by_interview_uuid")
+    get_company_by_role_uuid = _read_method("get_company_by_role_uuid")
+    load_descriptions = _read_method("load_descriptions")
+    find_roles = _read_method("find_roles")
+    find_interviews = _read_method("find_interviews")
+    find_companies = _read_method("find_companies")
+    search = _search_method("search")
+    search_in_db = _search_method("search_in_db")
+    prepare_fuzzy_search = _search_method("prepare_fuzzy_search")
+
+    insert_company = _write_method("insert_company")
+    update_company = _write_method("update_company")
+    delete_company = _write_method("delete_company")
+    insert_companies = _write_method("insert_companies")
+    update_companies = _write_method("update_companies")
+    delete_companies = _write_method("delete_companies")
+    add_role = _write_method("add_role")
+    update_role = _write_method("update_role")
+    add_interview = _write_method("add_interview")
+    update_interview = _write_method("update_interview")
+    add_person = _write_method("add_person")
+    update_person = _write_method("update_person")
+    delete_role = _write_method("delete_role")
+    delete_interview = _write_method("delete_interview")
+    delete_interviewer = _write_method("delete_interviewer")
+    delete_recruiter = _write_method("delete_recruiter")
+    prune_descriptions = _write_method("prune_descriptions")
+    reload_external_changes = _write_method("reload_external_changes")
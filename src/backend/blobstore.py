@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from backend.codec import DEFAULT_CODEC, decode, get_codec
+
+BLOB_CACHE_SIZE = 256
+
+
+class BlobStore:
+    """Content-addressed store of compressed text blobs, one file per blob.
+
+    Texts are decompressed only when they are read, and the recently read ones are cached.
+    The store can be used from many threads.
+    """
+
+    def __init__(
+        self,
+        blob_dir: Path,
+        codec: str = DEFAULT_CODEC,
+        cache_size: int = BLOB_CACHE_SIZE,
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.blob_dir = Path(blob_dir)
+        self.codec = get_codec(codec)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def put(self, text: str) -> str:
+        """Stores the text, unless it is already stored, and returns its key.
+
+        The modification time of a blob which is already stored is renewed, as prune keeps
+        the recently written blobs.
+        """
+        data = text.encode("utf-8")
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as blob_file:
+                blob_file.write(self.codec.encode(data))
+            os.replace(blob_file.name, path)
+        else:
+            path.touch()
+        self._remember(key, text)
+        return key
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the text stored under the key, or None when there is no such blob."""
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        try:
+            text = decode(self._path(key).read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            self.logger.error("Description blob not found: %s", key)
+            return None
+        self._remember(key, text)
+        return text
+
+    def prune(self, keep_keys: Iterable[str], min_age: float = 0) -> int:
+        """Removes all blobs except the given ones and the ones written in the last min_age
+        seconds, and returns the number of removed blobs."""
+        keep_keys = set(keep_keys)
+        written_before = time.time() - min_age
+        removed = 0
+        for path in self.blob_dir.glob("*/*"):
+            key = path.parent.name + path.name
+            if key not in keep_keys and path.stat().st_mtime <= written_before:
+                path.unlink()
+                with self._cache_lock:
+                    self._cache.pop(key, None)
+                removed += 1
+        return removed
+
+    def _path(self, key: str) -> Path:
+        return self.blob_dir / key[:2] / key[2:]
+
+    def _remember(self, key: str, text: str):
+        with self._cache_lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
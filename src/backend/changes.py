@@ -0,0 +1,120 @@
+import logging
+import threading
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from backend.schema import COMPANIES_TABLE
+
+
+class ChangeType(Enum):
+    """Enum to represent the type of change of a row."""
+
+    INSERTED = "inserted"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+class ChangeEvent(NamedTuple):
+    """Change of a company, role, interview or person row, with the uuid of its company and the
+    version of the company after the write, None when it was deleted."""
+
+    change_type: ChangeType
+    table: str
+    uuid: str
+    company_uuid: str
+    company_version: Optional[int] = None
+
+    @property
+    def is_company(self) -> bool:
+        """Returns whether the changed row is a company."""
+        return self.table == COMPANIES_TABLE
+
+
+# Subscriber to the changes, called with the events of each write.
+Subscriber = Callable[[List[ChangeEvent]], None]
+
+
+def get_company_uuids(events: Iterable[ChangeEvent]) -> List[str]:
+    """Returns the uuids of the companies changed by the events, in their order."""
+    return list(dict.fromkeys(event.company_uuid for event in events))
+
+
+def get_deleted_company_uuids(events: Iterable[ChangeEvent]) -> Set[str]:
+    """Returns the uuids of the companies deleted by the events, and not inserted again after."""
+    deleted = set()
+    for event in events:
+        if event.is_company and event.change_type == ChangeType.DELETED:
+            deleted.add(event.uuid)
+        elif event.is_company and event.change_type == ChangeType.INSERTED:
+            deleted.discard(event.uuid)
+    return deleted
+
+
+def set_company_versions(events: Iterable[ChangeEvent], versions: Dict[str, int]) -> List[ChangeEvent]:
+    """Returns the events with the versions of their companies, None for the missing ones."""
+    return [event._replace(company_version=versions.get(event.company_uuid)) for event in events]
+
+
+def get_company_changes(before: dict, after: dict, company_uuids: Iterable[str]) -> List[ChangeEvent]:
+    """Returns the events of the companies with the uuids, changed from the raw data before to
+    the raw data after."""
+    before_uuids = {row["uuid"] for row in before.get(COMPANIES_TABLE, {}).values()}
+    versions = {row["uuid"]: row.get("version", 0) for row in after.get(COMPANIES_TABLE, {}).values()}
+    events = []
+    for uuid in company_uuids:
+        if uuid not in before_uuids:
+            change_type = ChangeType.INSERTED
+        elif uuid not in versions:
+            change_type = ChangeType.DELETED
+        else:
+            change_type = ChangeType.UPDATED
+        events.append(ChangeEvent(change_type, COMPANIES_TABLE, uuid, uuid))
+    return set_company_versions(events, versions)
+
+
+class ChangeFeed:
+    """Subscribers to the changes, called in the order they subscribed with the events of each
+    write.
+
+    The events of a write are recorded while it runs and taken to be published once it is
+    written. A subscriber which raises is logged, the other subscribers are called anyway.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.pending: List[ChangeEvent] = []
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+
+    def record(self, event: ChangeEvent):
+        """Records an event of the running write."""
+        self.pending.append(event)
+
+    def take(self) -> List[ChangeEvent]:
+        """Returns the recorded events and forgets them."""
+        events, self.pending = self.pending, []
+        return events
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """Adds a subscriber, returning the function which removes it."""
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+        def unsubscribe():
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+        return unsubscribe
+
+    def publish(self, events: List[ChangeEvent]):
+        """Calls the subscribers with the events, when there are any."""
+        if not events:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber(events)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                self.logger.error("Publishing the changes failed: %s", error)
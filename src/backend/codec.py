@@ -0,0 +1,121 @@
+import lzma
+import zlib
+from typing import Dict
+
+from backend.qthtml import QT_HTML_HEAD, QT_HTML_TAIL
+
+# Markup that Qt writes in nearly every description, most frequent last as zlib prefers
+# near matches. Changing it makes blobs written with the "zlib-dict" codec unreadable,
+# add a new codec with a new tag instead.
+QT_HTML_DICTIONARY = (
+    QT_HTML_HEAD
+    + QT_HTML_TAIL
+    + '<table border="1" style="margin-top:0px;margin-bottom:0px" cellspacing="2" cellpadding="0">\n'
+    + "<tr>\n<td>\n"
+    + '<pre style="margin-top:0px;margin-bottom:0px"><span style="font-family:\'monospace\'">'
+    + '<h3 style="margin-top:14px;margin-bottom:12px"><span style="font-size:large;font-weight:700">'
+    + '<h2 style="margin-top:16px;margin-bottom:12px"><span style="font-size:x-large;font-weight:700">'
+    + '<h1 style="margin-top:18px;margin-bottom:12px"><span style="font-size:xx-large;font-weight:700">'
+    + '<a href="https://www.'
+    + '<span style="text-decoration:underline;color:#0000ff">'
+    + '<ol style="margin-top:0px;margin-bottom:0px;-qt-list-indent:1">\n'
+    + '<ul style="margin-top:0px;margin-bottom:0px;-qt-list-indent:1">\n'
+    + '<li style="margin-top:0px;margin-bottom:0px">'
+    + '<li style="margin-top:12px;margin-bottom:0px">'
+    + '<li style="margin-top:0px;margin-bottom:12px">'
+    + '<p style="-qt-paragraph-type:empty;margin-top:0px;margin-bottom:0px"><br /></p>\n'
+    + '<span style="font-style:italic">'
+    + '<span style="font-weight:700">'
+    + '</span></p>\n<p style="margin-top:12px;margin-bottom:12px">'
+    + '</span></li>\n<li style="margin-top:0px;margin-bottom:0px">'
+    + '</p>\n<p style="margin-top:0px;margin-bottom:0px">'
+).encode("utf-8")
+
+
+class Codec:
+    """Compresses and decompresses description blobs.
+
+    Every encoded blob starts with the one byte tag of its codec, so blobs written with
+    different codecs can be read side by side after the codec setting changes.
+    """
+
+    name = "none"
+    tag = 0
+
+    def compress(self, data: bytes) -> bytes:
+        """Returns the compressed data."""
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        """Returns the decompressed data."""
+        return data
+
+    def encode(self, data: bytes) -> bytes:
+        """Returns the compressed data prefixed by the codec tag."""
+        return bytes([self.tag]) + self.compress(data)
+
+
+class ZlibCodec(Codec):
+    """zlib codec."""
+
+    name = "zlib"
+    tag = 1
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, 9)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZlibDictionaryCodec(Codec):
+    """zlib codec with a preset dictionary of the markup Qt writes."""
+
+    name = "zlib-dict"
+    tag = 2
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(9, zdict=QT_HTML_DICTIONARY)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = zlib.decompressobj(zdict=QT_HTML_DICTIONARY)
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+class LzmaCodec(Codec):
+    """lzma codec, using the raw format to save the container headers."""
+
+    name = "lzma"
+    tag = 3
+    filters = [{"id": lzma.FILTER_LZMA2, "preset": 9}]
+
+    def compress(self, data: bytes) -> bytes:
+        return lzma.compress(data, format=lzma.FORMAT_RAW, filters=self.filters)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lzma.decompress(data, format=lzma.FORMAT_RAW, filters=self.filters)
+
+
+CODECS: Dict[str, Codec] = {
+    codec.name: codec
+    for codec in [Codec(), ZlibCodec(), ZlibDictionaryCodec(), LzmaCodec()]
+}
+CODECS_BY_TAG: Dict[int, Codec] = {codec.tag: codec for codec in CODECS.values()}
+
+DEFAULT_CODEC = ZlibDictionaryCodec.name
+
+
+def get_codec(name: str) -> Codec:
+    """Returns the codec with the given name."""
+    if name not in CODECS:
+        raise ValueError(f"Unknown description codec: {name}")
+    return CODECS[name]
+
+
+def decode(blob: bytes) -> bytes:
+    """Returns the decompressed data of a blob written by any codec."""
+    if blob and blob[0] in CODECS_BY_TAG:
+        return CODECS_BY_TAG[blob[0]].decompress(blob[1:])
+    # Untagged blobs are plain zlib streams, written before codecs were selectable.
+    return zlib.decompress(blob)
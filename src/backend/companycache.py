@@ -0,0 +1,79 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.datautils import sort_companies_by_applied_date
+from backend.models import Company
+from backend.schema import COMPANIES_TABLE, TABLES, table_rows
+
+
+def get_tables(data: dict) -> Tuple[Optional[dict], ...]:
+    """Returns the tables of the raw database data."""
+    return tuple(data.get(table) for table in TABLES)
+
+
+class CompanyCache:
+    """Company models assembled from the raw database data, shared by the reads of the data.
+
+    The models are kept for the tables they were assembled from. Every write replaces the
+    tables it changes, so when the tables are not the same only the models of the companies
+    with the same version are kept, and a transaction keeps the models of the companies it
+    did not change for the tables it commits.
+
+    assemble returns the nested documents of the companies with the uuids of the data.
+    """
+
+    def __init__(self, assemble: Callable[[dict, List[str]], List[dict]]):
+        self._assemble = assemble
+        self._tables: Tuple[Optional[dict], ...] = ()
+        self._models: Dict[str, Company] = {}
+        self._companies: Optional[Tuple[Company, ...]] = None
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def is_current(self, data: dict) -> bool:
+        """Returns whether the models were assembled from the tables of the data."""
+        tables = get_tables(data)
+        return len(tables) == len(self._tables) and all(
+            table is cached_table for table, cached_table in zip(tables, self._tables)
+        )
+
+    def get_companies(self, data: dict) -> Tuple[Company, ...]:
+        """Returns the models of all the companies, sorted by applied date."""
+        self._check(data)
+        if self._companies is None:
+            company_uuids = [row["uuid"] for _, row in table_rows(data, COMPANIES_TABLE)]
+            self._companies = tuple(sort_companies_by_applied_date(self.get(data, company_uuids)))
+        return self._companies
+
+    def get(self, data: dict, company_uuids: Iterable[str]) -> List[Company]:
+        """Returns the models of the companies with the uuids, in their order, the uuids of no
+        company are skipped."""
+        self._check(data)
+        company_uuids = list(dict.fromkeys(company_uuids))
+        missing = [uuid for uuid in company_uuids if uuid not in self._models]
+        if missing:
+            for document in self._assemble(data, missing):
+                self._models[document["uuid"]] = Company(**document)
+        return [self._models[uuid] for uuid in company_uuids if uuid in self._models]
+
+    def drop(self, company_uuid: str):
+        """Drops the model of a company changed by a transaction."""
+        self._models.pop(company_uuid, None)
+        self._companies = None
+
+    def commit(self, before: dict, after: dict):
+        """Keeps the models of the companies which were not dropped for the data committed by a
+        transaction, when they were current for the data before it."""
+        if self.is_current(before):
+            self._tables = get_tables(after)
+
+    def _check(self, data: dict):
+        if not self.is_current(data):
+            self._tables = get_tables(data)
+            versions = {
+                row["uuid"]: row.get("version", 0) for row in data.get(COMPANIES_TABLE, {}).values()
+            }
+            self._models = {
+                uuid: model for uuid, model in self._models.items() if versions.get(uuid) == model.version
+            }
+            self._companies = None
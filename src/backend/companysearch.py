@@ -0,0 +1,242 @@
+import threading
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from backend.datautils import iter_leaves, iter_subdocuments, sort_companies_by_applied_date
+from backend.fieldindex import Criterion
+from backend.fuzzyindex import SymmetricDeleteIndex
+from backend.htmlextractor import get_html_text, get_html_texts
+from backend.models import Company
+from backend.query import QueryPlan, get_criterion_field, get_field, parse_query
+from backend.schema import COMPANIES_TABLE, FOREIGN_KEYS
+from backend.searchresult import SearchMatch, SearchResult, find_match, get_snippet
+from backend.textindex import TextIndex, get_company_fields, tokenize
+
+UNSEARCHED_FIELDS = ("version", "uuid", *FOREIGN_KEYS)
+
+
+class CompanySearch:
+    """Search of the companies by a query, with the fields which matched and a snippet of each.
+
+    The values of the companies are scanned, and their descriptions are matched by the plain
+    text the snippets are cut from, not by their HTML. The words of the companies are kept in
+    a text index, to rank them by relevance and to find the words similar to the searched
+    ones. The companies marked as stale, or with another version than the indexed one, are
+    indexed again by the next search which uses the index.
+
+    read holds the data for reading in its block and returns it, find_companies returns the
+    uuids of the companies with a role meeting the criteria, assemble returns the nested
+    documents of the companies with the uuids, or of all of them, get_companies returns their
+    models, and get_description returns the HTML of a description by its blob reference.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[], ContextManager[dict]],
+        find_companies: Callable[[dict, Iterable[Criterion]], List[str]],
+        assemble: Callable[[dict, Optional[Iterable[str]]], List[dict]],
+        get_companies: Callable[[dict, Iterable[str]], List[Company]],
+        get_description: Callable[[str], Optional[str]],
+    ):
+        self._read = read
+        self._find_companies = find_companies
+        self._assemble = assemble
+        self._get_companies = get_companies
+        self._get_description = get_description
+        self.text_index: Optional[TextIndex] = None
+        self._stale_companies: Set[str] = set()
+        # The versions of the companies in the text index.
+        self._indexed_versions: Dict[str, int] = {}
+        # The plain texts of the descriptions by their blob reference, which never changes its text.
+        self._description_texts: Dict[str, str] = {}
+        # Guards the lazy building of the text index by concurrent readers.
+        self._lock = threading.RLock()
+
+    def search(
+        self, search_string, ranked: bool = False, fuzzy: bool = False
+    ) -> List[SearchResult]:
+        """Search in db with a query, as parsed by parse_query, with the fields which matched.
+
+        The companies are ordered by applied date, or by relevance to the searched text when
+        ranked. When fuzzy, the words of the text also match indexed words within a small edit
+        distance. Raises QueryError when a value of the query is not valid.
+        """
+        plan = parse_query(search_string)
+        with self._read() as data:
+            company_uuids = self._find_companies(data, plan.criteria) if plan.criteria else None
+            similar_words = self._get_similar_words(plan, data) if fuzzy else {}
+            documents = self._scan(plan, self._assemble(data, company_uuids), similar_words)
+            companies = sort_companies_by_applied_date(self._get_companies(data, documents))
+            all_similar_words = {
+                word for words_of_term in similar_words.values() for words in words_of_term for word in words
+            }
+            if ranked and plan.search_terms:
+                companies_by_uuid = {company.uuid: company for company in companies}
+                ranking = self._get_text_index(data).rank(
+                    companies_by_uuid, tokenize(" ".join(plan.search_terms)) + list(all_similar_words)
+                )
+                companies = [companies_by_uuid[uuid] for uuid in ranking]
+            return [
+                SearchResult(company, self._get_matches(plan, documents[company.uuid], all_similar_words))
+                for company in companies
+            ]
+
+    def search_in_db(self, search_string, ranked: bool = False, fuzzy: bool = False) -> List[Company]:
+        """Search in db with a query, as search does, returning the companies only."""
+        return [result.company for result in self.search(search_string, ranked, fuzzy)]
+
+    def prepare_fuzzy_search(self):
+        """Builds the dictionary of the similar words of the indexed words, which a fuzzy search
+        would build first, to be run in a background thread.
+
+        The dictionary is built without holding the locks, of the words indexed when it started,
+        and then catches up with the words indexed and removed since.
+        """
+        with self._read() as data:
+            with self._lock:
+                text_index = self._get_text_index(data)
+                if text_index.dictionary is not None:
+                    return
+                words = set(text_index.postings)
+        dictionary = SymmetricDeleteIndex(words)
+        with self._lock:
+            if text_index.dictionary is None:
+                text_index.set_dictionary(dictionary, words)
+
+    def mark_stale(self, company_uuids: Iterable[str]):
+        """Marks the companies written since the text index was built, to be indexed again."""
+        with self._lock:
+            if self.text_index is not None:
+                self._stale_companies.update(company_uuids)
+
+    def reset(self):
+        """Drops the text index, which is built again by the next search which uses it."""
+        with self._lock:
+            self.text_index = None
+            self._stale_companies.clear()
+            self._indexed_versions = {}
+
+    def _scan(
+        self, plan: QueryPlan, documents: List[dict], similar_words: Dict[str, List[Set[str]]]
+    ) -> Dict[str, dict]:
+        """Returns the documents which meet the filters and contain the terms of the plan, by uuid.
+
+        The leaves of each document are walked lazily, a term stops the walk at its first match.
+        """
+        found = {}
+        for doc in documents:
+            if all(scan_filter.matches(iter_leaves(doc)) for scan_filter in plan.filters) and all(
+                self._matches_term(doc, term, similar_words.get(term)) for term in plan.terms
+            ):
+                found[doc["uuid"]] = doc
+        return found
+
+    def _get_similar_words(self, plan: QueryPlan, data: dict) -> Dict[str, List[Set[str]]]:
+        """Returns the similar indexed words of each word of each plain text term."""
+        if not plan.terms:
+            return {}
+        with self._lock:
+            text_index = self._get_text_index(data)
+            return {
+                term: [text_index.similar_words(word) for word in tokenize(term)]
+                for term in plan.terms
+            }
+
+    def _matches_term(
+        self, doc: dict, term: str, similar_words: Optional[List[Set[str]]]
+    ) -> bool:
+        """Returns whether a value of the company contains the term, or, when the similar
+        words of each of its words are given, whether the company has one of them."""
+        term = term.lower()
+        if any(term in value.lower() for value in self._search_values(doc)):
+            return True
+        if not similar_words:
+            return False
+        company_words = self.text_index.words.get(doc["uuid"], set())
+        return all(company_words & similar for similar in similar_words)
+
+    def _get_matches(
+        self, plan: QueryPlan, doc: dict, similar_words: Set[str]
+    ) -> Tuple[SearchMatch, ...]:
+        """Returns the fields of a company which met the criteria, or contain a filtered value,
+        a searched term or a similar word, with a snippet of each."""
+        criteria = {}
+        for criterion in plan.criteria:
+            criteria.setdefault(get_criterion_field(criterion), []).append(criterion)
+        matches = []
+        for key, value in iter_leaves(doc):
+            field = get_field(key)
+            if field in criteria:
+                if all(criterion.matches({criterion.field: value}) for criterion in criteria[field]):
+                    matches.append(SearchMatch(key, value))
+                continue
+            phrases = [f.value for f in plan.filters if f.field == field] + list(plan.terms)
+            if not phrases or field.rsplit(".", 1)[-1] in UNSEARCHED_FIELDS:
+                continue
+            text = self._get_description_text(value) if key.endswith("description_ref") else value
+            span = find_match(text, phrases, similar_words)
+            if span:
+                matches.append(SearchMatch(key, get_snippet(text, *span)))
+        return tuple(matches)
+
+    def _search_values(self, doc: dict) -> Iterator[str]:
+        """Yields the values of a company, then the plain texts of its descriptions, which are
+        only extracted when no value matched before. The unsearched fields are skipped."""
+        yield from iter_leaves(doc, keys=False, exclude=("description_ref", *UNSEARCHED_FIELDS))
+        for subdocument in iter_subdocuments(doc):
+            if subdocument.get("description_ref"):
+                yield self._get_description_text(subdocument["description_ref"])
+
+    def _get_description_text(self, description_ref: str) -> str:
+        """Returns the plain text of a description, extracted from its HTML on the first use."""
+        text = self._description_texts.get(description_ref)
+        if text is None:
+            text = get_html_text(self._get_description(description_ref))
+            self._description_texts[description_ref] = text
+        return text
+
+    def _get_text_index(self, data: dict) -> TextIndex:
+        """Returns the text index, after reindexing the companies changed since it was used.
+
+        The companies with another version than the indexed one were changed by another
+        writer, they are reindexed too.
+        """
+        with self._lock:
+            versions = {
+                row["uuid"]: row.get("version", 0) for row in data.get(COMPANIES_TABLE, {}).values()
+            }
+            if self.text_index is None:
+                self.text_index = TextIndex()
+                self._index_companies(self._assemble(data, None))
+            else:
+                changed = self._stale_companies | {
+                    uuid
+                    for uuid in versions.keys() | self._indexed_versions.keys()
+                    if versions.get(uuid) != self._indexed_versions.get(uuid)
+                }
+                if changed:
+                    for uuid in changed:
+                        self.text_index.remove(uuid)
+                    self._index_companies(self._assemble(data, changed & versions.keys()))
+            self._stale_companies.clear()
+            self._indexed_versions = versions
+            return self.text_index
+
+    def _index_companies(self, documents: List[dict]):
+        # The texts are extracted in this process: the index is built on the thread of the
+        # caller, under the locks, where starting a process pool would block it for longer.
+        description_refs = [
+            subdocument["description_ref"]
+            for document in documents
+            for subdocument in iter_subdocuments(document)
+            if subdocument.get("description_ref") and subdocument["description_ref"] not in self._description_texts
+        ]
+        self._description_texts.update(
+            zip(
+                description_refs,
+                get_html_texts((self._get_description(ref) for ref in description_refs), max_workers=1),
+            )
+        )
+        for document in documents:
+            self.text_index.add(
+                document["uuid"], get_company_fields(document, self._description_texts.get)
+            )
@@ -1,124 +1,806 @@
+import copy
+import functools
+import itertools
 import json
 import logging
-from typing import List
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
-from tinydb import TinyDB, Query
+from pydantic import BaseModel
+from tinydb import TinyDB
+from tinydb.storages import JSONStorage
+from tinydb.table import Document, Table
 
+from backend.blobstore import BlobStore
+from backend.changes import (
+    ChangeEvent,
+    ChangeFeed,
+    ChangeType,
+    Subscriber,
+    get_company_changes,
+    get_company_uuids,
+    get_deleted_company_uuids,
+    set_company_versions,
+)
+from backend.codec import DEFAULT_CODEC
+from backend.companycache import CompanyCache
+from backend.companysearch import CompanySearch
 from backend.datautils import (
-    flatten_dict,
+    apply_changes,
+    diff_documents,
+    get_blob_dir,
     get_data_file,
+    iter_subdocuments,
     sort_companies_by_applied_date,
 )
-from backend.models import Company
+from backend.fieldindex import Criterion, FieldIndexes
+from backend.history import Operation, OperationLog
+from backend.models import Company, Interview, Person, Role
+from backend.qthtml import canonicalize_html
+from backend.rwlock import ReadWriteLock
+from backend.schema import (
+    CHILDREN,
+    COMPANIES_TABLE,
+    FOREIGN_KEYS,
+    INTERVIEWS_TABLE,
+    PERSONS_TABLE,
+    ROLES_TABLE,
+    TABLES,
+    ChildRows,
+    assemble_companies,
+    assemble_document,
+    get_changed_companies,
+    get_parent_uuid,
+    iter_descendants,
+    split_document,
+    table_rows,
+)
+from backend.storage import CopyOnWriteTable, TransactionStorage, WriteBehindMiddleware
+from backend.uuidindex import IndexedChildRows, RowLocation, UuidIndex
+
+# Models of the rows of each table, used to validate the rows written by a transaction.
+ROW_MODELS = {
+    COMPANIES_TABLE: Company,
+    ROLES_TABLE: Role,
+    INTERVIEWS_TABLE: Interview,
+    PERSONS_TABLE: Person,
+}
+
+# Seconds for which a description blob is kept after it was written, even when no row refers
+# to it, as the rows of another process referring to it may not be written yet.
+PRUNE_MIN_AGE = 24 * 60 * 60
+
+
+class StaleCompanyError(ValueError):
+    """Error of a write of a company which was changed since it was read."""
+
+
+def _reading(method):
+    """Decorate a method of DataService to hold its lock for reading."""
+
+    @functools.wraps(method)
+    def read(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+
+    return read
 
 
 class DataService:
-    """Class for data service."""
+    """Class for data service.
 
-    def __init__(self):
-        self.logger = logging.getLogger(self.__class__.__name__)
+    Companies, roles, interviews and persons are stored as rows of separate tables, the
+    rows of roles, interviews and persons refer to their parent by a foreign key. Company
+    models are reassembled from the rows when they are requested.
 
-        self.db = TinyDB(get_data_file())
-        self.companies_table = self.db.table("companies", cache_size=0)
+    The service can be used from many threads. Readers share a read-write lock, which
+    transactions hold alone, one at a time. A transaction changes a copy of the data, which
+    shares the tables and rows it does not change, and its commit swaps the copy in, so the
+    data a reader got is never changed in place.
 
-    def get_companies(self) -> List[Company]:
-        """Get all companies."""
-        return sort_companies_by_applied_date(
-            [Company(**document) for document in self.companies_table.all()]
+    The company models returned by the reads are shared by all of them, until a transaction
+    changes their company. They must not be changed, a copy made with model_copy(deep=True)
+    can be changed and written.
+
+    Every transaction increases the version of the companies it changes, a company read at
+    an older version is not written over the newer one. Other writers must increase the
+    versions too, the models and the indexed words of the companies with the same version
+    are kept.
+
+    The history keeps the rows changed by each transaction, to undo and redo it, and the
+    searcher searches the companies by a query.
+    """
+
+    def __init__(
+        self,
+        description_codec: str = DEFAULT_CODEC,
+        on_write_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.db = TinyDB(get_data_file(), storage=WriteBehindMiddleware(JSONStorage, on_write_error))
+        self.blob_store = BlobStore(get_blob_dir(), description_codec)
+        self.tables = {}
+        self._open_tables(self.db.storage)
+        self._uuid_index: Optional[UuidIndex] = None
+        self._field_indexes: Optional[FieldIndexes] = None
+        # The changes of the transaction are published to the subscribers by its commit, which
+        # increases the versions of their companies and keeps them to be undone.
+        self._changes = ChangeFeed()
+        self._company_cache = CompanyCache(self._assemble_companies)
+        self.searcher = CompanySearch(
+            self._reading_data,
+            self._find_company_uuids,
+            self._assemble_companies,
+            self._get_company_models,
+            self.blob_store.get,
+        )
+        self.lock = ReadWriteLock()
+        self.history = OperationLog(
+            self._apply_operation, self.lock.write, reload=self.reload_external_changes
         )
+        # Guards the lazy building of the indexes by concurrent readers.
+        self._index_lock = threading.RLock()
+        self._transaction: Optional[TransactionStorage] = None
+        self._migrate_nested_companies()
+
+    def close(self):
+        """Write the pending changes, remove the description blobs no row refers to and close
+        the database."""
+        try:
+            self.prune_descriptions()
+        finally:
+            self.db.close()
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """Call the subscriber with the change events of each write, returning the function
+        which unsubscribes it.
+
+        The subscriber is called in the writing thread, after the write and before the next
+        one, it can read the data service but not write to it.
+        """
+        return self._changes.subscribe(subscriber)
 
+    def reload_external_changes(self) -> Set[str]:
+        """Reload the data written to the database file by other processes, returning the
+        uuids of the companies it changed.
+
+        Nothing is read when the file did not change. Only the changed companies are assembled
+        and indexed again, the models of the others are kept. The subscribers get an event of
+        each changed company.
+        """
+        storage = self.db.storage
+        if not isinstance(storage, WriteBehindMiddleware) or not storage.changed_on_disk():
+            return set()
+        with self.lock.write():
+            before = self._read()
+            after = storage.reload()
+            changed = get_changed_companies(before, after)
+            if changed:
+                self.history.clear()
+            with self._index_lock:
+                self._uuid_index = None
+                self._field_indexes = None
+                self.searcher.mark_stale(changed)
+                for uuid in changed:
+                    self._company_cache.drop(uuid)
+                self._company_cache.commit(before, after)
+            self._open_tables(storage)
+            self._changes.publish(get_company_changes(before, after, sorted(changed)))
+        if changed:
+            self.logger.info("Reloaded %d companies changed by another process", len(changed))
+        return changed
+
+    @_reading
+    def get_companies(self) -> Tuple[Company, ...]:
+        """Get all companies, the same shared models until a transaction changes them."""
+        data = self._read()
+        if self._transaction:
+            return tuple(sort_companies_by_applied_date(self._get_company_models(data)))
+        with self._index_lock:
+            return self._company_cache.get_companies(data)
+
+    @_reading
     def get_company_by_uuid(self, company_uuid) -> Company:
         """Get company by uuid."""
-        query = Query()
-        document = self.companies_table.search(query.uuid == company_uuid)
-        return Company(**document[0]) if document and len(document) > 0 else None
+        companies = self._get_company_models(self._read(), [company_uuid])
+        return companies[0] if companies else None
 
+    @_reading
     def get_company_by_interview_uuid(self, interview_uuid) -> Company:
         """Get company by role_uuid."""
-        query = Query()
-        document = self.companies_table.search(
-            query.roles.any(query.interviews.any(query.uuid == interview_uuid))
-        )
-        self.logger.debug("Found company by interview uuid: %s", document)
-        return Company(**document[0]) if document and len(document) > 0 else None
+        location, interview_row = self._find_row(interview_uuid, self._read())
+        if location is None or location.table != INTERVIEWS_TABLE:
+            return None
+        return self.get_company_by_role_uuid(interview_row["role_uuid"])
 
+    @_reading
     def get_company_by_role_uuid(self, role_uuid) -> Company:
         """Get company by role_uuid."""
-        query = Query()
-        document = self.companies_table.search(query.roles.any(query.uuid == role_uuid))
-        self.logger.debug("Found company by role uuid: %s", document)
-        return Company(**document[0]) if document and len(document) > 0 else None
+        location, role_row = self._find_row(role_uuid, self._read())
+        if location is None or location.table != ROLES_TABLE:
+            return None
+        return self.get_company_by_uuid(role_row["company_uuid"])
 
     def insert_company(self, company):
         """Insert a new company."""
-        self.companies_table.insert(self.__company_to_json(company))
+        self.insert_companies([company])
 
     def update_company(self, company):
-        """Update a company."""
-        query = Query()
-        self.companies_table.update(
-            self.__company_to_json(company), query.uuid == company.uuid
-        )
+        """Update a company, writing only the rows which changed.
+
+        Nothing is written when the company is the same as stored. Raises StaleCompanyError
+        when the company was changed since the version of the given one was read.
+        """
+        self.update_companies([company])
 
     def delete_company(self, company_uuid):
         """Delete a company."""
-        query = Query()
-        self.companies_table.remove(query.uuid == company_uuid)
+        self.delete_companies([company_uuid])
 
-    def delete_role(self, role_uuid):
-        """Delete a role."""
-        company = self.get_company_by_role_uuid(role_uuid)
-        for role in company.roles:
-            if role.uuid == role_uuid:
-                company.roles.remove(role)
-                self.update_company(company)
+    def insert_companies(self, companies: Iterable[Company]):
+        """Insert many companies in one write."""
+        with self.transaction():
+            rows = []
+            for company in companies:
+                rows.extend(split_document(COMPANIES_TABLE, self.__to_json(company)))
+            self._insert_rows(rows)
+
+    def update_companies(self, companies: Iterable[Company]):
+        """Update many companies in one write, none of them when one of them is stale."""
+        with self.transaction():
+            data = self._read()
+            child_rows = self._get_child_rows(data)
+            for company in companies:
+                self._update_company(company, data, child_rows)
+
+    def delete_companies(self, company_uuids: Iterable[str]):
+        """Delete many companies, with everything nested in them, in one write."""
+        with self.transaction():
+            data = self._read()
+            child_rows = self._get_child_rows(data)
+            locations = []
+            for company_uuid in company_uuids:
+                location, _ = self._find_row(company_uuid, data)
+                if location:
+                    locations.append((company_uuid, location))
+                    locations.extend(
+                        (row["uuid"], RowLocation(table, doc_id))
+                        for table, doc_id, row in iter_descendants(
+                            child_rows, COMPANIES_TABLE, company_uuid
+                        )
+                    )
+            self._remove_rows(locations)
+
+    @contextmanager
+    def transaction(self):
+        """Batch the mutations in the block into one write, with all-or-nothing semantics.
+
+        The rows changed in the transaction are validated before the write. Nothing is
+        written when the block or the validation raises. Nested transactions join the
+        outer one. The subscribers get the change events of the transaction after the write.
+        The changes of other processes are reloaded first, so the versions of the companies
+        are checked against their writes too.
+        """
+        with self.lock.write():
+            if self._transaction:
+                yield self
                 return
 
+            self.reload_external_changes()
+
+            self._transaction = TransactionStorage(self.db.storage)
+            self._open_tables(self._transaction)
+            committed_data = self.db.storage.read() or {}
+            events = []
+            try:
+                yield self
+                versions = self._stamp_versions()
+                self._transaction.commit(
+                    {table: lambda row, m=model: m(**row) for table, model in ROW_MODELS.items()}
+                )
+                self._company_cache.commit(committed_data, self.db.storage.read() or {})
+                self.history.commit(self.db.storage.read() or {})
+                events = set_company_versions(self._changes.take(), versions)
+            except BaseException:
+                self._uuid_index = None
+                self._field_indexes = None
+                self.searcher.reset()
+                raise
+            finally:
+                self._transaction = None
+                self._changes.take()
+                self.history.discard()
+                self._open_tables(self.db.storage)
+            self._changes.publish(events)
+
+    def add_role(self, company_uuid: str, role: Role):
+        """Add a role to a company."""
+        self._add_subdocument(company_uuid, ROLES_TABLE, role)
+
+    def update_role(self, role: Role):
+        """Update the fields of a role, its interviews are kept as stored."""
+        self._update_subdocument(role)
+
+    def add_interview(self, role_uuid: str, interview: Interview):
+        """Add an interview to a role."""
+        self._add_subdocument(role_uuid, INTERVIEWS_TABLE, interview)
+
+    def update_interview(self, interview: Interview):
+        """Update the fields of an interview, its interviewers are kept as stored."""
+        self._update_subdocument(interview)
+
+    def add_person(self, parent_uuid: str, person: Person):
+        """Add a person as a recruiter of a company or as an interviewer of an interview."""
+        self._add_subdocument(parent_uuid, PERSONS_TABLE, person)
+
+    def update_person(self, person: Person):
+        """Update a recruiter or an interviewer."""
+        self._update_subdocument(person)
+
+    def delete_role(self, role_uuid):
+        """Delete a role with its interviews."""
+        self._remove_subdocument(role_uuid)
+
     def delete_interview(self, interview_uuid):
-        """Delete an interview."""
-        company = self.get_company_by_interview_uuid(interview_uuid)
-        for role in company.roles:
-            for interview in role.interviews:
-                if interview.uuid == interview_uuid:
-                    role.interviews.remove(interview)
-                    self.update_company(company)
-                    return
+        """Delete an interview with its interviewers."""
+        self._remove_subdocument(interview_uuid)
 
     def delete_interviewer(self, person_uuid, interview_uuid):
         """Delete an interviewer."""
-        company = self.get_company_by_interview_uuid(interview_uuid)
-        for role in company.roles:
-            for interview in role.interviews:
-                if interview.uuid == interview_uuid:
-                    for person in interview.interviewers:
-                        if person.uuid == person_uuid:
-                            interview.interviewers.remove(person)
-                            self.update_company(company)
-                            return
+        with self.transaction():
+            _, row = self._find_row(person_uuid, self._read())
+            if row and row.get("interview_uuid") == interview_uuid:
+                self._remove_subdocument(person_uuid)
 
     def delete_recruiter(self, person_uuid, company_uuid):
         """Delete a recruiter."""
-        company = self.get_company_by_uuid(company_uuid)
-        for recruiter in company.recruiters:
-            if recruiter.uuid == person_uuid:
-                company.recruiters.remove(recruiter)
-                self.update_company(company)
-                return
+        with self.transaction():
+            _, row = self._find_row(person_uuid, self._read())
+            if row and row.get("company_uuid") == company_uuid:
+                self._remove_subdocument(person_uuid)
 
-    def search_in_db(self, search_string):
-        """Search in db."""
-        results = []
-        for doc in self.companies_table.all():
-            flat_doc = flatten_dict(doc)
-            if any(
-                search_string.lower() in value.lower() for value in flat_doc.values()
-            ):
-                results.append(doc)
+    @_reading
+    def load_descriptions(
+        self, items: Iterable[Union[Person, Role, Interview]]
+    ) -> List[Union[Person, Role, Interview]]:
+        """Return the items with their descriptions loaded from the blob store.
+
+        The items whose descriptions are not loaded yet are copied, the items themselves are
+        not changed, as they may be the shared models of the data service.
+        """
+        return [
+            item.model_copy(update={"description": self.blob_store.get(item.description_ref)})
+            if item.description is None and item.description_ref
+            else item
+            for item in items
+        ]
+
+    def prune_descriptions(self) -> int:
+        """Remove the description blobs which are not referenced by any row, of this process or
+        of the database file, or by a row which can be restored by undo or redo.
+
+        The database file is locked while the blobs are removed, so other processes do not
+        write rows referring to them meanwhile. The blobs written in the last PRUNE_MIN_AGE
+        seconds are kept, their rows may not be written yet.
+        """
+        storage = self.db.storage
+        locked = storage.locked() if isinstance(storage, WriteBehindMiddleware) else nullcontext({})
+        with self.lock.write(), locked as file_data:
+            rows = itertools.chain(
+                (
+                    row
+                    for data in (self._read(), file_data)
+                    for table in TABLES
+                    for row in data.get(table, {}).values()
+                ),
+                self.history.iter_rows(),
+            )
+            return self.blob_store.prune(
+                (row["description_ref"] for row in rows if row.get("description_ref")), PRUNE_MIN_AGE
+            )
+
+    @_reading
+    def find_roles(self, *criteria: Criterion) -> List[Role]:
+        """Find the roles meeting the criteria, the ones on interviews are met by one of their interviews."""
+        data = self._read()
+        child_rows = self._get_child_rows(data)
+        return [
+            Role(**assemble_document(child_rows, ROLES_TABLE, row))
+            for _, row in self._find_role_rows(criteria, data)
+        ]
+
+    @_reading
+    def find_interviews(self, *criteria: Criterion) -> List[Interview]:
+        """Find the interviews meeting the criteria, the ones on roles are met by their role."""
+        data = self._read()
+        matches = self._find_rows(criteria, data)
+        interview_rows = matches.get(INTERVIEWS_TABLE)
+        if interview_rows is None:
+            interview_rows = table_rows(data, INTERVIEWS_TABLE)
+        if ROLES_TABLE in matches:
+            role_uuids = {row["uuid"] for _, row in matches[ROLES_TABLE]}
+            interview_rows = [
+                (doc_id, row) for doc_id, row in interview_rows if row["role_uuid"] in role_uuids
+            ]
+        child_rows = self._get_child_rows(data)
+        return [
+            Interview(**assemble_document(child_rows, INTERVIEWS_TABLE, row))
+            for _, row in interview_rows
+        ]
+
+    @_reading
+    def find_companies(self, *criteria: Criterion) -> List[Company]:
+        """Find the companies with a role meeting the criteria, as find_roles does."""
+        data = self._read()
+        doc_ids = {}
+        for _, row in self._find_role_rows(criteria, data):
+            location, _ = self._find_row(row["company_uuid"], data)
+            if location:
+                doc_ids[row["company_uuid"]] = location.doc_id
         return sort_companies_by_applied_date(
-            [Company(**document) for document in results]
+            self._get_company_models(data, sorted(doc_ids, key=doc_ids.get))
         )
 
-    @staticmethod
-    def __company_to_json(company):
-        str_value = company.model_dump_json(exclude_none=True)
-        return json.loads(str_value)
+    def _get_company_models(
+        self, data: dict, company_uuids: Optional[Iterable[str]] = None
+    ) -> List[Company]:
+        """Returns the models of the companies with the uuids, or of all of them, in the order of
+        the uuids or in insertion order, shared from the company cache outside transactions."""
+        if self._transaction:
+            return [Company(**document) for document in self._assemble_companies(data, company_uuids)]
+        with self._index_lock:
+            if company_uuids is None:
+                company_uuids = [row["uuid"] for _, row in table_rows(data, COMPANIES_TABLE)]
+            return self._company_cache.get(data, company_uuids)
+
+    def _open_tables(self, storage):
+        table_class = CopyOnWriteTable if isinstance(storage, TransactionStorage) else Table
+        self.tables = {name: table_class(storage, name, cache_size=0) for name in TABLES}
+
+    def _read(self) -> dict:
+        """Returns the raw data of all tables, from the transaction when there is one."""
+        return (self._transaction or self.db.storage).read() or {}
+
+    @contextmanager
+    def _reading_data(self) -> Iterator[dict]:
+        """Holds the lock for reading in the block, yielding the raw data of all tables."""
+        with self.lock.read():
+            yield self._read()
+
+    def _find_row(
+        self, uuid: str, data: dict
+    ) -> Tuple[Optional[RowLocation], Optional[dict]]:
+        """Returns the location and the row with the uuid in the data.
+
+        The index is rebuilt, once, when it does not have as many rows as the data or has
+        another row at the location of the uuid, because the database was changed by another
+        writer. A uuid which is not in a current index is not in the data.
+        """
+        with self._index_lock:
+            rebuilt = self._uuid_index is None or not self._uuid_index.is_current(data)
+            if rebuilt:
+                self._uuid_index = UuidIndex(data)
+            location = self._uuid_index.get(uuid)
+            row = location.get_row(data) if location else None
+            if not rebuilt and location and (row is None or row["uuid"] != uuid):
+                self._uuid_index = UuidIndex(data)
+                location = self._uuid_index.get(uuid)
+                row = location.get_row(data) if location else None
+        return (location, row) if row else (None, None)
+
+    def _get_child_rows(self, data: dict) -> ChildRows:
+        """Returns the rows of the child tables of the data by their table and parent, looked
+        up in the uuid index.
+
+        The index is rebuilt when it does not have the rows of the data, because the database
+        was changed by another writer.
+        """
+        with self._index_lock:
+            if self._uuid_index is None or not self._uuid_index.is_current(data):
+                self._uuid_index = UuidIndex(data)
+            return IndexedChildRows(self._uuid_index, data)
+
+    def _assemble_companies(self, data: dict, company_uuids: Optional[Iterable[str]] = None) -> List[dict]:
+        """Returns the nested documents of the companies with the uuids, in their order, or of all
+        of them in insertion order."""
+        child_rows = self._get_child_rows(data)
+        if company_uuids is None:
+            return assemble_companies(data, child_rows=child_rows)
+        rows = (self._find_row(uuid, data)[1] for uuid in dict.fromkeys(company_uuids))
+        return [assemble_document(child_rows, COMPANIES_TABLE, row) for row in rows if row]
+
+    def _find_rows(
+        self, criteria: Iterable[Criterion], data: dict
+    ) -> Dict[str, List[Tuple[int, dict]]]:
+        """Returns the rows of each table with criteria which meet all of them.
+
+        The rows are in the order of the index of the first criterion on their table. The
+        indexes are rebuilt when they do not match the data, because the database was
+        changed by another writer.
+        """
+        with self._index_lock:
+            rebuilt = self._field_indexes is None or not self._field_indexes.is_current(data)
+            if rebuilt:
+                self._field_indexes = FieldIndexes(data)
+            doc_ids: Dict[str, List[int]] = {}
+            for criterion in criteria:
+                found = self._field_indexes.find(criterion)
+                if criterion.table in doc_ids:
+                    found = set(found)
+                    found = [doc_id for doc_id in doc_ids[criterion.table] if doc_id in found]
+                doc_ids[criterion.table] = found
+            matches = {
+                table: [(doc_id, data[table].get(str(doc_id))) for doc_id in table_doc_ids]
+                for table, table_doc_ids in doc_ids.items()
+            }
+            if not rebuilt and any(
+                row is None or not all(c.matches(row) for c in criteria if c.table == table)
+                for table, rows in matches.items()
+                for _, row in rows
+            ):
+                self._field_indexes = None
+                return self._find_rows(criteria, data)
+            return matches
+
+    def _find_company_uuids(self, data: dict, criteria: Iterable[Criterion]) -> List[str]:
+        """Returns the uuids of the companies with a role meeting the criteria, as find_roles does."""
+        return [row["company_uuid"] for _, row in self._find_role_rows(criteria, data)]
+
+    def _find_role_rows(self, criteria: Iterable[Criterion], data: dict) -> List[Tuple[int, dict]]:
+        matches = self._find_rows(criteria, data)
+        role_rows = matches.get(ROLES_TABLE)
+        if INTERVIEWS_TABLE in matches:
+            role_uuids = list(dict.fromkeys(row["role_uuid"] for _, row in matches[INTERVIEWS_TABLE]))
+            if role_rows is None:
+                role_rows = [
+                    (location.doc_id, row)
+                    for location, row in (self._find_row(uuid, data) for uuid in role_uuids)
+                    if location
+                ]
+            else:
+                role_uuids = set(role_uuids)
+                role_rows = [(doc_id, row) for doc_id, row in role_rows if row["uuid"] in role_uuids]
+        return table_rows(data, ROLES_TABLE) if role_rows is None else role_rows
+
+    def _record_change(self, change_type: ChangeType, table: str, row: dict):
+        """Records the change of a row for the subscribers, and marks its company as written, to
+        be reindexed in the text index and assembled again."""
+        data = self._read()
+        changed_table, changed_uuid = table, row["uuid"]
+        while table != COMPANIES_TABLE:
+            location, row = self._find_row(get_parent_uuid(row), data)
+            if location is None:
+                return
+            table = location.table
+        self.searcher.mark_stale([row["uuid"]])
+        self._company_cache.drop(row["uuid"])
+        self._changes.record(ChangeEvent(change_type, changed_table, changed_uuid, row["uuid"]))
+
+    def _stamp_versions(self) -> Dict[str, int]:
+        """Increases the versions of the companies written by the transaction, returning them by
+        uuid. The deleted companies are not looked up."""
+        data = self._read()
+        deleted = get_deleted_company_uuids(self._changes.pending)
+        rows = (
+            self._find_row(uuid, data)
+            for uuid in get_company_uuids(self._changes.pending)
+            if uuid not in deleted
+        )
+        versions = {
+            location.doc_id: (row["uuid"], row.get("version", 0) + 1)
+            for location, row in rows
+            if location
+        }
+        if versions:
+            self.tables[COMPANIES_TABLE].update(
+                lambda document: document.update(version=document.get("version", 0) + 1),
+                doc_ids=list(versions),
+            )
+        return dict(versions.values())
+
+    def _insert_rows(self, rows: List[Tuple[str, dict]]):
+        for table in TABLES:
+            inserted_rows = [row for row_table, row in rows if row_table == table]
+            if inserted_rows:
+                doc_ids = self.tables[table].insert_multiple(inserted_rows)
+                for doc_id, row in zip(doc_ids, inserted_rows):
+                    self.history.record(table, doc_id, None)
+                    self._record_change(ChangeType.INSERTED, table, row)
+                    if self._uuid_index:
+                        self._uuid_index.add(RowLocation(table, doc_id), row)
+                    if self._field_indexes:
+                        self._field_indexes.add_row(table, doc_id, row)
+
+    def _update_row(self, location: RowLocation, stored_row: dict, row: dict):
+        """Updates the fields of the stored row which changed, its foreign key is kept."""
+        changes = diff_documents(
+            {key: value for key, value in stored_row.items() if key not in FOREIGN_KEYS},
+            {key: value for key, value in row.items() if key not in FOREIGN_KEYS},
+        )
+        if changes:
+            self.history.record(location.table, location.doc_id, stored_row)
+            self._record_change(ChangeType.UPDATED, location.table, stored_row)
+            self.tables[location.table].update(
+                lambda document: apply_changes(document, changes),
+                doc_ids=[location.doc_id],
+            )
+            if self._field_indexes:
+                self._field_indexes.add_row(location.table, location.doc_id, row)
+
+    def _remove_rows(self, locations: List[Tuple[str, RowLocation]]):
+        data = self._read()
+        rows = [(location, location.get_row(data)) for _, location in locations]
+        for location, row in rows:
+            if row:
+                self.history.record(location.table, location.doc_id, row)
+                self._record_change(ChangeType.DELETED, location.table, row)
+        for table in TABLES:
+            doc_ids = [location.doc_id for _, location in locations if location.table == table]
+            if doc_ids:
+                self.tables[table].remove(doc_ids=doc_ids)
+        for location, row in rows:
+            if self._uuid_index and row:
+                self._uuid_index.remove(location, row)
+            if self._field_indexes:
+                self._field_indexes.remove_row(location.table, location.doc_id)
+
+    def _update_company(self, company: Company, data: dict, child_rows: ChildRows):
+        location, company_row = self._find_row(company.uuid, data)
+        if location is None:
+            return
+        if company.version != company_row.get("version", 0):
+            raise StaleCompanyError(
+                f"Company {company.uuid} is at version {company_row.get('version', 0)}, "
+                f"not {company.version}"
+            )
+        stored_rows = {
+            company.uuid: (location, company_row),
+            **{
+                row["uuid"]: (RowLocation(table, doc_id), row)
+                for table, doc_id, row in iter_descendants(
+                    child_rows, COMPANIES_TABLE, company.uuid
+                )
+            },
+        }
+        new_rows = []
+        for table, row in split_document(COMPANIES_TABLE, self.__to_json(company)):
+            if row["uuid"] in stored_rows:
+                stored_location, stored_row = stored_rows.pop(row["uuid"])
+                self._update_row(stored_location, stored_row, row)
+            else:
+                new_rows.append((table, row))
+        self._insert_rows(new_rows)
+        self._remove_rows(
+            [(uuid, stored_location) for uuid, (stored_location, _) in stored_rows.items()]
+        )
+
+    def _apply_operation(self, operation: Operation):
+        """Writes the rows changed by the operation as they were before it, in a transaction.
+
+        The rows are found by their uuids, not by their document ids, which another writer may
+        have given to other rows. The companies keep their versions, which are increased as by
+        any write. A removed row is inserted with its document id again unless another row has
+        it.
+        """
+        with self.transaction():
+            locations = [
+                (change.after["uuid"], self._find_row(change.after["uuid"], self._read())[0])
+                for change in operation
+                if change.before is None
+            ]
+            self._remove_rows([(uuid, location) for uuid, location in locations if location])
+            for change in operation:
+                if change.before is not None and change.after is not None:
+                    location, stored_row = self._find_row(change.after["uuid"], self._read())
+                    if location is None:
+                        continue
+                    row = dict(change.before)
+                    if change.table == COMPANIES_TABLE:
+                        row["version"] = stored_row.get("version", 0)
+                    self._update_row(location, stored_row, row)
+            data = self._read()
+            self._insert_rows([
+                (
+                    change.table,
+                    Document(change.before, doc_id=change.doc_id)
+                    if RowLocation(change.table, change.doc_id).get_row(data) is None
+                    else dict(change.before),
+                )
+                for change in operation
+                if change.after is None and self._find_row(change.before["uuid"], data)[0] is None
+            ])
+
+    def _add_subdocument(self, parent_uuid: str, table: str, model: BaseModel):
+        """Adds the model, with everything nested in it, under the parent row."""
+        with self.transaction():
+            parent_location, _ = self._find_row(parent_uuid, self._read())
+            foreign_key = next(
+                (
+                    child_foreign_key
+                    for child_table, child_foreign_key in CHILDREN[
+                        parent_location.table
+                    ].values()
+                    if child_table == table
+                ),
+                None,
+            ) if parent_location else None
+            if foreign_key is None:
+                raise LookupError(f"No parent for {table} with uuid: {parent_uuid}")
+            self._insert_rows(
+                split_document(table, self.__to_json(model), foreign_key, parent_uuid)
+            )
+
+    def _update_subdocument(self, model: BaseModel):
+        """Updates the fields of the model's row, the rows nested in it are kept."""
+        with self.transaction():
+            location, stored_row = self._find_row(model.uuid, self._read())
+            if location is None:
+                raise LookupError(f"No role, interview or person with uuid: {model.uuid}")
+            row = {
+                key: value
+                for key, value in self.__to_json(model).items()
+                if key not in CHILDREN[location.table]
+            }
+            self._update_row(location, stored_row, row)
+
+    def _remove_subdocument(self, uuid: str):
+        """Removes the row with the uuid and the rows nested in it."""
+        with self.transaction():
+            data = self._read()
+            location, _ = self._find_row(uuid, data)
+            if location is None:
+                self.logger.warning("No role, interview or person to remove: %s", uuid)
+                return
+            if location.table == COMPANIES_TABLE:
+                raise ValueError(f"Not a role, interview or person: {uuid}")
+            self._remove_rows(
+                [(uuid, location)]
+                + [
+                    (row["uuid"], RowLocation(table, doc_id))
+                    for table, doc_id, row in iter_descendants(
+                        self._get_child_rows(data), location.table, uuid
+                    )
+                ]
+            )
+
+    def _migrate_nested_companies(self):
+        """Moves the roles, interviews and persons nested in company documents, as written
+        by earlier versions, to their own tables, with their descriptions moved to the blob
+        store in canonical form as any written description."""
+        nested_companies = [
+            (int(doc_id), document)
+            for doc_id, document in self._read().get(COMPANIES_TABLE, {}).items()
+            if any(field in document for field in CHILDREN[COMPANIES_TABLE])
+        ]
+        if not nested_companies:
+            return
+        with self.transaction():
+            self.tables[COMPANIES_TABLE].remove(
+                doc_ids=[doc_id for doc_id, _ in nested_companies]
+            )
+            rows = []
+            for _, document in nested_companies:
+                rows.extend(split_document(COMPANIES_TABLE, self.__store_descriptions(copy.deepcopy(document))))
+            self._insert_rows(rows)
+        self.history.clear()
+        self.logger.info(
+            "Migrated %d companies to separate tables", len(nested_companies)
+        )
+
+    def __to_json(self, model: BaseModel):
+        str_value = model.model_dump_json(exclude_none=True)
+        return self.__store_descriptions(json.loads(str_value))
+
+    def __store_descriptions(self, document: dict) -> dict:
+        """Replaces the descriptions of the document with the references of their canonical
+        forms, stored in the blob store."""
+        for subdocument in iter_subdocuments(document):
+            if "description" in subdocument:
+                description = canonicalize_html(subdocument.pop("description"))
+                if description:
+                    subdocument["description_ref"] = self.blob_store.put(description)
+                else:
+                    subdocument.pop("description_ref", None)
+        return document
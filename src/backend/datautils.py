@@ -3,6 +3,7 @@ import sys
 from datetime import date
 from pathlib import Path
 import platform
+from typing import Any, Container, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 
 def get_log_file():
@@ -42,22 +43,119 @@ def get_data_file():
     return data_dir / "db.json"
 
 
+def get_blob_dir():
+    """Get the directory of the description blobs."""
+    return get_data_file().parent / "blobs"
+
+
 def flatten_dict(d, parent_key=""):
     """Flatten a dictionary."""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}.{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key).items())
-        elif isinstance(v, list):
-            for index, item in enumerate(v):
-                if isinstance(item, dict):
-                    items.extend(flatten_dict(item, f"{new_key}[{index}]").items())
+    if parent_key:
+        return {f"{parent_key}.{key}": value for key, value in iter_leaves(d)}
+    return dict(iter_leaves(d))
+
+
+def iter_leaves(
+    d: dict, keys: bool = True, exclude: Container[str] = ()
+) -> Iterator[Union[Tuple[str, str], str]]:
+    """Yields the leaves of a nested dictionary as (key, value) pairs with the keys of flatten_dict,
+    or only the values, without building the keys, when keys is False.
+
+    The dictionary is walked with a stack, lazily, so a caller looking for one leaf can stop
+    early. The leaves with a key in exclude are skipped.
+    """
+    stack: List[Tuple[Optional[str], bool, Iterator]] = [(None, False, iter(d.items()))]
+    while stack:
+        parent_key, in_list, items = stack[-1]
+        for name, value in items:
+            if not in_list and name in exclude:
+                continue
+            key = None
+            if keys:
+                if in_list:
+                    key = f"{parent_key}[{name}]"
                 else:
-                    items.append((f"{new_key}[{index}]", str(item)))
+                    key = f"{parent_key}.{name}" if parent_key else name
+            if isinstance(value, dict):
+                stack.append((key, False, iter(value.items())))
+                break
+            if isinstance(value, list) and not in_list:
+                stack.append((key, True, enumerate(value)))
+                break
+            yield (key, str(value)) if keys else str(value)
         else:
-            items.append((new_key, str(v)))
-    return dict(items)
+            stack.pop()
+
+
+def iter_subdocuments(document: dict):
+    """Yields the document and every document nested in its lists."""
+    yield document
+    for value in document.values():
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    yield from iter_subdocuments(item)
+
+
+class Change(NamedTuple):
+    """A change of one field of a document.
+
+    The path holds the keys from the document down to the field. A list of documents with
+    uuids is stepped into by the uuid of the document. A change without value removes the
+    field.
+    """
+
+    path: Tuple[str, ...]
+    value: Any = None
+    remove: bool = False
+
+
+def diff_documents(old: dict, new: dict, path: Tuple[str, ...] = ()) -> List[Change]:
+    """Returns the changes which turn the old document into the new one."""
+    changes = [Change(path + (key,), remove=True) for key in old if key not in new]
+    for key, value in new.items():
+        old_value = old.get(key)
+        if key in old and old_value == value:
+            continue
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            changes.extend(diff_documents(old_value, value, path + (key,)))
+        elif _same_documents_list(old_value, value):
+            for old_item, item in zip(old_value, value):
+                changes.extend(diff_documents(old_item, item, path + (key, item["uuid"])))
+        else:
+            changes.append(Change(path + (key,), value))
+    return changes
+
+
+def apply_changes(document: dict, changes: List[Change]):
+    """Applies the changes to the document in place."""
+    for change in changes:
+        parent = document
+        steps = iter(change.path[:-1])
+        for step in steps:
+            parent = parent[step]
+            if isinstance(parent, list):
+                uuid = next(steps)
+                parent = next(item for item in parent if item["uuid"] == uuid)
+        if change.remove:
+            del parent[change.path[-1]]
+        else:
+            parent[change.path[-1]] = change.value
+
+
+def _same_documents_list(old_value, value) -> bool:
+    """Checks if both values are lists of the same documents, by uuid and order."""
+    if not isinstance(old_value, list) or not isinstance(value, list):
+        return False
+    if len(old_value) != len(value):
+        return False
+    return all(
+        isinstance(old_item, dict)
+        and isinstance(item, dict)
+        and "uuid" in item
+        and old_item.get("uuid") == item["uuid"]
+        for old_item, item in zip(old_value, value)
+    )
 
 
 def sort_companies_by_applied_date(companies):
@@ -0,0 +1,118 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from enum import Enum
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from backend.schema import INTERVIEWS_TABLE, ROLES_TABLE
+
+# The fields of the rows of each table which have a sorted index.
+INDEXED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    ROLES_TABLE: ("applied_date", "work_location", "employment_type"),
+    INTERVIEWS_TABLE: ("date", "type"),
+}
+
+
+class Criterion(NamedTuple):
+    """Condition on an indexed field of a table: its value is between low and high, inclusive.
+
+    An end which is None is open, a criterion with low equal to high is an equality.
+    """
+
+    table: str
+    field: str
+    low: Any = None
+    high: Any = None
+
+    def matches(self, row: dict) -> bool:
+        """Returns whether the value of the row meets the condition."""
+        value = row.get(self.field)
+        if value is None:
+            return False
+        low, high = index_value(self.low), index_value(self.high)
+        return (low is None or low <= value) and (high is None or value <= high)
+
+
+def equals(table: str, field: str, value: Any) -> Criterion:
+    """Returns the criterion of an indexed field being equal to the value."""
+    return Criterion(table, field, value, value)
+
+
+def index_value(value: Any) -> Optional[str]:
+    """Returns the value as stored in the rows, dates and enums are stored as strings."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class SortedIndex:
+    """Index of the rows of a table sorted by the value of a field."""
+
+    def __init__(self):
+        self.entries: List[Tuple[str, int]] = []
+        self.values: Dict[int, str] = {}
+
+    def add(self, doc_id: int, value: str):
+        """Indexes the row with the value, rows without a value are not indexed."""
+        self.remove(doc_id)
+        if value is not None:
+            insort(self.entries, (value, doc_id))
+            self.values[doc_id] = value
+
+    def remove(self, doc_id: int):
+        """Removes the row from the index."""
+        value = self.values.pop(doc_id, None)
+        if value is not None:
+            del self.entries[bisect_left(self.entries, (value, doc_id))]
+
+    def find(self, low: Optional[str] = None, high: Optional[str] = None) -> List[int]:
+        """Returns the ids of the rows with a value between low and high, in value order."""
+        start = 0 if low is None else bisect_left(self.entries, (low,))
+        end = len(self.entries) if high is None else bisect_right(self.entries, (high, float("inf")))
+        return [doc_id for _, doc_id in self.entries[start:end]]
+
+
+class FieldIndexes:
+    """Sorted indexes of the indexed fields of all tables."""
+
+    def __init__(self, data: dict = None):
+        self.indexes: Dict[Tuple[str, str], SortedIndex] = {
+            (table, field): SortedIndex()
+            for table, fields in INDEXED_FIELDS.items()
+            for field in fields
+        }
+        self.doc_ids: Dict[str, Set[int]] = {table: set() for table in INDEXED_FIELDS}
+        for table in INDEXED_FIELDS:
+            for doc_id, row in (data or {}).get(table, {}).items():
+                self.add_row(table, int(doc_id), row)
+
+    def add_row(self, table: str, doc_id: int, row: dict):
+        """Indexes the fields of a row, a row which is indexed already is reindexed."""
+        if table not in INDEXED_FIELDS:
+            return
+        self.doc_ids[table].add(doc_id)
+        for field in INDEXED_FIELDS[table]:
+            self.indexes[(table, field)].add(doc_id, row.get(field))
+
+    def remove_row(self, table: str, doc_id: int):
+        """Removes a row from the indexes of its table."""
+        if table not in INDEXED_FIELDS:
+            return
+        self.doc_ids[table].discard(doc_id)
+        for field in INDEXED_FIELDS[table]:
+            self.indexes[(table, field)].remove(doc_id)
+
+    def find(self, criterion: Criterion) -> List[int]:
+        """Returns the ids of the rows meeting the criterion."""
+        if criterion.field not in INDEXED_FIELDS.get(criterion.table, ()):
+            raise ValueError(f"No index on {criterion.table}.{criterion.field}")
+        return self.indexes[(criterion.table, criterion.field)].find(
+            index_value(criterion.low), index_value(criterion.high)
+        )
+
+    def is_current(self, data: dict) -> bool:
+        """Returns whether the indexes have as many rows as the tables of the data."""
+        return all(
+            len(data.get(table, {})) == len(doc_ids) for table, doc_ids in self.doc_ids.items()
+        )
@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Modification time, size and inode of a file, which change when it is written.
+FileStamp = Tuple[int, int, int]
+
+
+def get_file_stamp(path: Union[str, Path]) -> Optional[FileStamp]:
+    """Returns the stamp of the file, or None when there is no file."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class FileLock:
+    """Advisory lock of a file, held by one process at a time in the block.
+
+    The lock is taken on a separate lock file next to the file, so the file itself can be
+    replaced. Only processes taking the lock are kept out, the file is not locked for the
+    others.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.lock_path = f"{path}.lock"
+        self._fd: Optional[int] = None
+
+    def __enter__(self):
+        self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)  # pylint: disable=used-before-assignment
+        except OSError:
+            os.close(self._fd)
+            self._fd = None
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,103 @@
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+# Maximum edit distance of the words found by a fuzzy lookup.
+MAX_DISTANCE = 2
+
+# Only the deletes of this many first letters of a word are indexed, which bounds the size of
+# the index, the candidates found by their prefix are checked on the whole word.
+PREFIX_LENGTH = 6
+
+
+def get_max_distance(word: str) -> int:
+    """Returns the edit distance allowed for a searched word, short words have to match better."""
+    if len(word) < 4:
+        return 0
+    if len(word) < 7:
+        return 1
+    return MAX_DISTANCE
+
+
+def edit_distance(first: str, second: str, max_distance: int) -> Optional[int]:
+    """Returns the optimal string alignment distance of the words, which counts a swap of
+    adjacent letters as one edit, or None when it is more than max_distance."""
+    if abs(len(first) - len(second)) > max_distance:
+        return None
+    before_row: List[int] = []
+    previous_row = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        row = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                row[j] = min(row[j], before_row[j - 2] + 1)
+        if min(row) > max_distance:
+            return None
+        before_row, previous_row = previous_row, row
+    return previous_row[-1] if previous_row[-1] <= max_distance else None
+
+
+def get_deletes(word: str, max_distance: int = MAX_DISTANCE) -> Set[str]:
+    """Returns the strings made by deleting up to max_distance letters of the word's prefix."""
+    deletes = level = {word[:PREFIX_LENGTH]}
+    for _ in range(max_distance):
+        level = {part[:i] + part[i + 1:] for part in level for i in range(len(part))}
+        deletes = deletes | level
+    return deletes
+
+
+class SymmetricDeleteIndex:
+    """Dictionary of words looked up by bounded edit distance.
+
+    Each word is indexed by the deletes of its prefix, a lookup generates the deletes of the
+    searched word's prefix, so words within the distance are found with a few dictionary
+    lookups instead of comparing the searched word to every word.
+    """
+
+    def __init__(self, words: Iterable[str] = ()):
+        # A delete of a single word maps to the word itself, which takes far less memory than a set.
+        self.deletes: Dict[str, Union[str, Set[str]]] = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str):
+        """Adds a word to the dictionary."""
+        deletes = self.deletes
+        for delete in get_deletes(word):
+            words = deletes.get(delete)
+            if words is None:
+                deletes[delete] = word
+            elif isinstance(words, set):
+                words.add(word)
+            elif words != word:
+                deletes[delete] = {words, word}
+
+    def remove(self, word: str):
+        """Removes a word from the dictionary."""
+        for delete in get_deletes(word):
+            words = self.deletes.get(delete)
+            if words == word:
+                del self.deletes[delete]
+            elif isinstance(words, set):
+                words.discard(word)
+                if len(words) == 1:
+                    self.deletes[delete] = words.pop()
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> Dict[str, int]:
+        """Returns the words of the dictionary within the edit distance of the word, with their
+        distance. The distance allowed by default depends on the length of the word."""
+        if max_distance is None:
+            max_distance = get_max_distance(word)
+        candidates = set()
+        for delete in get_deletes(word, max_distance):
+            words = self.deletes.get(delete)
+            if isinstance(words, set):
+                candidates.update(words)
+            elif words is not None:
+                candidates.add(words)
+        matches = {}
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, max_distance)
+            if distance is not None:
+                matches[candidate] = distance
+        return matches
@@ -0,0 +1,120 @@
+from typing import Callable, ContextManager, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Number of operations which can be undone, the older ones are forgotten.
+MAX_OPERATIONS = 100
+
+
+class RowChange(NamedTuple):
+    """A row changed by an operation, as it was before and after it, None when it did not exist."""
+
+    table: str
+    doc_id: int
+    before: Optional[dict]
+    after: Optional[dict]
+
+
+# The rows changed by a transaction.
+Operation = Tuple[RowChange, ...]
+
+
+class OperationLog:
+    """Undo and redo stacks of the operations of a data service.
+
+    An operation keeps only the rows its transaction changed, as they were before and after
+    it, which share the rows of the data. Undoing an operation writes its rows back as they
+    were before it, in a transaction of its own, which is kept as the operation to redo.
+
+    apply writes the rows of an operation as they were before it, in a transaction, and
+    write_lock holds the lock of the writes of the data service. reload brings in the changes
+    of other writers before an operation is taken to be undone or redone, clearing the log
+    when they changed the data.
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[Operation], None],
+        write_lock: Callable[[], ContextManager],
+        max_operations: int = MAX_OPERATIONS,
+        reload: Optional[Callable[[], object]] = None,
+    ):
+        self._apply = apply
+        self._write_lock = write_lock
+        self._reload = reload
+        self.max_operations = max_operations
+        self._undo_stack: List[Operation] = []
+        self._redo_stack: List[Operation] = []
+        # The rows changed by the running transaction, as they were before it.
+        self._before: Dict[Tuple[str, int], Optional[dict]] = {}
+        self._replay_stack: Optional[List[Operation]] = None
+
+    @property
+    def can_undo(self) -> bool:
+        """Returns whether there is an operation to undo."""
+        return bool(self._undo_stack)
+
+    @property
+    def can_redo(self) -> bool:
+        """Returns whether there is an undone operation to redo."""
+        return bool(self._redo_stack)
+
+    def record(self, table: str, doc_id: int, before: Optional[dict]):
+        """Records a row changed by the running transaction, as it was before the change."""
+        self._before.setdefault((table, doc_id), before)
+
+    def commit(self, data: dict):
+        """Keeps the rows changed by the committed transaction as an operation."""
+        operation = tuple(
+            RowChange(table, doc_id, before, after)
+            for (table, doc_id), before in self._before.items()
+            for after in [data.get(table, {}).get(str(doc_id))]
+            if before != after
+        )
+        self._before = {}
+        if not operation:
+            return
+        if self._replay_stack is not None:
+            self._replay_stack.append(operation)
+            return
+        self._undo_stack.append(operation)
+        del self._undo_stack[:-self.max_operations]
+        self._redo_stack.clear()
+
+    def discard(self):
+        """Forgets the rows changed by the transaction which was rolled back."""
+        self._before = {}
+
+    def clear(self):
+        """Forgets all the operations, when the data was changed by another writer."""
+        self._undo_stack.clear()
+        self._redo_stack.clear()
+
+    def undo(self) -> bool:
+        """Undo the last operation, returns whether there was one."""
+        return self._replay(self._undo_stack, self._redo_stack)
+
+    def redo(self) -> bool:
+        """Redo the last undone operation, returns whether there was one."""
+        return self._replay(self._redo_stack, self._undo_stack)
+
+    def iter_rows(self) -> Iterator[dict]:
+        """Yields the rows of all the operations which can be undone or redone."""
+        for operation in self._undo_stack + self._redo_stack:
+            for change in operation:
+                yield from (row for row in (change.before, change.after) if row)
+
+    def _replay(self, source: List[Operation], target: List[Operation]) -> bool:
+        with self._write_lock():
+            if self._reload:
+                self._reload()
+            if not source:
+                return False
+            operation = source.pop()
+            self._replay_stack = target
+            try:
+                self._apply(operation)
+            except BaseException:
+                source.append(operation)
+                raise
+            finally:
+                self._replay_stack = None
+            return True
@@ -1,4 +1,13 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 from html.parser import HTMLParser
+from typing import Iterable, List, Optional
+
+# Below this many distinct descriptions the process pool start-up costs more than it saves.
+PARALLEL_THRESHOLD = 512
+
+# Number of chunks handed to each worker, so a slow chunk does not leave the others idle.
+CHUNKS_PER_WORKER = 4
 
 
 class HTMLTextExtractor(HTMLParser):
@@ -34,3 +43,32 @@ def get_html_text(description: str) -> str:
     else:
         text_value = ""
     return text_value
+
+
+def get_html_texts(
+    descriptions: Iterable[Optional[str]],
+    max_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> List[str]:
+    """Returns the texts of many HTML documents, in the order of the given descriptions.
+
+    Identical descriptions are extracted only once. Large batches are split into chunks
+    and extracted in a process pool, so all cores are used, unless max_workers is 1, as for
+    callers which cannot wait for the pool to start.
+    """
+    descriptions = [description or "" for description in descriptions]
+    unique_descriptions = list(dict.fromkeys(descriptions))
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(unique_descriptions) < PARALLEL_THRESHOLD:
+        texts = [get_html_text(description) for description in unique_descriptions]
+    else:
+        if not chunksize:
+            chunksize = max(1, len(unique_descriptions) // (workers * CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            texts = list(
+                executor.map(get_html_text, unique_descriptions, chunksize=chunksize)
+            )
+
+    text_by_description = dict(zip(unique_descriptions, texts))
+    return [text_by_description[description] for description in descriptions]
@@ -0,0 +1,40 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from markdown import Markdown
+
+RENDER_CACHE_SIZE = 32
+
+
+class MarkdownRenderer:
+    """Renders Markdown to HTML with one reused converter and a cache of rendered sources."""
+
+    def __init__(self, cache_size: int = RENDER_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._converter = Markdown()
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        # The converter keeps state while converting, so one conversion runs at a time.
+        self._lock = threading.Lock()
+
+    def render(self, source: str) -> str:
+        """Returns the HTML of the Markdown source."""
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            html = self._converter.reset().convert(source)
+            self._cache[key] = html
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return html
+
+
+_renderer = MarkdownRenderer()
+
+
+def render_markdown(source: str) -> str:
+    """Returns the HTML of the Markdown source, rendered by the shared renderer."""
+    return _renderer.render(source)
@@ -49,6 +49,7 @@ class Person(BaseModel):
     role: Optional[str] = None
     email: Optional[str] = None
     description: Optional[str] = None
+    description_ref: Optional[str] = None
     title: TITLE
 
 
@@ -61,6 +62,7 @@ class Interview(BaseModel):
     type: InterviewType
     date: date
     description: Optional[str] = None
+    description_ref: Optional[str] = None
     interviewers: Optional[List[Person]] = []
 
 
@@ -73,6 +75,7 @@ class Role(BaseModel):
     employment_type: EmploymentType = Field(default=EmploymentType.FULL_TIME)
     work_location: WorkLocation = Field(default=WorkLocation.HYBRID)
     description: Optional[str] = None
+    description_ref: Optional[str] = None
     interviews: Optional[List[Interview]] = []
 
 
@@ -84,3 +87,5 @@ class Company(BaseModel):
     website: Optional[str] = None
     recruiters: List[Person] = []
     roles: List[Role] = []
+    # Increased by the data service with every write changing the company.
+    version: int = 0
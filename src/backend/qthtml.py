@@ -0,0 +1,73 @@
+import re
+
+# Head of the document Qt writes on every toHtml() call. It is restored on load.
+QT_HTML_HEAD = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.0//EN" "http://www.w3.org/TR/REC-html40/strict.dtd">\n'
+    '<html><head><meta name="qrichtext" content="1" /><meta charset="utf-8" /><style type="text/css">\n'
+    "p, li { white-space: pre-wrap; }\n"
+    "hr { height: 1px; border-width: 0; }\n"
+    'li.unchecked::marker { content: "\\2610"; }\n'
+    'li.checked::marker { content: "\\2612"; }\n'
+    "</style></head><body>\n"
+)
+QT_HTML_TAIL = "</body></html>"
+
+# Style declarations Qt writes on every block although they are the defaults when parsing HTML.
+DEFAULT_DECLARATIONS = frozenset(
+    [
+        "margin-left:0px",
+        "margin-right:0px",
+        "-qt-block-indent:0",
+        "text-indent:0px",
+    ]
+)
+
+# The body of an empty document as written by Qt.
+EMPTY_BODY = (
+    '<p style="-qt-paragraph-type:empty;margin-top:0px;margin-bottom:0px"><br /></p>'
+)
+
+BODY_PATTERN = re.compile(r"<body[^>]*>\n?(.*)</body>", re.DOTALL)
+STYLE_PATTERN = re.compile(r' style="([^"]*)"')
+EMPTY_SPAN_PATTERN = re.compile(r"<span>([^<]*)</span>")
+ADJACENT_SPANS_PATTERN = re.compile(r'<span style="([^"]*)">([^<]*)</span><span style="\1">')
+
+
+def canonicalize_html(html: str) -> str:
+    """Returns the canonical, minified form of an HTML document written by QTextEdit.
+
+    The invariant DOCTYPE, meta and style head is stripped, default style declarations
+    are dropped and adjacent spans with the same style are merged. An empty document
+    becomes an empty string. Use restore_html to get a complete document back.
+    """
+    if not html:
+        return ""
+    match = BODY_PATTERN.search(html)
+    if not match:
+        return html
+
+    body = STYLE_PATTERN.sub(_minify_style, match.group(1))
+    body = EMPTY_SPAN_PATTERN.sub(r"\1", body)
+    merged = ADJACENT_SPANS_PATTERN.sub(r'<span style="\1">\2', body)
+    while merged != body:
+        body = merged
+        merged = ADJACENT_SPANS_PATTERN.sub(r'<span style="\1">\2', body)
+
+    return "" if body == EMPTY_BODY else body
+
+
+def restore_html(html: str) -> str:
+    """Returns a complete Qt HTML document for a description stored in canonical form."""
+    if not html or "<body" in html:
+        return html or ""
+    return f"{QT_HTML_HEAD}{html}{QT_HTML_TAIL}"
+
+
+def _minify_style(match: re.Match) -> str:
+    declarations = []
+    for declaration in match.group(1).split(";"):
+        name, _, value = declaration.partition(":")
+        declaration = f"{name.strip()}:{value.strip()}"
+        if value and declaration not in DEFAULT_DECLARATIONS:
+            declarations.append(declaration)
+    return f' style="{";".join(declarations)}"' if declarations else ""
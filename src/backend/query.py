@@ -0,0 +1,151 @@
+import re
+from datetime import date, timedelta
+from enum import Enum
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple, Type
+
+from backend.fieldindex import Criterion, equals
+from backend.models import EmploymentType, InterviewType, WorkLocation
+from backend.schema import INTERVIEWS_TABLE, ROLES_TABLE
+
+# A `key:value` pair, the value may be quoted, or a word or a quoted phrase.
+TOKEN_PATTERN = re.compile(r'(?:([\w-]+):)?(?:"([^"]*)"?|(\S+))')
+RELATIVE_DATE_PATTERN = re.compile(r"([+-]\d+)d")
+LIST_INDEX_PATTERN = re.compile(r"\[\d+\]")
+
+# The fields of the nested company documents holding the rows of each table.
+TABLE_FIELDS = {ROLES_TABLE: "roles", INTERVIEWS_TABLE: "roles.interviews"}
+
+
+class QueryError(ValueError):
+    """Error in a value of a search query."""
+
+
+class ScanFilter(NamedTuple):
+    """Condition met by a company with a field containing the value, as flattened by flatten_dict
+    without the list indexes."""
+
+    field: str
+    value: str
+
+    def matches(self, leaves: Iterable[Tuple[str, str]]) -> bool:
+        """Returns whether a field of the company contains the value, ignoring case, given the
+        (key, value) leaves of the company, as yielded by iter_leaves."""
+        value = self.value.lower()
+        return any(
+            value in leaf_value.lower() for key, leaf_value in leaves if get_field(key) == self.field
+        )
+
+
+class QueryPlan(NamedTuple):
+    """Plan of a search query.
+
+    The companies are first looked up by the criteria in the indexes, then the ones found are
+    scanned for the filters and the plain text terms.
+    """
+
+    criteria: Tuple[Criterion, ...] = ()
+    filters: Tuple[ScanFilter, ...] = ()
+    terms: Tuple[str, ...] = ()
+
+    @property
+    def search_terms(self) -> Tuple[str, ...]:
+        """Returns the texts searched by scanning, the ones to highlight in the results."""
+        return tuple(scan_filter.value for scan_filter in self.filters) + self.terms
+
+
+def get_field(key: str) -> str:
+    """Returns the field of a flatten_dict key, which is the key without the list indexes."""
+    return LIST_INDEX_PATTERN.sub("", key)
+
+
+def get_criterion_field(criterion: Criterion) -> str:
+    """Returns the field of the nested company documents a criterion is on."""
+    return f"{TABLE_FIELDS[criterion.table]}.{criterion.field}"
+
+
+def parse_query(text: str, today: Optional[date] = None) -> QueryPlan:
+    """Parse a search query into a plan.
+
+    The query is made of plain text words or quoted phrases, which all have to be found, and of
+    `key:value` conditions, for example `type:"Code technical" after:2026-01-01 location:remote
+    name:acme`. The dates of `after:` and `before:` are included. Keys which are not known are
+    searched as plain text.
+    """
+    today = today or date.today()
+    criteria, filters, terms = [], [], []
+    for match in TOKEN_PATTERN.finditer(text):
+        key, quoted_value, value = match.groups()
+        value = quoted_value if quoted_value is not None else value
+        key = key.lower() if key else None
+        if key in CRITERIA:
+            criteria.append(CRITERIA[key](value, today))
+        elif key in FILTERS:
+            filters.append(ScanFilter(FILTERS[key], value))
+        elif value:
+            terms.append(f"{match.group(1)}:{value}" if key else value)
+    return QueryPlan(tuple(criteria), tuple(filters), tuple(terms))
+
+
+def parse_date(value: str, today: date) -> date:
+    """Parse an ISO date, `today` or a number of days relative to today, like `+7d`."""
+    if value.lower() == "today":
+        return today
+    relative_match = RELATIVE_DATE_PATTERN.fullmatch(value)
+    if relative_match:
+        return today + timedelta(days=int(relative_match.group(1)))
+    try:
+        return date.fromisoformat(value)
+    except ValueError as error:
+        raise QueryError(f"Not a date: {value}") from error
+
+
+def parse_enum(enum: Type[Enum], value: str) -> Enum:
+    """Parse an enum member by its value or its name, ignoring case, spaces and punctuation."""
+    normalized = _normalize(value)
+    for member in enum:
+        if normalized in (_normalize(member.value), _normalize(member.name)):
+            return member
+    raise QueryError(
+        f"Not one of {', '.join(member.value for member in enum)}: {value}"
+    )
+
+
+def _normalize(value: str) -> str:
+    return re.sub(r"[\W_]", "", value).lower()
+
+
+def _after(table: str, field: str) -> Callable[[str, date], Criterion]:
+    return lambda value, today: Criterion(
+        table, field, low=parse_date(value, today)
+    )
+
+
+def _before(table: str, field: str) -> Callable[[str, date], Criterion]:
+    return lambda value, today: Criterion(
+        table, field, high=parse_date(value, today)
+    )
+
+
+def _equals(table: str, field: str, enum: Type[Enum]) -> Callable[[str, date], Criterion]:
+    return lambda value, _: equals(table, field, parse_enum(enum, value))
+
+
+# Keys of the conditions evaluated with the indexes.
+CRITERIA: Dict[str, Callable[[str, date], Criterion]] = {
+    "after": _after(ROLES_TABLE, "applied_date"),
+    "before": _before(ROLES_TABLE, "applied_date"),
+    "location": _equals(ROLES_TABLE, "work_location", WorkLocation),
+    "employment": _equals(ROLES_TABLE, "employment_type", EmploymentType),
+    "type": _equals(INTERVIEWS_TABLE, "type", InterviewType),
+    "interview-after": _after(INTERVIEWS_TABLE, "date"),
+    "interview-before": _before(INTERVIEWS_TABLE, "date"),
+}
+
+# Keys of the conditions evaluated by scanning, with the field they search.
+FILTERS: Dict[str, str] = {
+    "name": "name",
+    "website": "website",
+    "title": "roles.title",
+    "recruiter": "recruiters.name",
+    "interviewer": "roles.interviews.interviewers.name",
+}
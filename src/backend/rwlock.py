@@ -0,0 +1,60 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class ReadWriteLock:
+    """Lock held by many readers together or by one writer alone.
+
+    Waiting writers go before new readers, so a stream of reads does not starve the writes.
+    The lock is reentrant: a thread holding it can take it again for reading, and the writer
+    can take it again for writing. A reader cannot take it for writing.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._writes = 0
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        """Hold the lock for reading in the block."""
+        thread = threading.get_ident()
+        with self._condition:
+            if self._writer != thread and thread not in self._readers:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+            self._readers[thread] = self._readers.get(thread, 0) + 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers[thread] -= 1
+                if not self._readers[thread]:
+                    del self._readers[thread]
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Hold the lock for writing in the block."""
+        thread = threading.get_ident()
+        with self._condition:
+            if self._writer != thread:
+                if thread in self._readers:
+                    raise RuntimeError("A reader cannot take the lock for writing")
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+                self._waiting_writers -= 1
+                self._writer = thread
+            self._writes += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writes -= 1
+                if not self._writes:
+                    self._writer = None
+                    self._condition.notify_all()
@@ -0,0 +1,125 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+COMPANIES_TABLE = "companies"
+ROLES_TABLE = "roles"
+INTERVIEWS_TABLE = "interviews"
+PERSONS_TABLE = "persons"
+
+TABLES = (COMPANIES_TABLE, ROLES_TABLE, INTERVIEWS_TABLE, PERSONS_TABLE)
+
+# The nested list fields of each table's documents, with the table of the nested documents
+# and the foreign key the rows of that table use to refer to their parent.
+CHILDREN: Dict[str, Dict[str, Tuple[str, str]]] = {
+    COMPANIES_TABLE: {
+        "recruiters": (PERSONS_TABLE, "company_uuid"),
+        "roles": (ROLES_TABLE, "company_uuid"),
+    },
+    ROLES_TABLE: {"interviews": (INTERVIEWS_TABLE, "role_uuid")},
+    INTERVIEWS_TABLE: {"interviewers": (PERSONS_TABLE, "interview_uuid")},
+    PERSONS_TABLE: {},
+}
+
+FOREIGN_KEYS = ("company_uuid", "role_uuid", "interview_uuid")
+
+# Rows of a table, in insertion order, keyed by (table, uuid of their parent).
+ChildRows = Mapping[Tuple[str, str], List[Tuple[int, dict]]]
+
+
+def split_document(
+    table: str,
+    document: dict,
+    foreign_key: Optional[str] = None,
+    parent_uuid: Optional[str] = None,
+) -> List[Tuple[str, dict]]:
+    """Splits a nested document into (table, row) pairs, parents before their children."""
+    row = {key: value for key, value in document.items() if key not in CHILDREN[table]}
+    if foreign_key:
+        row[foreign_key] = parent_uuid
+    rows = [(table, row)]
+    for field, (child_table, child_foreign_key) in CHILDREN[table].items():
+        for child in document.get(field, []):
+            rows.extend(
+                split_document(child_table, child, child_foreign_key, document["uuid"])
+            )
+    return rows
+
+
+def get_parent_uuid(row: dict) -> Optional[str]:
+    """Returns the uuid of the parent of a row, None for a company row."""
+    return next((row[key] for key in FOREIGN_KEYS if key in row), None)
+
+
+def get_child_rows(data: dict) -> ChildRows:
+    """Returns the rows of all tables grouped by their table and parent."""
+    child_rows: Dict[Tuple[str, str], List[Tuple[int, dict]]] = defaultdict(list)
+    for table in TABLES[1:]:
+        for doc_id, row in table_rows(data, table):
+            child_rows[(table, get_parent_uuid(row))].append((doc_id, row))
+    return child_rows
+
+
+def iter_descendants(
+    child_rows: ChildRows, table: str, uuid: str
+) -> Iterator[Tuple[str, int, dict]]:
+    """Yields (table, doc_id, row) of every row nested under the row with the uuid."""
+    for child_table, _ in CHILDREN[table].values():
+        for doc_id, row in child_rows.get((child_table, uuid), []):
+            yield child_table, doc_id, row
+            yield from iter_descendants(child_rows, child_table, row["uuid"])
+
+
+def assemble_document(child_rows: ChildRows, table: str, row: dict) -> dict:
+    """Returns the nested document of the row, with everything nested under it."""
+    document = {key: value for key, value in row.items() if key not in FOREIGN_KEYS}
+    for field, (child_table, _) in CHILDREN[table].items():
+        document[field] = [
+            assemble_document(child_rows, child_table, child_row)
+            for _, child_row in child_rows.get((child_table, row["uuid"]), [])
+        ]
+    return document
+
+
+def assemble_companies(
+    data: dict, company_uuids: Optional[Iterable[str]] = None, child_rows: Optional[ChildRows] = None
+) -> List[dict]:
+    """Returns the nested company documents, all of them or the ones with the uuids, with the
+    child rows of the data grouped by get_child_rows when they are not given."""
+    company_uuids = set(company_uuids) if company_uuids is not None else None
+    child_rows = get_child_rows(data) if child_rows is None else child_rows
+    return [
+        assemble_document(child_rows, COMPANIES_TABLE, row)
+        for _, row in table_rows(data, COMPANIES_TABLE)
+        if company_uuids is None or row["uuid"] in company_uuids
+    ]
+
+
+def table_rows(data: dict, table: str) -> List[Tuple[int, dict]]:
+    """Returns the (doc_id, row) pairs of a table in insertion order."""
+    return sorted(
+        ((int(doc_id), row) for doc_id, row in data.get(table, {}).items()),
+        key=lambda item: item[0],
+    )
+
+
+def get_changed_companies(before: dict, after: dict) -> Set[str]:
+    """Returns the uuids of the companies with a row which is not the same in both data."""
+    parents = {}
+    for data in (before, after):
+        for table in TABLES[1:]:
+            for row in data.get(table, {}).values():
+                parents[row["uuid"]] = get_parent_uuid(row)
+    changed = set()
+    for table in TABLES:
+        before_table, after_table = before.get(table, {}), after.get(table, {})
+        if before_table is after_table:
+            continue
+        before_rows = {row["uuid"]: row for row in before_table.values()}
+        after_rows = {row["uuid"]: row for row in after_table.values()}
+        for uuid in before_rows.keys() | after_rows.keys():
+            before_row, after_row = before_rows.get(uuid), after_rows.get(uuid)
+            if before_row is not after_row and before_row != after_row:
+                while parents.get(uuid):
+                    uuid = parents[uuid]
+                changed.add(uuid)
+    return changed
@@ -0,0 +1,47 @@
+import re
+from typing import Iterable, NamedTuple, Optional, Set, Tuple
+
+from backend.models import Company
+
+# Length of the text shown around a match.
+SNIPPET_WIDTH = 80
+
+
+class SearchMatch(NamedTuple):
+    """A field of a company which matched a search, by its flatten_dict key, with the text
+    around the match."""
+
+    path: str
+    snippet: str
+
+
+class SearchResult(NamedTuple):
+    """A company found by a search with the fields which matched."""
+
+    company: Company
+    matches: Tuple[SearchMatch, ...] = ()
+
+
+def find_match(
+    text: str, phrases: Iterable[str], words: Set[str] = frozenset()
+) -> Optional[Tuple[int, int]]:
+    """Returns the start and end of the first of the phrases in the text, ignoring case, or
+    of the first of the words when none of the phrases is found."""
+    lower_text = text.lower()
+    for phrase in phrases:
+        start = lower_text.find(phrase.lower())
+        if phrase and start != -1:
+            return start, start + len(phrase)
+    for match in re.finditer(r"\w+", lower_text):
+        if match.group() in words:
+            return match.span()
+    return None
+
+
+def get_snippet(text: str, start: int, end: int, width: int = SNIPPET_WIDTH) -> str:
+    """Returns the part of the text around a match, with ellipses where the text is cut."""
+    context = max(0, (width - (end - start)) // 2)
+    left = max(0, start - context)
+    right = min(len(text), end + context)
+    snippet = " ".join(text[left:right].split())
+    return ("…" if left > 0 else "") + snippet + ("…" if right < len(text) else "")
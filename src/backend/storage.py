@@ -0,0 +1,288 @@
+import contextlib
+import copy
+import logging
+import os
+import queue
+import threading
+import weakref
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from tinydb.middlewares import Middleware
+from tinydb.storages import Storage
+from tinydb.table import Table
+
+from backend.filelock import FileLock, get_file_stamp
+
+
+def _get_row_key(doc_id: str, row: dict) -> str:
+    return row.get("uuid", doc_id) if isinstance(row, dict) else doc_id
+
+
+def _merge_row(base_row: dict, my_row: dict, their_row: dict) -> dict:
+    """Returns a row changed by both writers with the fields each of them changed, mine when
+    both changed a field. A versioned row gets a version after both of theirs."""
+    merged = {field: value for field, value in their_row.items() if field in my_row or field not in base_row}
+    merged.update(
+        (field, value) for field, value in my_row.items() if field not in base_row or base_row[field] != value
+    )
+    if "version" in merged:
+        merged["version"] = max(their_row.get("version", 0), my_row.get("version", 0)) + 1
+    return merged
+
+
+def merge_data(base: dict, mine: dict, theirs: dict) -> dict:
+    """Returns the data of another writer with the rows changed since the base applied to it.
+
+    Rows are matched by uuid. A row inserted or changed since the base replaces the row of
+    the other writer, unless the other writer changed it too, then the fields each writer
+    changed are merged. A row removed since the base is removed when the other writer did
+    not change it. Inserted rows get new doc ids when theirs are taken.
+    """
+    merged = dict(theirs)
+    for table in mine.keys() | base.keys():
+        base_table, my_table = base.get(table, {}), mine.get(table, {})
+        if my_table is base_table:
+            continue
+        their_table = dict(theirs.get(table, {}))
+        base_rows = {_get_row_key(doc_id, row): row for doc_id, row in base_table.items()}
+        their_doc_ids = {_get_row_key(doc_id, row): doc_id for doc_id, row in their_table.items()}
+        my_keys = set()
+        for doc_id, row in my_table.items():
+            key = _get_row_key(doc_id, row)
+            my_keys.add(key)
+            base_row = base_rows.get(key)
+            if base_row is row or base_row == row:
+                continue
+            if key in their_doc_ids:
+                doc_id = their_doc_ids[key]
+                if base_row is not None and their_table[doc_id] != base_row:
+                    row = _merge_row(base_row, row, their_table[doc_id])
+            elif doc_id in their_table:
+                doc_id = str(max(int(their_doc_id) for their_doc_id in their_table) + 1)
+            their_table[doc_id] = row
+        for key, base_row in base_rows.items():
+            if key not in my_keys and key in their_doc_ids and their_table[their_doc_ids[key]] == base_row:
+                del their_table[their_doc_ids[key]]
+        merged[table] = their_table
+    return merged
+
+
+def _stop_writer(writes: queue.Queue, thread: threading.Thread):
+    """Writes the queued data and stops the writer thread."""
+    writes.put(None)
+    thread.join()
+
+
+class TransactionStorage(Storage):
+    """Storage buffering the writes of a transaction in memory.
+
+    The data is read once from the backing storage and is not copied: tables replace the
+    tables they write, and CopyOnWriteTable replaces the rows it updates, so the data read
+    from the backing storage is never changed and shares the tables and rows the
+    transaction does not change. Commit writes the final data to the backing storage in one
+    go.
+    """
+
+    def __init__(self, backing_storage: Storage):
+        self.backing_storage = backing_storage
+        self.original_data: Optional[Dict] = None
+        self.data: Optional[Dict] = None
+        self.changed = False
+
+    def read(self) -> Optional[Dict]:
+        if self.data is None:
+            self.original_data = self.backing_storage.read() or {}
+            self.data = dict(self.original_data)
+        return self.data
+
+    def write(self, data: Dict):
+        self.data = data
+        self.changed = True
+
+    def copy_rows(self, table_name: str, doc_ids: Iterable[int]):
+        """Replaces rows of a table with copies, the rows read before are not changed."""
+        data = self.read()
+        table = dict(data.get(table_name, {}))
+        for doc_id in doc_ids:
+            if str(doc_id) in table:
+                table[str(doc_id)] = copy.deepcopy(table[str(doc_id)])
+        data[table_name] = table
+
+    def changed_documents(self, table_name: str):
+        """Yields the documents of the table which were inserted or changed."""
+        original_table = (self.original_data or {}).get(table_name, {})
+        table = (self.data or {}).get(table_name, {})
+        if table is original_table:
+            return
+        for doc_id, document in table.items():
+            original_document = original_table.get(doc_id)
+            if original_document is not document and original_document != document:
+                yield document
+
+    def commit(self, validators: Dict[str, Callable[[dict], None]] = None):
+        """Validates the changed documents of the tables and writes the data."""
+        if not self.changed:
+            return
+        for table_name, validate in (validators or {}).items():
+            for document in self.changed_documents(table_name):
+                validate(document)
+        self.backing_storage.write(self.data)
+
+    def close(self):
+        pass
+
+
+class CopyOnWriteTable(Table):
+    """Table of a TransactionStorage, updating copies of the rows."""
+
+    def update(self, fields, cond=None, doc_ids=None):
+        """Updates the rows as Table.update does, after replacing them with copies."""
+        if doc_ids is None:
+            doc_ids = [document.doc_id for document in (self.search(cond) if cond is not None else self.all())]
+        self._storage.copy_rows(self.name, doc_ids)
+        return super().update(fields, doc_ids=doc_ids)
+
+
+class WriteBehindMiddleware(Middleware):
+    """Middleware keeping the data in memory and writing it to the storage in a writer thread.
+
+    The data is read from the storage once. A write replaces the data in memory, so the
+    reads after it see it at once, and queues it for the writer thread, which writes the
+    queued data in order, skipping to the last one when several are queued. The written
+    data must not be changed afterwards, as transactions do. A failed write is logged and
+    passed to on_error, the next write writes the whole data again. The queued data is
+    written when the interpreter exits without closing the storage too.
+
+    When the storage is a file, it is read and written holding a FileLock, so several
+    processes can share it. A write finding the file changed by another process merges the
+    rows it changed into the data of the file with merge_data, and reload brings the data
+    of the file into memory.
+    """
+
+    def __init__(self, storage_cls, on_error: Optional[Callable[[Exception], None]] = None):
+        super().__init__(storage_cls)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.on_error = on_error
+        self.data: Optional[Dict] = None
+        self.path: Optional[str] = None
+        self._storage_args = ((), {})
+        # The data of the file when it was last read or written by this process, and its stamp
+        # then, which is None when the file has data this process did not read. The tables of
+        # the data are replaced by the writes, not changed, but the data itself is changed by
+        # tables outside transactions, so a copy of it is kept.
+        self._base: Dict = {}
+        self._stamp = None
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_writer: Optional[weakref.finalize] = None
+
+    def __call__(self, *args, **kwargs):
+        self._storage_args = (args, kwargs)
+        if args and isinstance(args[0], (str, os.PathLike)):
+            self.path = os.fspath(args[0])
+        return super().__call__(*args, **kwargs)
+
+    def read(self) -> Optional[Dict]:
+        """Returns the data in memory, read from the storage the first time."""
+        if self.data is None:
+            with self._lock_file():
+                self.data = self.storage.read() or {}
+                self._base = dict(self.data)
+                self._stamp = self._get_stamp()
+        return self.data
+
+    def write(self, data: Dict):
+        """Replaces the data in memory and queues it to be written."""
+        self.data = data
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_queued, name="storage-writer", daemon=True)
+            self._thread.start()
+            self._stop_writer = weakref.finalize(self, _stop_writer, self._queue, self._thread)
+        self._queue.put(data)
+
+    def flush(self):
+        """Waits until the queued data is written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def changed_on_disk(self) -> bool:
+        """Returns whether the file has data which was not read into memory."""
+        return self.path is not None and (self._stamp is None or self._get_stamp() != self._stamp)
+
+    def reload(self) -> Dict:
+        """Writes the queued data, then replaces the data in memory with the data of the file.
+
+        The rows of a write which failed are merged into the data of the file, to be written
+        again with the next write. No write may be called before this returns.
+        """
+        self.flush()
+        with self._lock_file():
+            theirs = self._read_changed_file()
+            self._stamp = self._get_stamp()
+        self.data = merge_data(self._base, self.read(), theirs)
+        self._base = theirs
+        return self.data
+
+    @contextlib.contextmanager
+    def locked(self) -> Iterator[Dict]:
+        """Writes the queued data, then holds the lock of the file in the block, yielding the
+        data of the file, which the other processes do not write until the block ends."""
+        self.flush()
+        with self._lock_file():
+            yield self._read_changed_file()
+
+    def close(self):
+        """Writes the queued data, stops the writer thread and closes the storage."""
+        if self._thread is not None:
+            self._stop_writer()
+            self._thread = None
+        self.storage.close()
+
+    def _write_queued(self):
+        while True:
+            queued = [self._queue.get()]
+            while not self._queue.empty():
+                queued.append(self._queue.get_nowait())
+            data = [item for item in queued if item is not None]
+            if data:
+                try:
+                    self._write_file(data[-1])
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    self.logger.error("Writing the data failed: %s", error)
+                    if self.on_error:
+                        self.on_error(error)
+            for _ in queued:
+                self._queue.task_done()
+            if len(data) < len(queued):
+                return
+
+    def _write_file(self, data: Dict):
+        with self._lock_file():
+            stamp = self._get_stamp()
+            if self.path is None or stamp is not None and stamp == self._stamp:
+                self.storage.write(data)
+                self._stamp = self._get_stamp()
+            elif stamp is None:
+                self._read_changed_file()
+                self.storage.write(data)
+                self._stamp = self._get_stamp()
+            else:
+                merged = merge_data(self._base, data, self._read_changed_file())
+                self.storage.write(merged)
+                self._stamp = None
+            self._base = dict(data)
+
+    def _read_changed_file(self) -> Dict:
+        """Reads the file, opening it again, as another process may have replaced it."""
+        if self.path is None:
+            return self.storage.read() or {}
+        self.storage.close()
+        args, kwargs = self._storage_args
+        self.storage = self._storage_cls(*args, **kwargs)
+        return self.storage.read() or {}
+
+    def _get_stamp(self):
+        return get_file_stamp(self.path) if self.path else None
+
+    def _lock_file(self):
+        return FileLock(self.path) if self.path else contextlib.nullcontext()
@@ -0,0 +1,148 @@
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from backend.fuzzyindex import SymmetricDeleteIndex
+
+# Weights of the fields of a company in the relevance score.
+FIELD_WEIGHTS: Dict[str, float] = {
+    "name": 5.0,
+    "title": 3.0,
+    "person": 2.0,
+    "interview": 1.5,
+    "description": 1.0,
+}
+
+# BM25 term frequency saturation and length normalization parameters.
+K1 = 1.2
+B = 0.75
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Returns the lowercase words of the text."""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def get_company_fields(
+    document: dict, get_description: Callable[[str], str]
+) -> Dict[str, List[str]]:
+    """Returns the words of each weighted field of a nested company document.
+
+    get_description returns the text of a description by its blob reference.
+    """
+    fields = {field: [] for field in FIELD_WEIGHTS}
+    fields["name"].extend(tokenize(document.get("name")))
+    people = list(document.get("recruiters", []))
+    descriptions = []
+    for role in document.get("roles", []):
+        fields["title"].extend(tokenize(role.get("title")))
+        descriptions.append(role.get("description_ref"))
+        for interview in role.get("interviews", []):
+            fields["interview"].extend(tokenize(interview.get("title")))
+            descriptions.append(interview.get("description_ref"))
+            people.extend(interview.get("interviewers", []))
+    for person in people:
+        fields["person"].extend(tokenize(person.get("name")))
+        descriptions.append(person.get("description_ref"))
+    for description_ref in descriptions:
+        if description_ref:
+            fields["description"].extend(tokenize(get_description(description_ref)))
+    return fields
+
+
+class TextIndex:
+    """Inverted index of the words of companies, ranking them by BM25F relevance.
+
+    The scores are computed from the term frequencies and field lengths kept in the index,
+    the documents are not scanned again.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, Counter]] = {}
+        self.field_lengths: Dict[str, Dict[str, int]] = {}
+        self.total_lengths: Counter = Counter()
+        self.words: Dict[str, Set[str]] = {}
+        self.dictionary: Optional[SymmetricDeleteIndex] = None
+
+    @property
+    def uuids(self) -> Iterable[str]:
+        """Returns the uuids of the indexed companies."""
+        return self.field_lengths.keys()
+
+    def add(self, uuid: str, fields: Dict[str, List[str]]):
+        """Indexes the words of each field of a company, replacing the ones indexed before."""
+        self.remove(uuid)
+        self.field_lengths[uuid] = {field: len(words) for field, words in fields.items()}
+        self.total_lengths.update(self.field_lengths[uuid])
+        self.words[uuid] = {word for words in fields.values() for word in words}
+        for field, words in fields.items():
+            for word, count in Counter(words).items():
+                if self.dictionary is not None and word not in self.postings:
+                    self.dictionary.add(word)
+                self.postings.setdefault(word, {}).setdefault(uuid, Counter())[field] = count
+
+    def remove(self, uuid: str):
+        """Removes a company from the index."""
+        field_lengths = self.field_lengths.pop(uuid, None)
+        if field_lengths is None:
+            return
+        self.total_lengths.subtract(field_lengths)
+        for word in self.words.pop(uuid):
+            del self.postings[word][uuid]
+            if not self.postings[word]:
+                del self.postings[word]
+                if self.dictionary is not None:
+                    self.dictionary.remove(word)
+
+    def set_dictionary(self, dictionary: SymmetricDeleteIndex, words: Set[str]):
+        """Uses a dictionary built apart from the index of the words which were indexed then,
+        adding the words indexed since and removing the ones which are not indexed anymore."""
+        for word in self.postings.keys() - words:
+            dictionary.add(word)
+        for word in words - self.postings.keys():
+            dictionary.remove(word)
+        self.dictionary = dictionary
+
+    def similar_words(self, word: str) -> Set[str]:
+        """Returns the indexed words within the edit distance allowed for the word, and the word.
+
+        The dictionary of the words is built on the first call, unless it was set before.
+        """
+        if self.dictionary is None:
+            self.dictionary = SymmetricDeleteIndex(self.postings)
+        return {word, *self.dictionary.lookup(word)}
+
+    def score(self, uuid: str, words: Iterable[str]) -> float:
+        """Returns the BM25F score of a company for the words."""
+        count = len(self.field_lengths)
+        field_lengths = self.field_lengths.get(uuid)
+        if not field_lengths:
+            return 0.0
+        score = 0.0
+        for word in set(words):
+            postings = self.postings.get(word, {})
+            frequencies = postings.get(uuid)
+            if not frequencies:
+                continue
+            weighted_frequency = sum(
+                FIELD_WEIGHTS[field] * frequency / self._length_norm(field, field_lengths[field], count)
+                for field, frequency in frequencies.items()
+            )
+            inverse_frequency = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            score += inverse_frequency * weighted_frequency / (K1 + weighted_frequency)
+        return score
+
+    def rank(self, uuids: Iterable[str], words: Iterable[str]) -> List[str]:
+        """Returns the uuids ordered by descending score, equal scores keep their order."""
+        words = list(words)
+        scores = {uuid: self.score(uuid, words) for uuid in uuids}
+        return sorted(scores, key=lambda uuid: -scores[uuid])
+
+    def _length_norm(self, field: str, length: int, count: int) -> float:
+        average_length = self.total_lengths[field] / count if count else 0
+        if not average_length:
+            return 1.0
+        return 1 - B + B * length / average_length
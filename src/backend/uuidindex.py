@@ -0,0 +1,92 @@
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from backend.schema import COMPANIES_TABLE, TABLES, get_parent_uuid
+
+
+class RowLocation(NamedTuple):
+    """Location of a row: its table and document id."""
+
+    table: str
+    doc_id: int
+
+    def get_row(self, data: dict) -> Optional[dict]:
+        """Returns the row at this location of the raw database data."""
+        return data.get(self.table, {}).get(str(self.doc_id))
+
+
+class UuidIndex:
+    """Index of the rows of all tables by uuid, and of the rows of the child tables by their
+    table and the uuid of their parent, in document id order."""
+
+    def __init__(self, data: dict = None):
+        self.locations: Dict[str, RowLocation] = {}
+        self.children: Dict[Tuple[str, str], List[int]] = {}
+        for table in TABLES:
+            for doc_id, row in (data or {}).get(table, {}).items():
+                self.add(RowLocation(table, int(doc_id)), row)
+
+    def get(self, uuid: str) -> Optional[RowLocation]:
+        """Returns the location of the row with the uuid, or None when it is not indexed."""
+        return self.locations.get(uuid)
+
+    def get_children(self, table: str, parent_uuid: str) -> List[int]:
+        """Returns the document ids of the rows of the table under the parent."""
+        return self.children.get((table, parent_uuid), [])
+
+    def add(self, location: RowLocation, row: dict):
+        """Indexes the row at the location, a row which is indexed already is kept once."""
+        self.locations[row["uuid"]] = location
+        if location.table != COMPANIES_TABLE:
+            doc_ids = self.children.setdefault((location.table, get_parent_uuid(row)), [])
+            position = bisect_left(doc_ids, location.doc_id)
+            if position == len(doc_ids) or doc_ids[position] != location.doc_id:
+                doc_ids.insert(position, location.doc_id)
+
+    def remove(self, location: RowLocation, row: dict):
+        """Removes the row at the location from the index."""
+        self.locations.pop(row["uuid"], None)
+        key = (location.table, get_parent_uuid(row))
+        doc_ids = self.children.get(key, [])
+        position = bisect_left(doc_ids, location.doc_id)
+        if position < len(doc_ids) and doc_ids[position] == location.doc_id:
+            del doc_ids[position]
+            if not doc_ids:
+                del self.children[key]
+
+    def is_current(self, data: dict) -> bool:
+        """Returns whether the index has as many rows as the tables of the data."""
+        return len(self.locations) == sum(len(data.get(table, {})) for table in TABLES)
+
+
+class IndexedChildRows(Mapping):
+    """The rows of the child tables of the data by their table and the uuid of their parent,
+    as get_child_rows groups them, looked up in a UuidIndex instead of grouping all rows."""
+
+    def __init__(self, index: UuidIndex, data: dict):
+        self.index = index
+        self.data = data
+
+    def __getitem__(self, key: Tuple[str, str]) -> List[Tuple[int, dict]]:
+        found = self.get(key)
+        if found is None:
+            raise KeyError(key)
+        return found
+
+    def get(self, key: Tuple[str, str], default=None):
+        """Returns the rows under the parent without raising for a parent without children."""
+        table, parent_uuid = key
+        rows = self.data.get(table, {})
+        found = [
+            (doc_id, rows[str(doc_id)])
+            for doc_id in self.index.get_children(table, parent_uuid)
+            if str(doc_id) in rows
+        ]
+        return found or default
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return iter(self.index.children)
+
+    def __len__(self) -> int:
+        return len(self.index.children)
@@ -1,12 +1,12 @@
 import logging
-from typing import List
+from typing import List, Optional
 
 from PySide6.QtCore import QModelIndex
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QTableView, QMenu
 from pydantic import ValidationError
 
-from backend.data_service import DataService
+from backend.data_service import DataService, StaleCompanyError
 from backend.htmlextractor import get_html_text
 from backend.models import Company, Role
 from gui.basetreemodel import BaseTreeModel
@@ -21,6 +21,7 @@ from gui.guiutils import (
     ADD_ICON,
     translate_validation_error,
     show_error_dialog,
+    keep_company_version,
 )
 from gui.personstablemodel import create_person_table_view, set_person_table_model
 from gui.personwindow import PersonWindow
@@ -34,14 +35,17 @@ VISIBLE_COLUMNS_COUNT = 5
 class CompanyWindow(QDialog):
     """Company edit window."""
 
-    def __init__(self, company: Company = None):
+    def __init__(self, company: Optional[Company], data_service: DataService):
         super().__init__()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.setWindowTitle("Company Details")
         self.resize(MAIN_WINDOW_WIDTH, 600)
 
-        self.data_service = DataService()
-        self.company = company
+        self.data_service = data_service
+        self.company = company.model_copy(deep=True) if company else None
+        if self.company:
+            self.company.recruiters = self.data_service.load_descriptions(self.company.recruiters)
+            self.company.roles = self.data_service.load_descriptions(self.company.roles)
 
         vertical = QVBoxLayout()
 
@@ -57,7 +61,7 @@ class CompanyWindow(QDialog):
         vertical.addWidget(recruiters_label)
 
         self.recruiters_table, self.recruiters_model = create_person_table_view(
-            get_attr(company, "recruiters", []), self, MAIN_WINDOW_WIDTH
+            get_attr(self.company, "recruiters", []), self, MAIN_WINDOW_WIDTH
         )
         self.recruiters_table.customContextMenuRequested.connect(
             self._open_context_menu
@@ -127,7 +131,7 @@ class CompanyWindow(QDialog):
 
     def _open_recruiter_window(self, index: QModelIndex):
         item_data = self.recruiters_model.get_item(index).item_data
-        recruiter_window = PersonWindow(item_data, self.company)
+        recruiter_window = PersonWindow(item_data, self.company, self.data_service)
         if recruiter_window.exec():
             self._set_recruiter_table_model()
 
@@ -137,11 +141,12 @@ class CompanyWindow(QDialog):
             f"Are you sure you want to delete recruiter: {item_data[0]} {item_data[1]}?",
             self,
         ):
-            self.data_service.delete_recruiter(item_data[5], self.company.uuid)
+            with keep_company_version(self.data_service, self.company):
+                self.data_service.delete_recruiter(item_data[5], self.company.uuid)
+            self.company.recruiters = [p for p in self.company.recruiters if p.uuid != item_data[5]]
             self._set_recruiter_table_model()
 
     def _set_recruiter_table_model(self):
-        self.company = self.data_service.get_company_by_uuid(self.company.uuid)
         set_person_table_model(self.company.recruiters, self.recruiters_table, self)
 
     def _cancel(self):
@@ -162,7 +167,8 @@ class CompanyWindow(QDialog):
             self.company.website = self.website_value.text().strip()
 
             if is_new_company:
-                self.data_service.insert_company(self.company)
+                with keep_company_version(self.data_service, self.company):
+                    self.data_service.insert_company(self.company)
             else:
                 self.data_service.update_company(self.company)
             return True
@@ -170,6 +176,14 @@ class CompanyWindow(QDialog):
             self.logger.error("Saving company validation error: %s", e)
             show_error_dialog(self, "Validation Error", translate_validation_error(e))
             return False
+        except StaleCompanyError as e:
+            self.logger.error("Saving stale company: %s", e)
+            show_error_dialog(
+                self,
+                "Changed Company",
+                "The company was changed since this window was opened, open it again to edit it.",
+            )
+            return False
 
 
 class RolesTableModel(BaseTreeModel):
@@ -1,10 +1,35 @@
-from PySide6.QtCore import QSize
-from PySide6.QtGui import QAction, QIcon, QClipboard
+from typing import Callable
+
+from PySide6.QtCore import QSize, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QAction, QIcon, QGuiApplication
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QTextEdit, QToolBar, QMessageBox
-from markdown import markdown
 
+from backend.markdownrenderer import render_markdown
+from backend.qthtml import restore_html
 from gui.guiutils import MD_IMPORT, MD_ADD, RESET_ICON
 
+# Pastes larger than this are rendered in a worker thread to keep the GUI responsive.
+LARGE_PASTE_SIZE = 20_000
+
+
+class MarkdownRenderSignals(QObject):
+    """Signals of a MarkdownRenderTask."""
+
+    rendered = Signal(str)
+
+
+class MarkdownRenderTask(QRunnable):
+    """Renders Markdown in the thread pool."""
+
+    def __init__(self, source: str):
+        super().__init__()
+        self.source = source
+        self.signals = MarkdownRenderSignals()
+
+    def run(self):
+        """Renders the Markdown and emits the HTML."""
+        self.signals.rendered.emit(render_markdown(self.source))
+
 
 class DescriptionTextEdit(QWidget):
     """A widget that contains a QTextEdit and a QToolBar for text editing."""
@@ -16,8 +41,8 @@ class DescriptionTextEdit(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)  # Remove layout margins
         layout.setSpacing(0)  # Remove space between widgets
 
-        # Create a QTextEdit
-        self.text_edit = QTextEdit(text)
+        # Create a QTextEdit, descriptions are stored in canonical form
+        self.text_edit = QTextEdit(restore_html(text))
 
         # Create a QToolBar and add an action to it
         self.toolbar = QToolBar("Text Actions")
@@ -30,6 +55,8 @@ class DescriptionTextEdit(QWidget):
             QToolButton { padding: 0px; margin: 0px; }
         """
         )  # Adjust toolbar and button padding
+        self.render_task = None
+        self.apply_rendered_html = None
         md_import_action = QAction(QIcon(MD_IMPORT), "Clipboard Markdown", self)
         md_import_action.triggered.connect(self.md_import_action_triggered)
         self.toolbar.addAction(md_import_action)
@@ -49,22 +76,31 @@ class DescriptionTextEdit(QWidget):
 
     def md_import_action_triggered(self):
         """Import Markdown from Clipboard"""
-        clipboard = QClipboard()
-        clipboard_text = clipboard.text()
-        if clipboard_text:
-            html_text = markdown(clipboard.text())
-            self.text_edit.setHtml(markdown(html_text))
-        else:
-            QMessageBox.warning(self, "Warning", "No text in Clipboard")
+        self._render_clipboard(self.text_edit.setHtml)
 
     def md_add_action_triggered(self):
         """Add Markdown from Clipboard"""
-        clipboard = QClipboard()
+        self._render_clipboard(self.text_edit.append)
+
+    def _render_clipboard(self, apply_html: Callable[[str], None]):
+        clipboard = QGuiApplication.clipboard()
         clipboard_text = clipboard.text()
-        if clipboard_text:
-            self.text_edit.append(markdown(clipboard.text()))
-        else:
+        if not clipboard_text:
             QMessageBox.warning(self, "Warning", "No text in Clipboard")
+        elif len(clipboard_text) < LARGE_PASTE_SIZE:
+            apply_html(render_markdown(clipboard_text))
+        elif not self.render_task:
+            self.toolbar.setEnabled(False)
+            self.apply_rendered_html = apply_html
+            self.render_task = MarkdownRenderTask(clipboard_text)
+            self.render_task.signals.rendered.connect(self._render_task_finished)
+            QThreadPool.globalInstance().start(self.render_task)
+
+    def _render_task_finished(self, html: str):
+        self.apply_rendered_html(html)
+        self.render_task = None
+        self.apply_rendered_html = None
+        self.toolbar.setEnabled(True)
 
     def reset_action_triggered(self):
         """Reset the QTextEdit"""
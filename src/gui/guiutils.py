@@ -1,3 +1,5 @@
+from contextlib import contextmanager
+
 from PySide6.QtGui import QPalette
 from PySide6.QtWidgets import (
     QWidget,
@@ -11,6 +13,8 @@ from PySide6.QtWidgets import (
 )
 from pydantic import ValidationError
 
+from backend.models import Company
+
 ADD_ICON = ":/images/add.png"
 EDIT_ICON = ":/images/edit.png"
 DELETE_ICON = ":/images/delete.png"
@@ -78,6 +82,25 @@ def verify_delete_row(message: str, parent: QWidget) -> bool:
     )
 
 
+@contextmanager
+def keep_company_version(data_service, company: Company):
+    """Sets the version of the company to the one written by the data service in the block.
+
+    The models of the data service are shared, so the windows change deep copies of them. A
+    window keeps the version of its copy current with its own writes, so it can still update
+    the company after writing its rows.
+    """
+    events = []
+    unsubscribe = data_service.subscribe(events.extend)
+    try:
+        yield
+    finally:
+        unsubscribe()
+    for event in events:
+        if event.company_uuid == company.uuid and event.company_version is not None:
+            company.version = event.company_version
+
+
 def translate_validation_error(error: ValidationError) -> str:
     """Translates a validation error to a string."""
     msg_parts = []
@@ -34,16 +34,19 @@ VISIBLE_COLUMNS_COUNT = 5
 class InterviewWindow(QDialog):
     """Interview edit window."""
 
-    def __init__(self, item_data: list, company: Company):
+    def __init__(self, item_data: list, company: Company, data_service: DataService):
         super().__init__()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.setWindowTitle("Interview Details")
         self.resize(MAIN_WINDOW_WIDTH, 600)
 
-        self.data_service = DataService()
-        self.company = company
-        self.interview = self._find_interview(item_data[3], company)
-        self.role = self._find_role(item_data[3], company)
+        self.data_service = data_service
+        self.company = company.model_copy(deep=True)
+        self.interview = self._find_interview(item_data[3], self.company)
+        self.role = self._find_role(item_data[3], self.company)
+        if self.interview:
+            [self.interview] = self.data_service.load_descriptions([self.interview])
+            self.interview.interviewers = self.data_service.load_descriptions(self.interview.interviewers)
 
         vertical = QVBoxLayout()
 
@@ -129,7 +132,7 @@ class InterviewWindow(QDialog):
 
     def _open_interviewer_window(self, index: QModelIndex):
         item_data = self.interviewers_model.get_item(index).item_data
-        interviewer_window = PersonWindow(item_data, self.company, self.interview)
+        interviewer_window = PersonWindow(item_data, self.company, self.data_service, self.interview)
         if interviewer_window.exec():
             self._set_interviewer_table_model()
 
@@ -140,11 +143,10 @@ class InterviewWindow(QDialog):
             self,
         ):
             self.data_service.delete_interviewer(item_data[5], self.interview.uuid)
+            self.interview.interviewers = [p for p in self.interview.interviewers if p.uuid != item_data[5]]
             self._set_interviewer_table_model()
 
     def _set_interviewer_table_model(self):
-        self.company = self.data_service.get_company_by_uuid(self.company.uuid)
-        self.interview = self._find_interview(self.interview.uuid, self.company)
         set_person_table_model(
             self.interview.interviewers, self.interviewers_table, self
         )
@@ -190,14 +192,15 @@ class InterviewWindow(QDialog):
                     type=type_value,
                     date=date_value,
                 )
+                self.interview.description = self.description_value.toHtml()
+                self.data_service.add_interview(self.role.uuid, self.interview)
                 self.role.interviews.append(self.interview)
             else:
                 self.interview.title = title_value
                 self.interview.type = type_value
                 self.interview.date = date_value
-
-            self.interview.description = self.description_value.toHtml()
-            self.data_service.update_company(self.company)
+                self.interview.description = self.description_value.toHtml()
+                self.data_service.update_interview(self.interview)
             return True
         except ValidationError as e:
             self.logger.error("Saving interview validation error: %s", e)
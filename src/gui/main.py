@@ -12,6 +12,7 @@ def main():
     app = QApplication(sys.argv)
     app.setAttribute(Qt.ApplicationAttribute.AA_DontShowIconsInMenus, False)
     app.setWindowIcon(QIcon(":/images/nextjob.png"))
+    app.setOrganizationName("Nextjob")
     app.setApplicationName("Nextjob")
     app.setApplicationDisplayName("Next Job")
     app.setDesktopFileName("Nextjob.desktop")
@@ -1,8 +1,10 @@
+import re
+import threading
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from PySide6.QtCore import QModelIndex, Qt
-from PySide6.QtGui import QIcon, QAction, QFont, QColor
+from PySide6.QtCore import QModelIndex, QObject, QSettings, Qt, QTimer, Signal
+from PySide6.QtGui import QIcon, QAction, QFont, QColor, QKeySequence
 from PySide6.QtWidgets import (
     QMainWindow,
     QTreeView,
@@ -18,14 +20,18 @@ from PySide6.QtWidgets import (
     QMessageBox,
 )
 
+from backend.changes import ChangeEvent, ChangeType, get_company_uuids
 from backend.data_service import DataService
 from backend.models import Company, Role, Interview
+from backend.query import QueryError
+from backend.searchresult import SearchMatch, SearchResult
 from gui.basetreemodel import BaseTreeModel
 from gui.companywindow import CompanyWindow, EDIT_ICON, DELETE_ICON, ADD_ICON
-from gui.guiutils import verify_delete_row, SEARCH_ICON, RESET_ICON, is_dark_theme
+from gui.guiutils import verify_delete_row, show_error_dialog, SEARCH_ICON, RESET_ICON, is_dark_theme
 from gui.interviewwindow import InterviewWindow
 from gui.rolewindow import RoleWindow
 from gui.treeitem import TreeItem
+from gui.viewstate import TreeViewState
 
 MAIN_WINDOW_HEIGHT = 800
 
@@ -33,6 +39,11 @@ MAIN_WINDOW_WIDTH = 1200
 
 VISIBLE_COLUMNS_COUNT = 3
 
+HEADERS = ["Title", "Details", "Recruiter(s), Interviewer(s)"]
+
+# Milliseconds between the checks of the database file for changes of other processes.
+EXTERNAL_CHANGES_INTERVAL = 2000
+
 
 class RowType(Enum):
     """Enum to represent type of row."""
@@ -42,6 +53,35 @@ class RowType(Enum):
     INTERVIEW = "INTERVIEW"
 
 
+class DataWriteSignals(QObject):
+    """Signals of the writes of the data service, emitted from its writer thread."""
+
+    failed = Signal(str)
+
+
+class DataChangeSignals(QObject):
+    """Signals of the change events of a data service, received in the thread of the receivers
+    whichever thread wrote the changes."""
+
+    changed = Signal(list)
+    inserted = Signal(str, str)
+    updated = Signal(str, str)
+    deleted = Signal(str, str)
+    companies_changed = Signal(list)
+
+    def __init__(self, data_service: DataService, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.unsubscribe = data_service.subscribe(self._emit)
+
+    def _emit(self, events: List[ChangeEvent]):
+        self.changed.emit(events)
+        signals = {ChangeType.INSERTED: self.inserted, ChangeType.UPDATED: self.updated,
+                   ChangeType.DELETED: self.deleted}
+        for event in events:
+            signals[event.change_type].emit(event.table, event.uuid)
+        self.companies_changed.emit(get_company_uuids(events))
+
+
 class MainWindow(QMainWindow):
     """Main window of GUI"""
 
@@ -54,25 +94,96 @@ class MainWindow(QMainWindow):
         self.view = QTreeView()
         self.view.setAlternatingRowColors(True)
         self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.view.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
         self.view.setAllColumnsShowFocus(True)
         self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.view.doubleClicked.connect(self._on_row_double_clicked)
         self.view.customContextMenuRequested.connect(self._open_context_menu)
+        self.view_state = TreeViewState(self.view)
+        self.view_state.load(QSettings())
+        delete_action = QAction(QIcon(DELETE_ICON), "Delete Selected", self.view)
+        delete_action.setShortcut(QKeySequence(QKeySequence.StandardKey.Delete))
+        delete_action.triggered.connect(self._delete_selected_rows)
+        self.view.addAction(delete_action)
         self.setCentralWidget(self.view)
         self.addDockWidget(Qt.DockWidgetArea.TopDockWidgetArea, self._get_dock_widget())
         self._config_menu(self.menuBar())
         self.setStatusBar(self._get_status_bar())
 
-        self.headers = ["Title", "Details", "Recruiter(s), Interviewer(s)"]
-        self.data_service = DataService()
+        write_signals = DataWriteSignals(self)
+        write_signals.failed.connect(self._show_write_error)
+        self.data_service = DataService(
+            on_write_error=lambda error: write_signals.failed.emit(str(error))
+        )
+        self.change_signals = DataChangeSignals(self.data_service, self)
+        self.change_signals.companies_changed.connect(self._update_companies)
+        self.change_signals.changed.connect(self._update_history_actions)
+        self.change_signals.deleted.connect(lambda _table, uuid: self.view_state.forget(uuid))
+        self.showing_search_results = False
         self._set_tree_view_model()
+        self.external_changes_timer = QTimer(self)
+        self.external_changes_timer.timeout.connect(self._reload_external_changes)
+        self.external_changes_timer.start(EXTERNAL_CHANGES_INTERVAL)
+
+    def closeEvent(self, event):  # pylint: disable=invalid-name
+        """Writes the pending changes and the state of the tree before the window closes."""
+        self.view_state.capture()
+        self.view_state.save(QSettings())
+        self.external_changes_timer.stop()
+        self.change_signals.unsubscribe()
+        self.data_service.close()
+        super().closeEvent(event)
+
+    def _reload_external_changes(self):
+        changed = self.data_service.reload_external_changes()
+        if changed:
+            self.status_label.setText(f"Reloaded {len(changed)} company(s) changed outside")
+
+    def _update_companies(self, company_uuids: List[str]):
+        """Updates the rows of the changed companies, the search results are searched again."""
+        if self.showing_search_results:
+            self._search(self.search_value.text())
+            return
+        companies = self.data_service.get_companies()
+        self.view_state.capture()
+        self.tree_model.update_companies(companies, set(company_uuids))
+        self.view_state.restore()
+        self.companies_count.setText(f"Companies: {len(companies)}")
+
+    def _update_history_actions(self):
+        self.undo_action.setEnabled(self.data_service.history.can_undo)
+        self.redo_action.setEnabled(self.data_service.history.can_redo)
+
+    def _undo(self):
+        if self.data_service.history.undo():
+            self.status_label.setText("Undone")
+
+    def _redo(self):
+        if self.data_service.history.redo():
+            self.status_label.setText("Redone")
+
+    def _expand_company(self, company_uuid: str):
+        index = self.tree_model.get_index(company_uuid)
+        if index.isValid():
+            self.view.expandRecursively(index, -1)
+
+    def _show_write_error(self, message: str):
+        self.status_label.setText("Saving failed")
+        show_error_dialog(self, "Saving Error", f"The changes could not be saved: {message}")
 
     def _open_context_menu(self, point):
         index = self.view.indexAt(point)
         context_menu = QMenu()
-        if index.isValid():
+        selected_rows = self.view.selectionModel().selectedRows()
+        if len(selected_rows) > 1 and index.siblingAtColumn(0) in selected_rows:
+            context_menu.addAction(
+                QIcon(DELETE_ICON),
+                f"Delete {len(selected_rows)} Selected Rows",
+                self._delete_selected_rows,
+            )
+        elif index.isValid():
             item = self.tree_model.get_item(index)
             row_type = item.item_data[4]
             match row_type:
@@ -134,118 +245,110 @@ class MainWindow(QMainWindow):
     def _delete_row(self, index: QModelIndex):
         item_data = self.tree_model.get_item(index).item_data
         row_type = item_data[4]
-        company_index: QModelIndex
-        row: int
-        column: int
+        if not verify_delete_row(f"Are you sure you want to delete {item_data[0]}?", self):
+            return
         match row_type:
             case RowType.COMPANY:
-                row = index.row()
-                column = index.column()
-                if verify_delete_row(
-                    f"Are you sure you want to delete {item_data[0]}?", self
-                ):
-                    self.data_service.delete_company(item_data[3])
-                else:
-                    return
+                self.data_service.delete_company(item_data[3])
             case RowType.ROLE:
-                company_index = index.parent()
-                row = company_index.row()
-                column = company_index.column()
-                if verify_delete_row(
-                    f"Are you sure you want to delete {item_data[0]}?", self
-                ):
-                    self.data_service.delete_role(item_data[3])
-                else:
-                    return
+                company_uuid = self.tree_model.get_item(index.parent()).data(3)
+                self.data_service.delete_role(item_data[3])
+                self._expand_company(company_uuid)
             case _:
-                company_index = index.parent().parent()
-                row = company_index.row()
-                column = company_index.column()
-                if verify_delete_row(
-                    f"Are you sure you want to delete {item_data[0]}?", self
-                ):
-                    self.data_service.delete_interview(item_data[3])
-                else:
-                    return
+                company_uuid = self.tree_model.get_item(index.parent().parent()).data(3)
+                self.data_service.delete_interview(item_data[3])
+                self._expand_company(company_uuid)
+
+    def _delete_selected_rows(self):
+        selected_rows = self.view.selectionModel().selectedRows()
+        if len(selected_rows) <= 1:
+            if selected_rows:
+                self._delete_row(selected_rows[0])
+            return
+
+        selected_items = [self.tree_model.get_item(index) for index in selected_rows]
+        # Rows under a selected row are deleted with it.
+        items = [
+            item
+            for item in selected_items
+            if not any(parent in selected_items for parent in self._parent_items(item))
+        ]
+        if not verify_delete_row(
+            f"Are you sure you want to delete {len(items)} selected rows?", self
+        ):
+            return
+
+        with self.data_service.transaction():
+            self.data_service.delete_companies(
+                item.item_data[3]
+                for item in items
+                if item.item_data[4] == RowType.COMPANY
+            )
+            for item in items:
+                match item.item_data[4]:
+                    case RowType.ROLE:
+                        self.data_service.delete_role(item.item_data[3])
+                    case RowType.INTERVIEW:
+                        self.data_service.delete_interview(item.item_data[3])
 
-        self._set_tree_view_model()
-        new_index = self.tree_model.index(row, column)
-        if row_type != RowType.COMPANY:
-            self.view.expandRecursively(new_index, -1)
+    @staticmethod
+    def _parent_items(item: TreeItem):
+        parent = item.parent()
+        while parent:
+            yield parent
+            parent = parent.parent()
 
     def _open_edit_window(self, index: QModelIndex):
         item_data = self.tree_model.get_item(index).item_data
         row_type = item_data[4]
         detail_window: QDialog
-        company_index: QModelIndex
-        row: int
-        column: int
+        company = item_data[5]
         match row_type:
             case RowType.COMPANY:
-                row = index.row()
-                column = index.column()
-                company = self.data_service.get_company_by_uuid(item_data[3])
-                detail_window = CompanyWindow(company)
+                detail_window = CompanyWindow(company, self.data_service)
             case RowType.ROLE:
-                company_index = index.parent()
-                row = company_index.row()
-                column = company_index.column()
-                company = self.data_service.get_company_by_role_uuid(item_data[3])
-                detail_window = RoleWindow(item_data, company)
+                detail_window = RoleWindow(item_data, company, self.data_service)
             case _:
-                company_index = index.parent().parent()
-                row = company_index.row()
-                column = company_index.column()
-                company = self.data_service.get_company_by_interview_uuid(item_data[3])
-                detail_window = InterviewWindow(item_data, company)
+                detail_window = InterviewWindow(item_data, company, self.data_service)
 
         if detail_window.exec() == 1:
-            self._set_tree_view_model()
-            new_index = self.tree_model.index(row, column)
-            self.view.expandRecursively(new_index, -1)
+            self._expand_company(company.uuid)
 
     def _open_new_window(self, index: Optional[QModelIndex]):
         detail_window: QDialog
         if index and index.isValid():
             item_data = self.tree_model.get_item(index).item_data
             row_type = item_data[4]
-            row: int
-            column: int
+            company = item_data[5]
             match row_type:
                 case RowType.COMPANY:
-                    row = index.row()
-                    column = index.column()
-                    company = self.data_service.get_company_by_uuid(item_data[3])
-                    detail_window = RoleWindow(item_data, company)
+                    detail_window = RoleWindow(item_data, company, self.data_service)
                 case _:
-                    company_index = index.parent()
-                    row = company_index.row()
-                    column = company_index.column()
-                    company = self.data_service.get_company_by_role_uuid(item_data[3])
-                    detail_window = InterviewWindow(item_data, company)
+                    detail_window = InterviewWindow(item_data, company, self.data_service)
             if detail_window.exec() == 1:
-                self._set_tree_view_model()
-                new_index = self.tree_model.index(row, column)
-                self.view.expandRecursively(new_index, -1)
+                self._expand_company(company.uuid)
         else:
-            detail_window = CompanyWindow(None)
-            if detail_window.exec() == 1:
-                self._set_tree_view_model()
+            detail_window = CompanyWindow(None, self.data_service)
+            detail_window.exec()
 
-    def _set_tree_view_model(self, data_model: List[Company] = None):
-        if data_model is None:
+    def _set_tree_view_model(self, search_results: List[SearchResult] = None):
+        self.showing_search_results = search_results is not None
+        if search_results is None:
             data_model: List[Company] = self.data_service.get_companies()
             self.companies_count.setText(f"Companies: {len(data_model)}")
             self.status_label.setText("Ready")
         else:
+            data_model = [result.company for result in search_results]
             self.status_label.setText(f"Search results: {len(data_model)} company(s)")
+        self.view_state.capture()
         self.tree_model = CompaniesTreeModel(
-            self.headers,
+            HEADERS,
             data_model,
             self,
-            self.search_value.text() if data_model else "",
+            {result.company.uuid: result.matches for result in search_results or []},
         )
         self.view.setModel(self.tree_model)
+        self.view_state.restore()
         self.view.setColumnWidth(0, int(MAIN_WINDOW_WIDTH * 0.37))
         self.view.setColumnWidth(1, int(MAIN_WINDOW_WIDTH * 0.25))
         self.view.setColumnWidth(2, int(MAIN_WINDOW_WIDTH * 0.37))
@@ -256,6 +359,23 @@ class MainWindow(QMainWindow):
             QIcon(ADD_ICON), "Add Company", lambda: self._open_new_window(None)
         )
 
+        edit_menu = menu_bar.addMenu("Edit")
+        self.undo_action = edit_menu.addAction("Undo", self._undo)
+        self.undo_action.setShortcut(QKeySequence(QKeySequence.StandardKey.Undo))
+        self.undo_action.setEnabled(False)
+        self.redo_action = edit_menu.addAction("Redo", self._redo)
+        self.redo_action.setShortcut(QKeySequence("Ctrl+Shift+Z"))
+        self.redo_action.setEnabled(False)
+
+        search_menu = menu_bar.addMenu("Search")
+        self.rank_action = search_menu.addAction("Rank Results by Relevance")
+        self.rank_action.setCheckable(True)
+        self.rank_action.toggled.connect(self._search_option_toggled)
+        self.fuzzy_action = search_menu.addAction("Match Similar Words")
+        self.fuzzy_action.setCheckable(True)
+        self.fuzzy_action.toggled.connect(self._fuzzy_action_toggled)
+        self.fuzzy_action.toggled.connect(self._search_option_toggled)
+
         help_menu = menu_bar.addMenu("Help")
         help_menu.addAction(
             "About",
@@ -271,6 +391,11 @@ class MainWindow(QMainWindow):
         dock.setAllowedAreas(Qt.DockWidgetArea.AllDockWidgetAreas)
         self.search_value = QLineEdit()
         self.search_value.setPlaceholderText("Search ...")
+        self.search_value.setToolTip(
+            "Search text, or filter with name:, title:, website:, recruiter:, interviewer:, "
+            "type:, location:, employment:, after:, before:, interview-after: and interview-before:, "
+            'e.g. type:"Code technical" after:2026-01-01 location:remote name:acme'
+        )
         self.search_value.textChanged.connect(self._search_text_changed)
         search_action = QAction(QIcon(SEARCH_ICON), "Search", self.search_value)
         reset_action = QAction(QIcon(RESET_ICON), "Reset", self.search_value)
@@ -311,25 +436,57 @@ class MainWindow(QMainWindow):
     def _search_action_triggered(self):
         self._search(self.search_value.text())
 
+    def _search_option_toggled(self, _checked: bool):
+        if self.search_value.text():
+            self._search(self.search_value.text())
+
+    def _fuzzy_action_toggled(self, checked: bool):
+        """Builds the dictionary of similar words in the background, not on the first search."""
+        if checked:
+            threading.Thread(
+                target=self.data_service.searcher.prepare_fuzzy_search, name="fuzzy-dictionary", daemon=True
+            ).start()
+
     def _reset_action_triggered(self):
         self.search_value.setText("")
         self._set_tree_view_model()
 
     def _search(self, text: str):
-        search_result = self.data_service.search_in_db(text)
-        self._set_tree_view_model(search_result)
-        self.view.expandAll()
+        try:
+            search_results = self.data_service.searcher.search(
+                text,
+                ranked=self.rank_action.isChecked(),
+                fuzzy=self.fuzzy_action.isChecked(),
+            )
+        except QueryError as error:
+            self.status_label.setText(str(error))
+            return
+        self._set_tree_view_model(search_results)
+        for index in self.tree_model.get_matched_parent_indexes():
+            self.view.expand(index)
 
 
 class CompaniesTreeModel(BaseTreeModel):
-    """Tree model for companies"""
+    """Tree model for companies
+
+    Each row keeps the model of its company, shared with the data service, which the edit
+    windows copy instead of querying the company again.
+    """
 
     def __init__(
-        self, headers: list, data: List[Company], parent=None, search_value: str = ""
+        self,
+        headers: list,
+        data: List[Company],
+        parent=None,
+        matches: Dict[str, Iterable[SearchMatch]] = None,
     ):
         super().__init__(headers, parent=parent)
+        self.matches = matches or {}
+        self.snippets: Dict[Tuple[str, int], List[str]] = {}
+        self.matched_items: List[TreeItem] = []
+        # The items of the rows by uuid.
+        self.items: Dict[str, TreeItem] = {}
         self.setup_model_data(data, self.root_item)
-        self.search_value = search_value
 
     def data(self, index: QModelIndex, role: int = None):
         """Customization of data formatting."""
@@ -342,22 +499,68 @@ class CompaniesTreeModel(BaseTreeModel):
                 font = QFont()
                 font.setWeight(QFont.Weight.Bold)
                 return font
-            if (
-                role == Qt.ItemDataRole.BackgroundRole
-                and self.search_value
-                and self.search_value.lower() in index.data().lower()
-            ):
-                return QColor("#9B6E59") if is_dark_theme() else QColor("#FAF691")
+            if role in (Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ToolTipRole):
+                snippets = self.snippets.get((self.get_item(index).data(3), index.column()))
+                if snippets and role == Qt.ItemDataRole.BackgroundRole:
+                    return QColor("#9B6E59") if is_dark_theme() else QColor("#FAF691")
+                if snippets:
+                    return "\n".join(snippets)
         return super().data(index, role)
 
     def setup_model_data(self, companies: List[Company], parent: TreeItem):
         """Sets up the model data."""
         for company in companies:
+            for match in self.matches.get(company.uuid, ()):
+                uuid, column = get_match_cell(company, match.path)
+                self.snippets.setdefault((uuid, column), []).append(match.snippet)
             self._insert_company(company, parent)
 
-    def _insert_company(self, company: Company, parent: TreeItem):
-        parent.insert_children(parent.child_count(), 1, VISIBLE_COLUMNS_COUNT + 2)
-        child = parent.last_child()
+    def get_matched_parent_indexes(self) -> List[QModelIndex]:
+        """Returns the indexes of the rows with matched rows under them, to be expanded."""
+        parents = {}
+        for item in self.matched_items:
+            parent = item.parent_item
+            while parent is not self.root_item:
+                parents[id(parent)] = parent
+                parent = parent.parent_item
+        return [self.createIndex(item.child_number(), 0, item) for item in parents.values()]
+
+    def _add_item(self, item: TreeItem):
+        self.items[item.data(3)] = item
+        if any((item.data(3), column) in self.snippets for column in range(VISIBLE_COLUMNS_COUNT)):
+            self.matched_items.append(item)
+
+    def _forget_items(self, item: TreeItem):
+        del self.items[item.data(3)]
+        for child in item.child_items:
+            self._forget_items(child)
+
+    def get_index(self, uuid: str) -> QModelIndex:
+        """Returns the index of the row with the uuid, an invalid index when it is not shown."""
+        item = self.items.get(uuid)
+        return self.createIndex(item.child_number(), 0, item) if item else QModelIndex()
+
+    def update_companies(self, companies: Sequence[Company], changed_uuids: Set[str]):
+        """Replaces the rows of the changed companies, the rows of the others are kept.
+
+        The companies are all the shown companies in their order, in which the companies
+        which did not change keep the order of their rows.
+        """
+        for row in reversed(range(self.root_item.child_count())):
+            item = self.root_item.child(row)
+            if item.data(3) in changed_uuids:
+                self._forget_items(item)
+                self.removeRows(row, 1)
+        for position, company in enumerate(companies):
+            if company.uuid in changed_uuids:
+                self.beginInsertRows(QModelIndex(), position, position)
+                self._insert_company(company, self.root_item, position)
+                self.endInsertRows()
+
+    def _insert_company(self, company: Company, parent: TreeItem, position: Optional[int] = None):
+        position = parent.child_count() if position is None else position
+        parent.insert_children(position, 1, VISIBLE_COLUMNS_COUNT + 3)
+        child = parent.child(position)
         interview_count = 0
         for role in company.roles:
             interview_count += len(role.interviews)
@@ -366,25 +569,28 @@ class CompaniesTreeModel(BaseTreeModel):
         child.set_data(2, ", ".join([p.name for p in company.recruiters]))
         child.set_data(3, company.uuid)
         child.set_data(4, RowType.COMPANY)
+        child.set_data(5, company)
+        self._add_item(child)
 
         for role in sorted(company.roles, key=lambda r: r.applied_date, reverse=True):
-            self._insert_role(role, child)
+            self._insert_role(role, company, child)
 
-    def _insert_role(self, role: Role, parent: TreeItem):
-        parent.insert_children(parent.child_count(), 1, VISIBLE_COLUMNS_COUNT + 2)
+    def _insert_role(self, role: Role, company: Company, parent: TreeItem):
+        parent.insert_children(parent.child_count(), 1, VISIBLE_COLUMNS_COUNT + 3)
         child = parent.last_child()
         child.set_data(0, role.title)
         child.set_data(1, f"{role.applied_date}")
         child.set_data(2, f"{role.employment_type.value}, {role.work_location.value}")
         child.set_data(3, role.uuid)
         child.set_data(4, RowType.ROLE)
+        child.set_data(5, company)
+        self._add_item(child)
 
         for interview in role.interviews:
-            self._insert_interview(interview, child)
+            self._insert_interview(interview, company, child)
 
-    @staticmethod
-    def _insert_interview(interview: Interview, parent: TreeItem):
-        parent.insert_children(parent.child_count(), 1, VISIBLE_COLUMNS_COUNT + 2)
+    def _insert_interview(self, interview: Interview, company: Company, parent: TreeItem):
+        parent.insert_children(parent.child_count(), 1, VISIBLE_COLUMNS_COUNT + 3)
         child = parent.last_child()
         child.set_data(0, f"({interview.sequence}) {interview.title}")
         child.set_data(1, f"{interview.date}, {interview.type.value}")
@@ -399,3 +605,24 @@ class CompaniesTreeModel(BaseTreeModel):
         )
         child.set_data(3, interview.uuid)
         child.set_data(4, RowType.INTERVIEW)
+        child.set_data(5, company)
+        self._add_item(child)
+
+
+# The columns of the tree showing the fields of roles and interviews, the other fields are
+# shown by their row's first column.
+ROLE_COLUMNS = {"applied_date": 1, "employment_type": 2, "work_location": 2}
+INTERVIEW_COLUMNS = {"date": 1, "type": 1, "interviewers": 2}
+MATCH_PATH_PATTERN = re.compile(r"roles\[(\d+)\]\.(?:interviews\[(\d+)\]\.)?(\w+)")
+
+
+def get_match_cell(company: Company, path: str) -> Tuple[str, int]:
+    """Returns the uuid of the row and the column of the tree showing a matched field."""
+    path_match = MATCH_PATH_PATTERN.match(path)
+    if not path_match:
+        return company.uuid, 2 if path.startswith("recruiters") else 0
+    role_index, interview_index, field = path_match.groups()
+    role = company.roles[int(role_index)]
+    if interview_index is None:
+        return role.uuid, ROLE_COLUMNS.get(field, 0)
+    return role.interviews[int(interview_index)].uuid, INTERVIEW_COLUMNS.get(field, 0)
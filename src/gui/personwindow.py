@@ -13,12 +13,14 @@ from pydantic import ValidationError
 
 from backend.data_service import DataService
 from backend.models import Company, TITLE, Person, Interview
+from backend.qthtml import restore_html
 from gui.guiutils import (
     get_line_layout,
     get_attr,
     create_save_cancel_layout,
     translate_validation_error,
     show_error_dialog,
+    keep_company_version,
 )
 
 MAIN_WINDOW_WIDTH = 700
@@ -27,7 +29,9 @@ MAIN_WINDOW_WIDTH = 700
 class PersonWindow(QDialog):
     """Person edit window."""
 
-    def __init__(self, item_data: list, company: Company, interview: Interview = None):
+    def __init__(
+        self, item_data: list, company: Company, data_service: DataService, interview: Interview = None
+    ):
         super().__init__()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.setWindowTitle(
@@ -35,8 +39,11 @@ class PersonWindow(QDialog):
         )
         self.resize(MAIN_WINDOW_WIDTH, 250)
 
+        self.data_service = data_service
         self.company = company
         self.interview = interview
+        # The person is changed in place, in the copy of the window opening this one, which
+        # loaded the descriptions of its persons.
         self.person = (
             self._find_person(item_data[5], company, interview)
             if len(item_data) > 5
@@ -65,7 +72,9 @@ class PersonWindow(QDialog):
 
         description_label = QLabel("Description:")
         vertical.addWidget(description_label)
-        self.description_value = QTextEdit(get_attr(self.person, "description"))
+        self.description_value = QTextEdit(
+            restore_html(get_attr(self.person, "description"))
+        )
         self.description_value.setMaximumHeight(100)
         vertical.addWidget(self.description_value)
 
@@ -78,26 +87,35 @@ class PersonWindow(QDialog):
 
     def _save(self):
         try:
-            data_service = DataService()
             title_value = list(TITLE)[self.title_value.currentIndex()]
             name_value = self.name_value.text().strip()
             role_value = self.role_value.text().strip()
             email_value = self.email_value.text().strip()
             description_value = self.description_value.toHtml()
             if not self.person:
-                self.person = Person(title=title_value, name=name_value)
+                person = Person(
+                    title=title_value,
+                    name=name_value,
+                    role=role_value,
+                    email=email_value,
+                    description=description_value,
+                )
                 if self.interview:
-                    self.interview.interviewers.append(self.person)
+                    self.data_service.add_person(self.interview.uuid, person)
+                    self.interview.interviewers.append(person)
                 else:
-                    self.company.recruiters.append(self.person)
+                    with keep_company_version(self.data_service, self.company):
+                        self.data_service.add_person(self.company.uuid, person)
+                    self.company.recruiters.append(person)
+                self.person = person
             else:
                 self.person.title = title_value
                 self.person.name = name_value
-            self.person.role = role_value
-            self.person.email = email_value
-            self.person.description = description_value
-
-            data_service.update_company(self.company)
+                self.person.role = role_value
+                self.person.email = email_value
+                self.person.description = description_value
+                with keep_company_version(self.data_service, self.company):
+                    self.data_service.update_person(self.person)
             self.accept()
 
         except ValidationError as e:
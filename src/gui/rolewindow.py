@@ -52,14 +52,17 @@ class RoleWindowComponents:
 class RoleWindow(QDialog):
     """Role edit window."""
 
-    def __init__(self, item_data: list, company: Company):
+    def __init__(self, item_data: list, company: Company, data_service: DataService):
         super().__init__()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.setWindowTitle("Role Details")
         self.resize(MAIN_WINDOW_WIDTH, 600)
 
-        self.company = company
-        self.role = self._find_role(item_data[3], company)
+        self.data_service = data_service
+        self.company = company.model_copy(deep=True)
+        self.role = self._find_role(item_data[3], self.company)
+        if self.role:
+            [self.role] = self.data_service.load_descriptions([self.role])
 
         vertical = QVBoxLayout()
         self.components = RoleWindowComponents()
@@ -169,7 +172,6 @@ class RoleWindow(QDialog):
 
     def _save(self):
         try:
-            data_service = DataService()
             title_value = self.components.title_value.text().strip()
             applied_date_value = date.fromisoformat(
                 self.components.applied_date_value.text().strip()
@@ -187,15 +189,16 @@ class RoleWindow(QDialog):
                     employment_type=employment_type_value,
                     work_location=work_location_value,
                 )
+                self.role.description = self.components.description_value.toHtml()
+                self.data_service.add_role(self.company.uuid, self.role)
                 self.company.roles.append(self.role)
             else:
                 self.role.title = title_value
                 self.role.applied_date = applied_date_value
                 self.role.employment_type = employment_type_value
                 self.role.work_location = work_location_value
-            self.role.description = self.components.description_value.toHtml()
-
-            data_service.update_company(self.company)
+                self.role.description = self.components.description_value.toHtml()
+                self.data_service.update_role(self.role)
             self.accept()
         except ValidationError as e:
             self.logger.error("Saving role validation error: %s", e)
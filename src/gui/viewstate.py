@@ -0,0 +1,88 @@
+from typing import List, Optional, Set
+
+from PySide6.QtCore import QItemSelection, QItemSelectionModel, QModelIndex, QPoint, QSettings
+from PySide6.QtWidgets import QAbstractItemView, QTreeView
+
+# Column of the uuids of the rows in the items of the tree models.
+UUID_COLUMN = 3
+
+SETTINGS_GROUP = "tree"
+
+
+class TreeViewState:
+    """Expanded rows, selected rows and scroll position of a tree view, kept by the uuids of
+    the rows to be restored on a new or changed model.
+
+    The expanded rows are followed as they are expanded and collapsed, so capturing the state
+    reads only the selected and the top visible rows, and restoring it looks up the kept rows
+    by uuid with get_index of the model, without walking the other rows.
+    """
+
+    def __init__(self, view: QTreeView):
+        self.view = view
+        self.expanded: Set[str] = set()
+        self.selected: List[str] = []
+        self.current: Optional[str] = None
+        self.top: Optional[str] = None
+        view.expanded.connect(lambda index: self.expanded.add(self._get_uuid(index)))
+        view.collapsed.connect(lambda index: self.expanded.discard(self._get_uuid(index)))
+
+    def capture(self):
+        """Keeps the selected rows and the top visible row of the model of the view."""
+        if self.view.model() is None:
+            return
+        selection_model = self.view.selectionModel()
+        self.selected = [self._get_uuid(index) for index in selection_model.selectedRows()]
+        self.current = self._get_uuid(selection_model.currentIndex())
+        self.top = self._get_uuid(self.view.indexAt(QPoint(0, 0)))
+
+    def restore(self):
+        """Expands, selects and scrolls to the kept rows which are in the model of the view."""
+        model = self.view.model()
+        for uuid in list(self.expanded):
+            index = model.get_index(uuid)
+            if index.isValid():
+                self.view.expand(index)
+
+        selection = QItemSelection()
+        for index in self._get_indexes(self.selected):
+            selection.select(index, index)
+        selection_model = self.view.selectionModel()
+        selection_model.select(
+            selection,
+            QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows,
+        )
+        for index in self._get_indexes([self.current]):
+            selection_model.setCurrentIndex(index, QItemSelectionModel.SelectionFlag.NoUpdate)
+        for index in self._get_indexes([self.top]):
+            self.view.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtTop)
+
+    def forget(self, uuid: str):
+        """Forgets a deleted row."""
+        self.expanded.discard(uuid)
+
+    def save(self, settings: QSettings):
+        """Writes the kept state to the settings, for the next session."""
+        settings.beginGroup(SETTINGS_GROUP)
+        settings.setValue("expanded", sorted(self.expanded))
+        settings.setValue("selected", self.selected)
+        settings.setValue("current", self.current or "")
+        settings.setValue("top", self.top or "")
+        settings.endGroup()
+
+    def load(self, settings: QSettings):
+        """Reads the state written to the settings by the last session."""
+        settings.beginGroup(SETTINGS_GROUP)
+        self.expanded = set(settings.value("expanded", [], list))
+        self.selected = settings.value("selected", [], list)
+        self.current = settings.value("current", "", str) or None
+        self.top = settings.value("top", "", str) or None
+        settings.endGroup()
+
+    def _get_indexes(self, uuids: List[Optional[str]]) -> List[QModelIndex]:
+        model = self.view.model()
+        indexes = (model.get_index(uuid) for uuid in uuids if uuid)
+        return [index for index in indexes if index.isValid()]
+
+    def _get_uuid(self, index: QModelIndex) -> Optional[str]:
+        return self.view.model().get_item(index).data(UUID_COLUMN) if index.isValid() else None
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import date
+import inspect
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from tinydb import TinyDB
+from tinydb.storages import MemoryStorage
+
+from backend.async_data_service import AsyncDataService
+from backend.companysearch import CompanySearch
+from backend.data_service import DataService
+from backend.models import Company, Role
+
+
+class TestAsyncDataService(unittest.TestCase):
+    """Testing AsyncDataService"""
+
+    @patch('backend.data_service.BlobStore')
+    @patch('backend.data_service.TinyDB')
+    def setUp(self, MockTinyDB, _MockBlobStore): # pylint: disable=arguments-differ
+        MockTinyDB.side_effect = lambda *args, **kwargs: TinyDB(storage=MemoryStorage)
+        self.data_service = DataService()
+
+    def run_with_service(self, function, max_workers=4):
+        """Runs a coroutine function with the async data service"""
+        async def run():
+            async with AsyncDataService(self.data_service, max_workers) as service:
+                return await function(service)
+        return asyncio.run(run())
+
+    def test_mirrors_data_service(self):
+        """Test every public method of DataService and of its searcher has a coroutine"""
+        for cls in (DataService, CompanySearch):
+            for name, _ in inspect.getmembers(cls, inspect.isfunction):
+                if not name.startswith("_") and name not in ("mark_stale", "reset"):
+                    self.assertTrue(inspect.iscoroutinefunction(getattr(AsyncDataService, name)), name)
+        self.assertEqual(AsyncDataService.search.__doc__, CompanySearch.search.__doc__)
+
+    def test_reads_see_writes_called_before(self):
+        """Test reads called after a write see it, and the ones called before do not"""
+        async def run(service):
+            before = service.get_companies()
+            write = service.insert_company(Company(uuid="c1", name="Acme", roles=[
+                Role(uuid="r1", title="Engineer", applied_date=date(2026, 1, 1))]))
+            after = service.get_company_by_role_uuid("r1")
+            return await asyncio.gather(before, write, after)
+
+        before, _, after = self.run_with_service(run)
+        self.assertEqual(before, ())
+        self.assertEqual(after.name, "Acme")
+
+    def test_reads_run_concurrently(self):
+        """Test reads between writes run at the same time"""
+        barrier = threading.Barrier(3, timeout=5)
+
+        async def run(service):
+            return await asyncio.gather(*(service.read(barrier.wait) for _ in range(3)))
+
+        self.assertEqual(sorted(self.run_with_service(run)), [0, 1, 2])
+
+    def test_write_waits_for_reads_called_before(self):
+        """Test a write does not start before the reads called before it end"""
+        events = []
+
+        def slow_read():
+            time.sleep(0.05)
+            events.append("read")
+
+        async def run(service):
+            await asyncio.gather(service.read(slow_read), service.write(events.append, "write"))
+
+        self.run_with_service(run)
+        self.assertEqual(events, ["read", "write"])
+
+    def test_failed_write(self):
+        """Test a failed write raises to its caller and the operations after it still run"""
+        async def run(service):
+            return await asyncio.gather(
+                service.update_role(Role(uuid="missing", title="Engineer", applied_date=date(2026, 1, 1))),
+                service.insert_company(Company(uuid="c1", name="Acme")),
+                service.get_companies(),
+                return_exceptions=True,
+            )
+
+        failed, _, companies = self.run_with_service(run)
+        self.assertIsInstance(failed, LookupError)
+        self.assertEqual([company.name for company in companies], ["Acme"])
+
+    def test_transaction(self):
+        """Test a transaction runs its calls as one write"""
+        def add(data_service):
+            data_service.insert_company(Company(uuid="c1", name="Acme"))
+            data_service.add_role("c1", Role(uuid="r1", title="Engineer", applied_date=date(2026, 1, 1)))
+            raise ValueError("rolled back")
+
+        async def run(service):
+            with self.assertRaises(ValueError):
+                await service.transaction(add)
+            return await service.get_companies()
+
+        self.assertEqual(self.run_with_service(run), ())
+
+    def test_close_closes_data_service(self):
+        """Test closing writes the pending changes of the data service, after the writes called before"""
+        async def run(service):
+            insert = asyncio.ensure_future(service.insert_company(Company(uuid="c1", name="Acme")))
+            await asyncio.sleep(0)
+            return insert
+
+        with patch.object(self.data_service, "close", side_effect=lambda: self.assertEqual(
+                len(self.data_service.get_companies()), 1)) as close:
+            self.run_with_service(run)
+        close.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
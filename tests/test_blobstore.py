@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from backend.blobstore import BlobStore
+
+
+class TestBlobStore(unittest.TestCase):
+    """Testing BlobStore"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.blob_dir = Path(self.temp_dir.name)
+        self.blob_store = BlobStore(self.blob_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_put_and_get(self):
+        """Test a stored text is returned by its key"""
+        key = self.blob_store.put("<p>Job description</p>")
+        self.assertEqual(BlobStore(self.blob_dir).get(key), "<p>Job description</p>")
+
+    def test_put_deduplicates(self):
+        """Test the same text is stored only once"""
+        first_key = self.blob_store.put("<p>Same</p>")
+        second_key = self.blob_store.put("<p>Same</p>")
+        self.assertEqual(first_key, second_key)
+        self.assertEqual(len(list(self.blob_dir.glob("*/*"))), 1)
+
+    def test_blob_is_compressed(self):
+        """Test the stored blob is smaller than a repetitive text"""
+        text = "<p>Repeated paragraph</p>" * 100
+        key = self.blob_store.put(text)
+        blob_size = (self.blob_dir / key[:2] / key[2:]).stat().st_size
+        self.assertLess(blob_size, len(text) / 10)
+
+    def test_get_missing_blob(self):
+        """Test a missing blob is returned as None"""
+        self.assertIsNone(self.blob_store.get("0" * 64))
+
+    def test_cache_size(self):
+        """Test only the most recently used texts are kept in memory"""
+        blob_store = BlobStore(self.blob_dir, cache_size=2)
+        keys = [blob_store.put(f"text {i}") for i in range(3)]
+        self.assertEqual(list(blob_store._cache), keys[1:])  # pylint: disable=protected-access
+
+    def test_prune(self):
+        """Test prune removes only the blobs which are not kept"""
+        kept_key = self.blob_store.put("kept")
+        removed_key = self.blob_store.put("removed")
+        self.assertEqual(self.blob_store.prune([kept_key]), 1)
+        self.assertEqual(self.blob_store.get(kept_key), "kept")
+        self.assertIsNone(self.blob_store.get(removed_key))
+
+    def test_prune_keeps_recent_blobs(self):
+        """Test prune keeps the blobs written or stored again in the last min_age seconds"""
+        old_key = self.blob_store.put("old")
+        stored_again_key = self.blob_store.put("stored again")
+        for key in (old_key, stored_again_key):
+            os.utime(self.blob_dir / key[:2] / key[2:], (0, 0))
+        recent_key = self.blob_store.put("recent")
+        self.blob_store.put("stored again")
+        self.assertEqual(self.blob_store.prune([], min_age=60), 1)
+        self.assertIsNone(self.blob_store.get(old_key))
+        self.assertEqual(self.blob_store.get(recent_key), "recent")
+        self.assertEqual(self.blob_store.get(stored_again_key), "stored again")
+
+    def test_read_with_other_codec(self):
+        """Test a blob written with one codec is read by a store configured with another"""
+        key = BlobStore(self.blob_dir, codec="lzma").put("<p>Written with lzma</p>")
+        self.assertEqual(BlobStore(self.blob_dir, codec="none").get(key), "<p>Written with lzma</p>")
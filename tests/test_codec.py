@@ -0,0 +1,34 @@
+import zlib
+
+import pytest
+
+from backend.codec import CODECS, decode, get_codec
+
+QT_DESCRIPTION = (
+    '<p style="margin-top:12px;margin-bottom:12px">We are hiring a '
+    '<span style="font-weight:700">senior engineer</span></p>\n'
+    '<ul style="margin-top:0px;margin-bottom:0px;-qt-list-indent:1">\n'
+    '<li style="margin-top:0px;margin-bottom:0px">Python</li></ul>'
+).encode("utf-8")
+
+
+@pytest.mark.parametrize("name", list(CODECS))
+def test_codec_round_trip(name):
+    """Test every codec decodes what it encoded"""
+    assert decode(get_codec(name).encode(QT_DESCRIPTION)) == QT_DESCRIPTION
+
+
+def test_dictionary_codec_is_smaller_than_zlib():
+    """Test the preset dictionary makes short Qt descriptions smaller"""
+    assert len(get_codec("zlib-dict").encode(QT_DESCRIPTION)) < len(get_codec("zlib").encode(QT_DESCRIPTION))
+
+
+def test_decode_untagged_zlib_blob():
+    """Test blobs written before codec tags are decoded as zlib streams"""
+    assert decode(zlib.compress(QT_DESCRIPTION)) == QT_DESCRIPTION
+
+
+def test_unknown_codec():
+    """Test an unknown codec name is rejected"""
+    with pytest.raises(ValueError):
+        get_codec("zstd")
@@ -0,0 +1,68 @@
+from contextlib import nullcontext
+import unittest
+from unittest.mock import Mock
+
+from backend.companysearch import CompanySearch
+from backend.models import Company
+
+DESCRIPTION = '<p style="margin-top:0px;margin-bottom:0px">Runs Kubernetes clusters</p>'
+
+
+class TestCompanySearch(unittest.TestCase):
+    """Testing CompanySearch"""
+
+    def setUp(self):
+        self.data = {"companies": {"1": {"uuid": "c1", "name": "Acme", "version": 1}}}
+        self.documents = {
+            "c1": {"uuid": "c1", "name": "Acme", "version": 1, "recruiters": [], "roles": [
+                {"uuid": "r1", "title": "Engineer", "applied_date": "2026-01-01", "description_ref": "ref1",
+                 "company_uuid": "c1", "interviews": []}]},
+        }
+        self.get_description = Mock(side_effect={"ref1": DESCRIPTION}.get)
+        self.searcher = CompanySearch(
+            lambda: nullcontext(self.data),
+            lambda data, criteria: list(self.documents),
+            self.assemble,
+            lambda data, company_uuids: [Company(**self.documents[uuid]) for uuid in company_uuids],
+            self.get_description,
+        )
+
+    def assemble(self, _data, company_uuids=None):
+        """Returns the documents of the companies with the uuids, or of all of them"""
+        return [self.documents[uuid] for uuid in (self.documents if company_uuids is None else company_uuids)]
+
+    def test_matches_plain_text_of_descriptions(self):
+        """Test a description is matched by the text of its snippet, not by its markup"""
+        self.assertEqual(self.searcher.search("margin"), [])
+        self.assertEqual(self.searcher.search("style", fuzzy=True), [])
+        results = self.searcher.search("kubernetes")
+        self.assertEqual([match.snippet for match in results[0].matches], ["Runs Kubernetes clusters"])
+
+    def test_extracts_descriptions_once(self):
+        """Test the text of a description is read and extracted once for the index and the scans"""
+        self.searcher.search_in_db("kubernetes", ranked=True)
+        self.searcher.search_in_db("clusters", ranked=True)
+        self.get_description.assert_called_once_with("ref1")
+
+    def test_mark_stale(self):
+        """Test the companies marked as stale are indexed again by the next search"""
+        self.searcher.search_in_db("acme", ranked=True)
+        self.documents["c1"]["name"] = "Initech"
+        self.searcher.mark_stale(["c1"])
+        self.assertEqual([company.name for company in self.searcher.search_in_db("initech", ranked=True)],
+                         ["Initech"])
+        self.assertIn("initech", self.searcher.text_index.postings)
+        self.assertNotIn("acme", self.searcher.text_index.postings)
+
+    def test_reset(self):
+        """Test the text index is built again after a reset"""
+        self.searcher.prepare_fuzzy_search()
+        self.searcher.reset()
+        self.assertIsNone(self.searcher.text_index)
+        self.searcher.mark_stale(["c1"])
+        self.assertEqual(len(self.searcher.search_in_db("acmee", fuzzy=True)), 1)
+        self.assertIsNotNone(self.searcher.text_index.dictionary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,269 +1,351 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+import threading
 import unittest
 
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
-from tinydb import Query
+from pydantic import ValidationError
+
+from tinydb import Query, TinyDB
+from tinydb.storages import MemoryStorage
 from backend.models import Company, Person, Role, TITLE, EmploymentType, WorkLocation, Interview, InterviewType
-from backend.data_service import DataService
+from backend.changes import ChangeEvent, ChangeType
+from backend.companysearch import UNSEARCHED_FIELDS
+from backend.data_service import DataService, StaleCompanyError
+from backend.datautils import iter_leaves
+from backend.fieldindex import Criterion, equals
+from backend.query import QueryError
+from backend.searchresult import SearchMatch
+from backend.uuidindex import UuidIndex
 
 
 class TestDataService(unittest.TestCase):
     """Testing DataService"""
 
+    @patch('backend.data_service.BlobStore')
     @patch('backend.data_service.TinyDB')
-    def setUp(self, MockTinyDB): # pylint: disable=arguments-differ
-        self.mock_db = MagicMock()
-        MockTinyDB.return_value = self.mock_db
+    def setUp(self, MockTinyDB, MockBlobStore): # pylint: disable=arguments-differ
+        self.db = TinyDB(storage=MemoryStorage)
+        MockTinyDB.return_value = self.db
         self.data_service = DataService()
-        self.mock_companies_table = self.mock_db.table.return_value
+        self.mock_blob_store = MockBlobStore.return_value
+
+    def insert_rows(self, table, *rows):
+        """Inserts raw rows into a table of the database"""
+        self.db.table(table).insert_multiple(rows)
+
+    def insert_company_with_interview(self):
+        """Inserts the rows of a company with a role and an interview"""
+        self.insert_rows("companies", {"uuid": "12345", "name": "Test Company"})
+        self.insert_rows("roles", {"uuid": "role123", "title": "Engineer", "applied_date": str(date.today()),
+                                   "company_uuid": "12345"})
+        self.insert_rows("interviews", {"uuid": "interview123", "sequence": 1, "title": "Recruiter",
+                                        "type": "Recruiter", "date": str(date.today()), "role_uuid": "role123"})
 
     def test_get_companies(self):
         """Test get_companies"""
-        mock_company = {
-            "uuid": "12345",
-            "name": "Test Company",
-            "recruiters": [],
-            "roles": []
-        }
-        self.mock_companies_table.all.return_value = [mock_company]
+        self.insert_rows("companies", {"uuid": "12345", "name": "Test Company"})
         result = self.data_service.get_companies()
 
-        self.mock_companies_table.all.assert_called_once()
         self.assertEqual(len(result), 1)
         self.assertIsInstance(result[0], Company)
         self.assertEqual(result[0].name, "Test Company")
 
     def test_get_company_by_uuid_found(self):
         """Test get_company_by_uuid"""
-        mock_company = {
-            "uuid": "12345",
-            "name": "Test Company",
-            "recruiters": [],
-            "roles": []
-        }
-        self.mock_companies_table.search.return_value = [mock_company]
+        self.insert_rows("companies", {"uuid": "67890", "name": "Other Company"},
+                         {"uuid": "12345", "name": "Test Company"})
         result = self.data_service.get_company_by_uuid("12345")
 
-        query = Query()
-        self.mock_companies_table.search.assert_called_once_with(query.uuid == "12345")
         self.assertIsNotNone(result)
         self.assertIsInstance(result, Company)
         self.assertEqual(result.name, "Test Company")
 
     def test_get_company_by_uuid_not_found(self):
         """Test get_company by uuid not found"""
-        self.mock_companies_table.search.return_value = []
         result = self.data_service.get_company_by_uuid("12345")
-
-        query = Query()
-        self.mock_companies_table.search.assert_called_once_with(query.uuid == "12345")
         self.assertIsNone(result)
 
     def test_get_company_by_interview_uuid_found(self):
         """Test get_company_by_interview_uuid found"""
-        mock_company = {
-            "uuid": "12345",
-            "name": "Test Company",
-            "recruiters": [],
-            "roles": [
-                {
-                    "uuid": "role123",
-                    "title": "Engineer",
-                    "applied_date": str(date.today()),
-                    "interviews": [
-                        {
-                            "uuid": "interview123",
-                            "sequence": 1,
-                            "title": "Recruiter",
-                            "type": "Recruiter",
-                            "date": str(date.today())
-                        }
-                    ]
-                }
-            ]
-        }
-        self.mock_companies_table.search.return_value = [mock_company]
+        self.insert_company_with_interview()
         result = self.data_service.get_company_by_interview_uuid("interview123")
 
-        query = Query()
-        self.mock_companies_table.search.assert_called_once_with(
-            query.roles.any(query.interviews.any(query.uuid == "interview123"))
-        )
         self.assertIsNotNone(result)
         self.assertIsInstance(result, Company)
         self.assertEqual(result.name, "Test Company")
+        self.assertEqual(result.roles[0].interviews[0].uuid, "interview123")
 
     def test_get_company_by_interview_uuid_not_found(self):
         """Test get_company_by_interview_uuid not found"""
-        self.mock_companies_table.search.return_value = []
-        result = self.data_service.get_company_by_interview_uuid("interview123")
-
-        query = Query()
-        self.mock_companies_table.search.assert_called_once_with(
-            query.roles.any(query.interviews.any(query.uuid == "interview123"))
-        )
+        self.insert_company_with_interview()
+        result = self.data_service.get_company_by_interview_uuid("role123")
         self.assertIsNone(result)
 
     def test_get_company_by_role_uuid_found(self):
         """Test get_company_by_role_uuid found"""
-        mock_company = {
-            "uuid": "12345",
-            "name": "Test Company",
-            "recruiters": [],
-            "roles": [
-                {"uuid": "role123", "title": "Engineer", "applied_date": str(date.today())}
-            ]
-        }
-        self.mock_companies_table.search.return_value = [mock_company]
+        self.insert_company_with_interview()
         result = self.data_service.get_company_by_role_uuid("role123")
 
-        query = Query()
-        self.mock_companies_table.search.assert_called_once_with(
-            query.roles.any(query.uuid == "role123")
-        )
         self.assertIsNotNone(result)
         self.assertIsInstance(result, Company)
         self.assertEqual(result.name, "Test Company")
 
     def test_get_company_by_role_uuid_not_found(self):
         """Test get_company_by_role_uuid not found"""
-        self.mock_companies_table.search.return_value = []
-        result = self.data_service.get_company_by_role_uuid("role123")
-
-        query = Query()
-        self.mock_companies_table.search.assert_called_once_with(
-            query.roles.any(query.uuid == "role123")
-        )
+        self.insert_company_with_interview()
+        result = self.data_service.get_company_by_role_uuid("interview123")
         self.assertIsNone(result)
 
     @patch('backend.models.Company.model_dump_json')
     def test_insert_company(self, mock_model_dump_json):
         """Test insert_company"""
-        mock_company = Company(
-            uuid="12345",
-            name="Test Company",
-            recruiters=[Person(name="Recruiter", title=TITLE.MR)],
-            roles=[
-                Role(
-                    title="Engineer",
-                    applied_date=date.today(),
-                    employment_type=EmploymentType.FULL_TIME,
-                    work_location=WorkLocation.REMOTE
-                )
-            ]
-        )
+        mock_company = Company(uuid="12345", name="Test Company")
         mock_model_dump_json.return_value = '{"uuid": "12345", "name": "Test Company"}'
         self.data_service.insert_company(mock_company)
 
         mock_model_dump_json.assert_called_once_with(exclude_none=True)
-        self.mock_companies_table.insert.assert_called_once_with(
-            {"uuid": "12345", "name": "Test Company"}
-        )
+        self.assertEqual(self.db.table("companies").all(), [{"uuid": "12345", "name": "Test Company", "version": 1}])
 
-    @patch('backend.models.Company.model_dump_json')
-    def test_update_company(self, mock_model_dump_json):
-        """Test update_company"""
-        mock_company = Company(
+    def test_insert_company_normalized(self):
+        """Test insert_company stores roles, interviews and persons as rows referring to their parent"""
+        company = Company(
             uuid="12345",
             name="Test Company",
-            recruiters=[Person(name="Recruiter", title=TITLE.MR)],
+            recruiters=[Person(uuid="recruiter123", name="Recruiter", title=TITLE.MR)],
             roles=[
                 Role(
+                    uuid="role123",
                     title="Engineer",
                     applied_date=date.today(),
                     employment_type=EmploymentType.FULL_TIME,
-                    work_location=WorkLocation.REMOTE
+                    work_location=WorkLocation.REMOTE,
+                    interviews=[Interview(uuid="interview123", sequence=1, title="Recruiter",
+                                          type=InterviewType.RECRUITER, date=date.today(),
+                                          interviewers=[Person(uuid="interviewer123", name="Interviewer",
+                                                               title=TITLE.MS)])]
                 )
             ]
         )
-        mock_model_dump_json.return_value = '{"uuid": "12345", "name": "Test Company"}'
-        self.data_service.update_company(mock_company)
-
-        mock_model_dump_json.assert_called_once_with(exclude_none=True)
-        query = Query()
-        self.mock_companies_table.update.assert_called_once_with(
-            {"uuid": "12345", "name": "Test Company"}, query.uuid == "12345"
+        self.data_service.insert_company(company)
+
+        self.assertEqual(self.db.table("companies").all(),
+                         [{"uuid": "12345", "name": "Test Company", "version": 1}])
+        self.assertEqual(self.db.table("roles").all()[0]["company_uuid"], "12345")
+        self.assertNotIn("interviews", self.db.table("roles").all()[0])
+        self.assertEqual(self.db.table("interviews").all()[0]["role_uuid"], "role123")
+        self.assertEqual(
+            {(p["uuid"], p.get("company_uuid"), p.get("interview_uuid")) for p in self.db.table("persons").all()},
+            {("recruiter123", "12345", None), ("interviewer123", None, "interview123")}
         )
+        self.assertEqual(self.data_service.get_company_by_uuid("12345"), company.model_copy(update={"version": 1}))
+
+    def test_update_company(self):
+        """Test update_company"""
+        self.insert_rows("companies", {"uuid": "12345", "name": "Old Company", "website": "old.com"})
+        self.data_service.update_company(Company(uuid="12345", name="Test Company"))
+
+        self.assertEqual(self.db.table("companies").all(), [{"uuid": "12345", "name": "Test Company", "version": 1}])
+
+    def test_update_company_rows(self):
+        """Test update_company inserts, updates and removes the rows of the company"""
+        self.insert_company_with_interview()
+        company = self.data_service.get_company_by_uuid("12345").model_copy(deep=True)
+        company.roles[0].title = "Senior Engineer"
+        company.roles[0].interviews = []
+        company.recruiters.append(Person(uuid="recruiter123", name="Recruiter", title=TITLE.MR))
+        self.data_service.update_company(company)
+
+        self.assertEqual(self.db.table("roles").all()[0]["title"], "Senior Engineer")
+        self.assertEqual(self.db.table("interviews").all(), [])
+        self.assertEqual(self.db.table("persons").all()[0]["company_uuid"], "12345")
+        self.assertEqual(self.data_service.get_company_by_uuid("12345"), company.model_copy(update={"version": 1}))
 
     def test_delete_company(self):
         """Test delete_company"""
-        query = Query()
+        self.insert_company_with_interview()
+        self.insert_rows("companies", {"uuid": "67890", "name": "Other Company"})
         self.data_service.delete_company("12345")
-        self.mock_companies_table.remove.assert_called_once_with(query.uuid == "12345")
 
-    def test_delete_role(self):
-        """Test delete_role"""
-        mock_company = Company(
-            uuid="12345",
-            name="Test Company",
-            recruiters=[],
-            roles=[
-                Role(uuid="role123", title="Engineer", applied_date=date.today())
-            ]
-        )
-        with patch.object(self.data_service, 'get_company_by_role_uuid', return_value=mock_company):
-            with patch.object(self.data_service, 'update_company') as mock_update_company:
-                self.data_service.delete_role("role123")
-                self.assertEqual(len(mock_company.roles), 0)
-                mock_update_company.assert_called_once_with(mock_company)
+        self.assertEqual([c.uuid for c in self.data_service.get_companies()], ["67890"])
+        self.assertEqual(self.db.table("roles").all(), [])
+        self.assertEqual(self.db.table("interviews").all(), [])
 
-    def test_delete_role_not_found(self):
-        """Test delete_role when role is not found"""
-        mock_company = Company(uuid="12345", name="Test Company", recruiters=[], roles=[])
-        with patch.object(self.data_service, 'get_company_by_role_uuid', return_value=mock_company):
-            with patch.object(self.data_service, 'update_company') as mock_update_company:
-                self.data_service.delete_role("role123")
-                mock_update_company.assert_not_called()
+    @patch("backend.companysearch.iter_leaves", wraps=iter_leaves)
+    def test_search_in_db_found(self, mock_iter_leaves):
+        """Test search_in_db with matching documents"""
+        self.insert_rows("companies", {"uuid": "12345", "name": "Test Company"},
+                         {"uuid": "67890", "name": "Another Company"})
+        result = self.data_service.searcher.search_in_db("Test")
 
-    def test_delete_interview(self):
-        """Test delete_interview"""
-        mock_company = Company(
-            uuid="12345",
-            name="Test Company",
-            recruiters=[],
-            roles=[
-                Role(
-                    uuid="role123",
-                    title="Engineer",
-                    applied_date=date.today(),
-                    interviews=[Interview(uuid="interview123", sequence=1, title="Recruiter", type="Recruiter",
-                                          date=date.today())]
-                )
-            ]
+        mock_iter_leaves.assert_any_call(
+            {"uuid": "12345", "name": "Test Company", "recruiters": [], "roles": []},
+            keys=False, exclude=("description_ref", *UNSEARCHED_FIELDS)
+        )
+        mock_iter_leaves.assert_any_call(
+            {"uuid": "67890", "name": "Another Company", "recruiters": [], "roles": []},
+            keys=False, exclude=("description_ref", *UNSEARCHED_FIELDS)
         )
-        with patch.object(self.data_service, 'get_company_by_interview_uuid', return_value=mock_company):
-            with patch.object(self.data_service, 'update_company') as mock_update_company:
-                self.data_service.delete_interview("interview123")
-                self.assertEqual(len(mock_company.roles[0].interviews), 0)
-                mock_update_company.assert_called_once_with(mock_company)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0].name, "Test Company")
 
-    def test_delete_interview_not_found(self):
-        """Test delete_interview when interview is not found"""
-        mock_company = Company(
+    def test_search_in_db_no_match(self):
+        """Test search_in_db with no matching documents"""
+        self.insert_rows("companies", {"uuid": "12345", "name": "Test Company"},
+                         {"uuid": "67890", "name": "Another Company"})
+        result = self.data_service.searcher.search_in_db("Nonexistent")
+
+        self.assertEqual(len(result), 0)
+
+    def test_search_in_db_case_insensitive(self):
+        """Test search_in_db case-insensitive match"""
+        self.insert_rows("companies", {"uuid": "12345", "name": "test company"})
+        result = self.data_service.searcher.search_in_db("TEST")
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0].name, "test company")
+
+    def test_search_in_db_stops_at_first_match(self):
+        """Test search_in_db reads the description of a company matched by a value for its snippet only"""
+        self.insert_rows("companies", {"uuid": "12345", "name": "Test Company"})
+        self.insert_rows("roles", {"uuid": "r1", "company_uuid": "12345", "title": "Engineer",
+                                   "applied_date": str(date.today()), "description_ref": "blob1"})
+        self.mock_blob_store.get.return_value = "<p>Notes</p>"
+        result = self.data_service.searcher.search_in_db("Test")
+
+        self.mock_blob_store.get.assert_called_once_with("blob1")
+        self.assertEqual(len(result), 1)
+
+    def test_search_in_db_skips_versions_and_uuids(self):
+        """Test search_in_db does not match the versions and uuids of the companies"""
+        self.insert_rows("companies", {"uuid": "12345", "name": "Test Company", "version": 7})
+        self.insert_rows("roles", {"uuid": "role123", "title": "Engineer", "applied_date": "2026-01-01",
+                                   "company_uuid": "12345"})
+        self.assertEqual(self.data_service.searcher.search_in_db("7"), [])
+        self.assertEqual(self.data_service.searcher.search_in_db("12345"), [])
+        self.assertEqual(self.data_service.searcher.search("role123"), [])
+        self.assertEqual(len(self.data_service.searcher.search_in_db("engineer")), 1)
+
+    def test_search_in_db_partial_match(self):
+        """Test search_in_db with partial match in nested fields"""
+        self.insert_company_with_interview()
+        self.insert_rows("persons", {"uuid": "interviewer123", "name": "Testing Lead", "title": "Mr",
+                                     "interview_uuid": "interview123"})
+        result = self.data_service.searcher.search_in_db("testing")
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0].name, "Test Company")
+
+    def test_insert_company_stores_canonical_descriptions_in_blob_store(self):
+        """Test insert_company stores descriptions in canonical form in the blob store"""
+        html = (
+            '<html><head><style type="text/css">p { white-space: pre-wrap; }</style></head>'
+            '<body style=" font-size:9pt;">\n<p style=" margin-top:0px; margin-bottom:0px; '
+            'margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;">Notes</p></body></html>'
+        )
+        company = Company(
             uuid="12345",
             name="Test Company",
-            recruiters=[],
-            roles=[
-                Role(
-                    uuid="role123",
-                    title="Engineer",
-                    applied_date=date.today(),
-                    interviews=[]
-                )
-            ]
+            recruiters=[Person(name="Recruiter", title=TITLE.MR, description=html)],
+            roles=[Role(title="Engineer", applied_date=date.today(), description=html)]
         )
-        with patch.object(self.data_service, 'get_company_by_interview_uuid', return_value=mock_company):
-            with patch.object(self.data_service, 'update_company') as mock_update_company:
-                self.data_service.delete_interview("interview123")
-                mock_update_company.assert_not_called()
+        self.mock_blob_store.put.return_value = "notes-ref"
+        self.data_service.insert_company(company)
+
+        recruiter = self.db.table("persons").all()[0]
+        role = self.db.table("roles").all()[0]
+        self.mock_blob_store.put.assert_called_with('<p style="margin-top:0px;margin-bottom:0px">Notes</p>')
+        self.assertEqual(recruiter["description_ref"], "notes-ref")
+        self.assertEqual(role["description_ref"], "notes-ref")
+        self.assertNotIn("description", recruiter)
+        self.assertNotIn("description", role)
+
+    def test_update_company_keeps_unloaded_description_ref(self):
+        """Test update_company keeps the reference of a description which is not loaded"""
+        self.insert_company_with_interview()
+        company = self.data_service.get_company_by_uuid("12345")
+        company.roles[0].description_ref = "role-ref"
+        self.data_service.update_company(company)
+
+        self.assertEqual(self.db.table("roles").all()[0]["description_ref"], "role-ref")
+        self.mock_blob_store.put.assert_not_called()
+
+    def test_update_company_drops_ref_of_cleared_description(self):
+        """Test update_company removes the reference of a description cleared by the user"""
+        self.insert_company_with_interview()
+        self.db.table("roles").update({"description_ref": "role-ref"})
+        company = self.data_service.get_company_by_uuid("12345")
+        company.roles[0].description = ""
+        self.data_service.update_company(company)
+
+        self.assertNotIn("description_ref", self.db.table("roles").all()[0])
+
+    def test_load_descriptions(self):
+        """Test load_descriptions loads only the descriptions which are not loaded yet, into copies"""
+        self.mock_blob_store.get.return_value = "<p>Loaded</p>"
+        unloaded = Person(name="Unloaded", title=TITLE.MR, description_ref="ref")
+        loaded = Person(name="Loaded", title=TITLE.MR, description="<p>Edited</p>", description_ref="ref")
+        without = Person(name="Without", title=TITLE.MR)
+        items = self.data_service.load_descriptions([unloaded, loaded, without])
+
+        self.mock_blob_store.get.assert_called_once_with("ref")
+        self.assertEqual([item.description for item in items], ["<p>Loaded</p>", "<p>Edited</p>", None])
+        self.assertIsNone(unloaded.description)
+        self.assertIs(items[1], loaded)
+
+    def test_search_in_db_description_blob(self):
+        """Test search_in_db matches the text of a description in the blob store"""
+        self.insert_rows("companies", {"uuid": "12345", "name": "Test Company"})
+        self.insert_rows("roles", {"uuid": "role123", "title": "Engineer", "applied_date": str(date.today()),
+                                   "description_ref": "role-ref", "company_uuid": "12345"})
+        self.mock_blob_store.get.return_value = "<p>Kubernetes experience</p>"
+        result = self.data_service.searcher.search_in_db("kubernetes")
+
+        self.mock_blob_store.get.assert_called_with("role-ref")
+        self.assertEqual(len(result), 1)
 
-    def test_delete_interviewer(self):
-        """Test delete_interviewer"""
-        mock_company = Company(
+    @patch("backend.htmlextractor.PARALLEL_THRESHOLD", 1)
+    @patch("backend.htmlextractor.os.cpu_count", return_value=4)
+    @patch("backend.htmlextractor.ProcessPoolExecutor")
+    def test_search_in_db_ranked_extracts_serially(self, mock_process_pool_executor, _mock_cpu_count):
+        """Test the descriptions of the text index are extracted without a process pool"""
+        self.insert_rows("companies", {"uuid": "12345", "name": "Test Company"})
+        self.insert_rows("roles", *[{"uuid": f"role{number}", "title": "Engineer", "applied_date": "2026-01-01",
+                                     "description_ref": f"ref{number}", "company_uuid": "12345"}
+                                    for number in range(3)])
+        self.mock_blob_store.get.side_effect = lambda ref: f"<p>Kubernetes {ref}</p>"
+        result = self.data_service.searcher.search_in_db("kubernetes", ranked=True)
+
+        mock_process_pool_executor.assert_not_called()
+        self.assertEqual(len(result), 1)
+
+    def test_prune_descriptions(self):
+        """Test prune_descriptions keeps the blobs referenced by the rows of all tables"""
+        self.insert_company_with_interview()
+        self.db.table("interviews").update({"description_ref": "interview-ref"})
+        self.data_service.prune_descriptions()
+        self.assertEqual(list(self.mock_blob_store.prune.call_args.args[0]), ["interview-ref"])
+
+    def test_close_prunes_descriptions(self):
+        """Test close removes the blobs no row refers to"""
+        self.data_service.close()
+        self.mock_blob_store.prune.assert_called_once()
+
+
+class TestDataServicePatches(unittest.TestCase):
+    """Testing the subdocument patch operations of DataService on an in-memory database"""
+
+    @patch('backend.data_service.BlobStore')
+    @patch('backend.data_service.TinyDB')
+    def setUp(self, MockTinyDB, MockBlobStore): # pylint: disable=arguments-differ
+        MockTinyDB.side_effect = lambda *args, **kwargs: TinyDB(storage=MemoryStorage)
+        self.data_service = DataService()
+        self.mock_blob_store = MockBlobStore.return_value
+        self.company = Company(
             uuid="12345",
             name="Test Company",
-            recruiters=[],
+            recruiters=[Person(uuid="recruiter123", name="Recruiter", title=TITLE.MR)],
             roles=[
                 Role(
                     uuid="role123",
@@ -282,157 +364,582 @@ class TestDataService(unittest.TestCase):
                 )
             ]
         )
-        with patch.object(self.data_service, 'get_company_by_interview_uuid', return_value=mock_company):
-            with patch.object(self.data_service, 'update_company') as mock_update_company:
-                self.data_service.delete_interviewer("interviewer123", "interview123")
-                self.assertEqual(len(mock_company.roles[0].interviews[0].interviewers), 0)
-                mock_update_company.assert_called_once_with(mock_company)
+        self.data_service.insert_company(self.company)
+
+    def stored_company(self) -> Company:
+        """Returns the company as stored"""
+        return self.data_service.get_company_by_uuid("12345")
+
+    def test_update_company_unchanged(self):
+        """Test update_company does not write a company which did not change"""
+        with patch.object(self.data_service.db.storage, "write") as mock_write:
+            self.data_service.update_company(self.stored_company())
+            self.data_service.update_role(self.stored_company().roles[0])
+        mock_write.assert_not_called()
+
+    def test_update_company_changed_field(self):
+        """Test update_company writes a changed field and keeps the other rows"""
+        stored_roles = self.data_service.tables["roles"].all()
+        company = self.stored_company()
+        company.website = "example.com"
+        with patch.object(self.data_service.tables["roles"], "update") as mock_update:
+            self.data_service.update_company(company)
+        mock_update.assert_not_called()
+
+        self.assertEqual(self.data_service.tables["companies"].get(doc_id=1)["website"], "example.com")
+        self.assertEqual(self.data_service.tables["roles"].all(), stored_roles)
+
+    def test_update_company_reindexes(self):
+        """Test subdocuments added by update_company can be patched"""
+        roles = self.stored_company().roles
+        self.data_service.delete_role("role123")
+        company = self.stored_company().model_copy(deep=True)
+        company.roles = list(roles)
+        company.roles.append(Role(uuid="role456", title="Manager", applied_date=date.today()))
+        self.data_service.update_company(company)
+        self.data_service.delete_interview("interview123")
+        self.assertEqual(len(self.stored_company().roles), 2)
+        self.assertEqual(self.stored_company().roles[0].interviews, [])
+
+    def test_writes_keep_child_rows_indexed(self):
+        """Test reads after writes look up the child rows without regrouping the tables"""
+        self.stored_company()
+        with patch('backend.schema.get_child_rows') as mock_get_child_rows:
+            self.data_service.update_role(Role(uuid="role123", title="Lead", applied_date=date.today()))
+            self.data_service.add_role("12345", Role(uuid="role456", title="Manager", applied_date=date.today()))
+            self.assertEqual([role.title for role in self.stored_company().roles], ["Lead", "Manager"])
+            self.assertEqual(self.data_service.find_roles(), self.stored_company().roles)
+        mock_get_child_rows.assert_not_called()
+
+    def test_add_role(self):
+        """Test add_role appends the role to the company"""
+        self.data_service.add_role("12345", Role(uuid="role456", title="Manager", applied_date=date.today()))
+        self.assertEqual([role.uuid for role in self.stored_company().roles], ["role123", "role456"])
+
+    def test_add_role_unknown_company(self):
+        """Test add_role raises LookupError for an unknown company"""
+        with self.assertRaises(LookupError):
+            self.data_service.add_role("unknown", Role(title="Manager", applied_date=date.today()))
+
+    def test_update_role_keeps_interviews(self):
+        """Test update_role updates the role fields and keeps the stored interviews"""
+        role = Role(uuid="role123", title="Senior Engineer", applied_date=date.today(),
+                    work_location=WorkLocation.REMOTE)
+        self.data_service.update_role(role)
+        stored_role = self.stored_company().roles[0]
+        self.assertEqual(stored_role.title, "Senior Engineer")
+        self.assertEqual(stored_role.work_location, WorkLocation.REMOTE)
+        self.assertEqual(stored_role.interviews[0].uuid, "interview123")
+
+    def test_update_role_removes_cleared_fields(self):
+        """Test update_role removes the fields which are not set anymore"""
+        self.data_service.update_role(Role(uuid="role123", title="Engineer", applied_date=date.today(),
+                                           description_ref="ref"))
+        self.data_service.update_role(Role(uuid="role123", title="Engineer", applied_date=date.today()))
+        self.assertIsNone(self.stored_company().roles[0].description_ref)
+
+    def test_add_and_update_interview(self):
+        """Test add_interview and update_interview"""
+        interview = Interview(uuid="interview456", sequence=2, title="Team", type=InterviewType.TEAM,
+                              date=date.today())
+        self.data_service.add_interview("role123", interview)
+        interview.title = "Team lunch"
+        self.data_service.update_interview(interview)
+        stored_interviews = self.stored_company().roles[0].interviews
+        self.assertEqual([i.title for i in stored_interviews], ["Recruiter", "Team lunch"])
+
+    def test_add_person(self):
+        """Test add_person adds recruiters to companies and interviewers to interviews"""
+        self.data_service.add_person("12345", Person(uuid="recruiter456", name="Other", title=TITLE.MS))
+        self.data_service.add_person("interview123", Person(uuid="interviewer456", name="Other", title=TITLE.MS))
+        company = self.stored_company()
+        self.assertEqual(company.recruiters[1].uuid, "recruiter456")
+        self.assertEqual(company.roles[0].interviews[0].interviewers[1].uuid, "interviewer456")
+
+    def test_update_person(self):
+        """Test update_person updates an interviewer"""
+        self.data_service.update_person(Person(uuid="interviewer123", name="Renamed", title=TITLE.MS))
+        interviewer = self.stored_company().roles[0].interviews[0].interviewers[0]
+        self.assertEqual(interviewer.name, "Renamed")
+        self.assertEqual(interviewer.title, TITLE.MS)
+
+    def test_update_unknown_person(self):
+        """Test update_person raises LookupError for an unknown person"""
+        with self.assertRaises(LookupError):
+            self.data_service.update_person(Person(uuid="unknown", name="Nobody", title=TITLE.NA))
+
+    def test_patch_with_stale_index(self):
+        """Test a patch finds rows written by another DataService instance"""
+        self.data_service.add_role("12345", Role(uuid="role456", title="Manager", applied_date=date.today()))
+        roles = self.data_service.db.table("roles")
+        stored_roles = roles.all()
+        roles.truncate()
+        roles.insert_multiple(reversed(stored_roles))
+        self.data_service.db.table("interviews").insert(
+            {"uuid": "interview456", "sequence": 1, "title": "Team", "type": "Team",
+             "date": str(date.today()), "role_uuid": "role456"}
+        )
+        self.data_service.delete_interview("interview456")
+        self.data_service.delete_role("role123")
+        self.assertEqual([role.uuid for role in self.stored_company().roles], ["role456"])
+        self.assertEqual(self.stored_company().roles[0].interviews, [])
+        self.assertEqual(self.data_service.tables["interviews"].all(), [])
+
+    def test_delete_company_uuid(self):
+        """Test a company can not be deleted as a subdocument"""
+        with self.assertRaises(ValueError):
+            self.data_service.delete_role("12345")
+
+    def test_delete_role(self):
+        """Test delete_role"""
+        self.data_service.delete_role("role123")
+        self.assertEqual(len(self.stored_company().roles), 0)
+
+    def test_delete_role_not_found(self):
+        """Test delete_role when role is not found"""
+        self.data_service.delete_role("role456")
+        self.assertEqual(len(self.stored_company().roles), 1)
+
+    def test_delete_interview(self):
+        """Test delete_interview"""
+        self.data_service.delete_interview("interview123")
+        self.assertEqual(len(self.stored_company().roles[0].interviews), 0)
+
+    def test_delete_interview_not_found(self):
+        """Test delete_interview when interview is not found"""
+        self.data_service.delete_interview("interview456")
+        self.assertEqual(len(self.stored_company().roles[0].interviews), 1)
+
+    def test_delete_interviewer(self):
+        """Test delete_interviewer"""
+        self.data_service.delete_interviewer("interviewer123", "interview123")
+        self.assertEqual(len(self.stored_company().roles[0].interviews[0].interviewers), 0)
 
     def test_delete_interviewer_not_found(self):
         """Test delete_interviewer when interviewer is not found"""
-        mock_company = Company(
-            uuid="12345",
-            name="Test Company",
-            recruiters=[],
-            roles=[
-                Role(
-                    uuid="role123",
-                    title="Engineer",
-                    applied_date=date.today(),
-                    interviews=[
-                        Interview(
-                            uuid="interview123",
-                            sequence=1,
-                            title="Recruiter",
-                            type=InterviewType.RECRUITER,
-                            date=date.today(),
-                            interviewers=[Person(uuid="different_uuid", name="Other Interviewer", title=TITLE.MR)]
-                        )
-                    ]
-                )
-            ]
-        )
-        with patch.object(self.data_service, 'get_company_by_interview_uuid', return_value=mock_company):
-            with patch.object(self.data_service, 'update_company') as mock_update_company:
-                self.data_service.delete_interviewer("interviewer123", "interview123")
-                self.assertEqual(len(mock_company.roles[0].interviews[0].interviewers), 1)
-                mock_update_company.assert_not_called()
+        self.data_service.delete_interviewer("recruiter123", "interview123")
+        self.assertEqual(len(self.stored_company().roles[0].interviews[0].interviewers), 1)
+        self.assertEqual(len(self.stored_company().recruiters), 1)
 
     def test_delete_recruiter(self):
         """Test delete_recruiter"""
-        mock_company = Company(
-            uuid="12345",
-            name="Test Company",
-            recruiters=[Person(uuid="recruiter123", name="Recruiter", title=TITLE.MR)],
-            roles=[]
-        )
-        with patch.object(self.data_service, 'get_company_by_uuid', return_value=mock_company):
-            with patch.object(self.data_service, 'update_company') as mock_update_company:
-                self.data_service.delete_recruiter("recruiter123", "12345")
-                self.assertEqual(len(mock_company.recruiters), 0)
-                mock_update_company.assert_called_once_with(mock_company)
+        self.data_service.delete_recruiter("recruiter123", "12345")
+        self.assertEqual(len(self.stored_company().recruiters), 0)
 
     def test_delete_recruiter_not_found(self):
         """Test delete_recruiter when recruiter is not found"""
-        mock_company = Company(
-            uuid="12345",
-            name="Test Company",
-            recruiters=[Person(uuid="different_uuid", name="Other Recruiter", title=TITLE.MS)],
-            roles=[]
-        )
-        with patch.object(self.data_service, 'get_company_by_uuid', return_value=mock_company):
-            with patch.object(self.data_service, 'update_company') as mock_update_company:
-                self.data_service.delete_recruiter("recruiter123", "12345")
-                self.assertEqual(len(mock_company.recruiters), 1)
-                mock_update_company.assert_not_called()
-
-    @patch("backend.data_service.flatten_dict")
-    def test_search_in_db_found(self, mock_flatten_dict):
-        """Test search_in_db with matching documents"""
-        mock_company_1 = {
-            "uuid": "12345",
-            "name": "Test Company",
-            "recruiters": [],
-            "roles": []
-        }
-        mock_company_2 = {
-            "uuid": "67890",
-            "name": "Another Company",
-            "recruiters": [],
-            "roles": []
-        }
-        mock_flatten_dict.side_effect = [
-            {"name": "Test Company"},
-            {"name": "Another Company"}
-        ]
-        self.mock_companies_table.all.return_value = [mock_company_1, mock_company_2]
-        result = self.data_service.search_in_db("Test")
+        self.data_service.delete_recruiter("interviewer123", "12345")
+        self.assertEqual(len(self.stored_company().recruiters), 1)
+        self.assertEqual(len(self.stored_company().roles[0].interviews[0].interviewers), 1)
 
-        mock_flatten_dict.assert_any_call(mock_company_1)
-        mock_flatten_dict.assert_any_call(mock_company_2)
-        self.assertEqual(len(result), 1)
-        self.assertEqual(result[0].name, "Test Company")
 
-    @patch("backend.data_service.flatten_dict")
-    def test_search_in_db_no_match(self, mock_flatten_dict):
-        """Test search_in_db with no matching documents"""
-        mock_company_1 = {
-            "uuid": "12345",
-            "name": "Test Company",
-            "recruiters": [],
-            "roles": []
-        }
-        mock_company_2 = {
-            "uuid": "67890",
-            "name": "Another Company",
-            "recruiters": [],
-            "roles": []
-        }
-        mock_flatten_dict.side_effect = [
-            {"name": "Test Company"},
-            {"name": "Another Company"}
-        ]
-        self.mock_companies_table.all.return_value = [mock_company_1, mock_company_2]
-        result = self.data_service.search_in_db("Nonexistent")
+class TestDataServiceBulk(unittest.TestCase):
+    """Testing the bulk and transactional writes of DataService on an in-memory database"""
 
-        mock_flatten_dict.assert_any_call(mock_company_1)
-        mock_flatten_dict.assert_any_call(mock_company_2)
-        self.assertEqual(len(result), 0)
+    @patch('backend.data_service.BlobStore')
+    @patch('backend.data_service.TinyDB')
+    def setUp(self, MockTinyDB, MockBlobStore): # pylint: disable=arguments-differ
+        MockTinyDB.side_effect = lambda *args, **kwargs: TinyDB(storage=MemoryStorage)
+        self.data_service = DataService()
+        self.mock_blob_store = MockBlobStore.return_value
+        self.storage = self.data_service.db.storage
+
+    def companies(self, count):
+        """Returns the given number of companies with a role"""
+        return [
+            Company(uuid=f"company{i}", name=f"Company {i}",
+                    roles=[Role(uuid=f"role{i}", title="Engineer", applied_date=date.today())])
+            for i in range(count)
+        ]
 
-    @patch("backend.data_service.flatten_dict")
-    def test_search_in_db_case_insensitive(self, mock_flatten_dict):
-        """Test search_in_db case-insensitive match"""
-        mock_company = {
-            "uuid": "12345",
-            "name": "Test Company",
-            "recruiters": [],
-            "roles": []
-        }
-        mock_flatten_dict.return_value = {"name": "test company"}
-        self.mock_companies_table.all.return_value = [mock_company]
-        result = self.data_service.search_in_db("TEST")
-
-        mock_flatten_dict.assert_called_once_with(mock_company)
-        self.assertEqual(len(result), 1)
-        self.assertEqual(result[0].name, "Test Company")
+    def test_insert_companies(self):
+        """Test insert_companies writes all the companies at once"""
+        with patch.object(self.storage, "write", wraps=self.storage.write) as mock_write:
+            self.data_service.insert_companies(self.companies(50))
+        mock_write.assert_called_once()
+        self.assertEqual(len(self.data_service.get_companies()), 50)
+
+    def test_update_companies(self):
+        """Test update_companies writes all the companies at once"""
+        self.data_service.insert_companies(self.companies(3))
+        companies = [company.model_copy(deep=True) for company in self.data_service.get_companies()]
+        for company in companies:
+            company.website = "example.com"
+        with patch.object(self.storage, "write", wraps=self.storage.write) as mock_write:
+            self.data_service.update_companies(companies)
+        mock_write.assert_called_once()
+        self.assertTrue(all(c.website == "example.com" for c in self.data_service.get_companies()))
+
+    def test_delete_companies(self):
+        """Test delete_companies deletes all the companies at once"""
+        self.data_service.insert_companies(self.companies(5))
+        with patch.object(self.storage, "write", wraps=self.storage.write) as mock_write:
+            self.data_service.delete_companies(["company1", "company3"])
+        mock_write.assert_called_once()
+        self.assertEqual(
+            sorted(c.uuid for c in self.data_service.get_companies()),
+            ["company0", "company2", "company4"]
+        )
 
-    @patch("backend.data_service.flatten_dict")
-    def test_search_in_db_partial_match(self, mock_flatten_dict):
-        """Test search_in_db with partial match in multiple fields"""
-        mock_company = {
-            "uuid": "12345",
-            "name": "Test Company",
-            "description": "A testing company",
-            "recruiters": [],
-            "roles": []
-        }
-        mock_flatten_dict.return_value = {
-            "name": "Test Company",
-            "description": "A testing company"
-        }
-        self.mock_companies_table.all.return_value = [mock_company]
-        result = self.data_service.search_in_db("testing")
-
-        mock_flatten_dict.assert_called_once_with(mock_company)
-        self.assertEqual(len(result), 1)
-        self.assertEqual(result[0].name, "Test Company")
+    def test_delete_companies_keeps_uuid_index(self):
+        """Test delete_companies does not rebuild the uuid index for each deleted company"""
+        self.data_service.insert_companies(self.companies(40))
+        self.data_service.get_company_by_uuid("company0")
+        with patch("backend.data_service.UuidIndex", wraps=UuidIndex) as mock_uuid_index:
+            self.data_service.delete_companies([f"company{number}" for number in range(0, 40, 4)])
+            self.assertIsNone(self.data_service.get_company_by_uuid("company4"))
+        mock_uuid_index.assert_not_called()
+        self.assertEqual(len(self.data_service.get_companies()), 30)
+
+    def test_transaction_commit(self):
+        """Test the mutations of a transaction are written once, when the block ends"""
+        self.data_service.insert_companies(self.companies(2))
+        with patch.object(self.storage, "write", wraps=self.storage.write) as mock_write:
+            with self.data_service.transaction():
+                self.data_service.delete_role("role0")
+                self.data_service.add_interview("role1", Interview(
+                    sequence=1, title="Team", type=InterviewType.TEAM, date=date.today()))
+                self.data_service.insert_company(Company(uuid="company2", name="Company 2"))
+                mock_write.assert_not_called()
+        mock_write.assert_called_once()
+        self.assertEqual(self.data_service.get_company_by_uuid("company0").roles, [])
+        self.assertEqual(len(self.data_service.get_company_by_uuid("company1").roles[0].interviews), 1)
+        self.assertIsNotNone(self.data_service.get_company_by_uuid("company2"))
+
+    def test_transaction_rollback(self):
+        """Test nothing is written when the block of a transaction raises"""
+        self.data_service.insert_companies(self.companies(2))
+        with self.assertRaises(LookupError):
+            with self.data_service.transaction():
+                self.data_service.delete_companies(["company0"])
+                self.data_service.add_role("unknown", Role(title="Engineer", applied_date=date.today()))
+        self.assertEqual(len(self.data_service.get_companies()), 2)
+        self.data_service.delete_role("role0")
+        self.assertEqual(self.data_service.get_company_by_uuid("company0").roles, [])
+
+    def test_transaction_validation(self):
+        """Test nothing is written when a changed company is not valid"""
+        self.data_service.insert_companies(self.companies(1))
+        with self.assertRaises(ValidationError):
+            with self.data_service.transaction():
+                self.data_service.insert_company(Company(uuid="company1", name="Company 1"))
+                self.data_service.tables["companies"].update({"name": ""}, Query().uuid == "company0")
+        self.assertEqual([c.name for c in self.data_service.get_companies()], ["Company 0"])
+
+    def test_shared_snapshots(self):
+        """Test reads share the company models and transactions share what they do not change"""
+        self.data_service.insert_companies(self.companies(3))
+        companies = self.data_service.get_companies()
+        self.assertIs(self.data_service.get_companies(), companies)
+        self.assertIs(self.data_service.get_company_by_uuid("company1"), companies[1])
+        data = self.storage.read()
+        roles = data["roles"]
+        row = data["companies"]["2"]
+
+        company = companies[1].model_copy(deep=True)
+        company.name = "Changed"
+        self.data_service.update_company(company)
+
+        self.assertEqual(row["name"], "Company 1")
+        self.assertIs(self.storage.read()["roles"], roles)
+        self.assertIsNot(self.storage.read()["companies"]["2"], row)
+        self.assertIs(self.storage.read()["companies"]["1"], data["companies"]["1"])
+        self.assertEqual(companies[1].name, "Company 1")
+        changed = self.data_service.get_companies()
+        self.assertEqual([c.name for c in changed], ["Company 0", "Changed", "Company 2"])
+        self.assertIs(changed[0], companies[0])
+        self.assertIs(changed[2], companies[2])
+
+    def test_shared_snapshots_external_change(self):
+        """Test the shared models are dropped when the tables are written by another writer"""
+        self.data_service.insert_companies(self.companies(1))
+        self.data_service.get_companies()
+        self.data_service.db.table("companies").update({"name": "Changed", "version": 2})
+        self.assertEqual([c.name for c in self.data_service.get_companies()], ["Changed"])
+
+    def test_versions(self):
+        """Test the versions of the companies increase with the writes changing them"""
+        self.data_service.insert_companies(self.companies(2))
+        self.data_service.add_person("company0", Person(uuid="person0", name="Jane", title=TITLE.MS))
+        with self.data_service.transaction():
+            self.data_service.update_role(Role(uuid="role0", title="Manager", applied_date=date.today()))
+            self.data_service.delete_recruiter("person0", "company0")
+        self.assertEqual([c.version for c in self.data_service.get_companies()], [3, 1])
+
+    def test_stale_update(self):
+        """Test a company changed since it was read is not written over"""
+        self.data_service.insert_companies(self.companies(2))
+        stale = [company.model_copy(deep=True) for company in self.data_service.get_companies()]
+        self.data_service.update_role(Role(uuid="role1", title="Manager", applied_date=date.today()))
+        for company in stale:
+            company.name = "Stale"
+        with self.assertRaises(StaleCompanyError):
+            self.data_service.update_companies(stale)
+        self.assertEqual([c.name for c in self.data_service.get_companies()], ["Company 0", "Company 1"])
+        self.assertEqual(self.data_service.get_company_by_uuid("company1").roles[0].title, "Manager")
+
+    def test_versions_keep_unchanged_companies(self):
+        """Test the models and the indexed words of companies with the same version are kept"""
+        self.data_service.insert_companies(self.companies(3))
+        companies = self.data_service.get_companies()
+        self.data_service.searcher.search("engineer", ranked=True)
+        self.data_service.db.table("companies").update({"name": "Changed", "version": 2}, doc_ids=[2])
+        searcher = self.data_service.searcher
+        with patch.object(searcher, "_index_companies",
+                          wraps=searcher._index_companies) as mock_index:  # pylint: disable=protected-access
+            results = self.data_service.searcher.search("changed", ranked=True)
+        self.assertEqual([[d["uuid"] for d in call.args[0]] for call in mock_index.call_args_list], [["company1"]])
+        self.assertEqual([result.company.uuid for result in results], ["company1"])
+        changed = self.data_service.get_companies()
+        self.assertIs(changed[0], companies[0])
+        self.assertEqual(changed[1].name, "Changed")
+
+    def test_change_events(self):
+        """Test the subscribers get the changes of each write, once it is written"""
+        published = []
+        unsubscribe = self.data_service.subscribe(published.append)
+        self.data_service.insert_companies(self.companies(2))
+        self.data_service.update_role(Role(uuid="role1", title="Manager", applied_date=date.today()))
+        self.data_service.update_role(Role(uuid="role1", title="Manager", applied_date=date.today()))
+        with self.assertRaises(ValidationError):
+            with self.data_service.transaction():
+                self.data_service.delete_company("company0")
+                self.data_service.update_role(Role.model_construct(uuid="role1", title="", applied_date=date.today()))
+        self.data_service.delete_company("company0")
+        unsubscribe()
+        self.data_service.delete_company("company1")
+
+        self.assertEqual(published, [
+            [ChangeEvent(ChangeType.INSERTED, "companies", "company0", "company0", 1),
+             ChangeEvent(ChangeType.INSERTED, "companies", "company1", "company1", 1),
+             ChangeEvent(ChangeType.INSERTED, "roles", "role0", "company0", 1),
+             ChangeEvent(ChangeType.INSERTED, "roles", "role1", "company1", 1)],
+            [ChangeEvent(ChangeType.UPDATED, "roles", "role1", "company1", 2)],
+            [ChangeEvent(ChangeType.DELETED, "companies", "company0", "company0"),
+             ChangeEvent(ChangeType.DELETED, "roles", "role0", "company0")],
+        ])
+
+    def test_subscriber_reads_written_data(self):
+        """Test a subscriber reads the shared models of the written data"""
+        names = []
+        self.data_service.subscribe(lambda events: names.extend(
+            company.name for company in self.data_service.find_companies() if events))
+        self.data_service.insert_companies(self.companies(1))
+        self.assertEqual(names, ["Company 0"])
+        self.assertIs(self.data_service.find_companies()[0], self.data_service.get_companies()[0])
+
+    def test_insert_after_transaction(self):
+        """Test documents inserted after a transaction get new ids"""
+        with self.data_service.transaction():
+            self.data_service.insert_company(Company(uuid="company0", name="Company 0"))
+        self.data_service.insert_company(Company(uuid="company1", name="Company 1"))
+        self.assertEqual(len(self.data_service.get_companies()), 2)
+
+
+class TestDataServiceQueries(unittest.TestCase):
+    """Testing the indexed queries of DataService on an in-memory database"""
+
+    @patch('backend.data_service.BlobStore')
+    @patch('backend.data_service.TinyDB')
+    def setUp(self, MockTinyDB, MockBlobStore): # pylint: disable=arguments-differ
+        MockTinyDB.side_effect = lambda *args, **kwargs: TinyDB(storage=MemoryStorage)
+        self.data_service = DataService()
+        self.mock_blob_store = MockBlobStore.return_value
+        self.data_service.insert_companies([
+            Company(uuid="company0", name="Company 0", roles=[
+                Role(uuid="role0", title="Engineer", applied_date=date(2026, 5, 1),
+                     work_location=WorkLocation.REMOTE, interviews=[
+                         Interview(uuid="interview0", sequence=1, title="Recruiter",
+                                   type=InterviewType.RECRUITER, date=date(2026, 5, 10))
+                     ]),
+            ]),
+            Company(uuid="company1", name="Company 1", roles=[
+                Role(uuid="role1", title="Engineer", applied_date=date(2026, 7, 1),
+                     work_location=WorkLocation.REMOTE, interviews=[
+                         Interview(uuid="interview1", sequence=1, title="Team",
+                                   type=InterviewType.TEAM, date=date(2026, 7, 20))
+                     ]),
+                Role(uuid="role2", title="Manager", applied_date=date(2026, 6, 15),
+                     work_location=WorkLocation.ON_SITE),
+            ]),
+        ])
+
+    def test_find_roles(self):
+        """Test find_roles returns the roles meeting all the criteria in date order"""
+        roles = self.data_service.find_roles(Criterion("roles", "applied_date", date(2026, 6, 1)))
+        self.assertEqual([role.uuid for role in roles], ["role2", "role1"])
+        roles = self.data_service.find_roles(Criterion("roles", "applied_date", date(2026, 6, 1)),
+                                             equals("roles", "work_location", WorkLocation.REMOTE))
+        self.assertEqual([role.uuid for role in roles], ["role1"])
+        self.assertEqual(roles[0].interviews[0].uuid, "interview1")
+
+    def test_find_roles_by_interview(self):
+        """Test find_roles returns the roles with an interview meeting the criteria"""
+        roles = self.data_service.find_roles(equals("interviews", "type", InterviewType.TEAM))
+        self.assertEqual([role.uuid for role in roles], ["role1"])
+
+    def test_find_interviews(self):
+        """Test find_interviews returns the interviews in a date range of the roles meeting the criteria"""
+        interviews = self.data_service.find_interviews(
+            Criterion("interviews", "date", date(2026, 5, 1), date(2026, 7, 31)))
+        self.assertEqual([interview.uuid for interview in interviews], ["interview0", "interview1"])
+        interviews = self.data_service.find_interviews(
+            Criterion("interviews", "date", date(2026, 5, 1), date(2026, 7, 31)),
+            Criterion("roles", "applied_date", date(2026, 6, 1)))
+        self.assertEqual([interview.uuid for interview in interviews], ["interview1"])
+
+    def test_find_companies(self):
+        """Test find_companies returns the companies with a role meeting the criteria"""
+        companies = self.data_service.find_companies(equals("roles", "work_location", WorkLocation.ON_SITE))
+        self.assertEqual([company.uuid for company in companies], ["company1"])
+        self.assertEqual(len(companies[0].roles), 2)
+
+    def test_indexes_follow_writes(self):
+        """Test the indexes are updated by the writes"""
+        criterion = equals("roles", "work_location", WorkLocation.REMOTE)
+        self.assertEqual(len(self.data_service.find_roles(criterion)), 2)
+        self.data_service.update_role(Role(uuid="role2", title="Manager", applied_date=date(2026, 6, 15),
+                                           work_location=WorkLocation.REMOTE))
+        self.data_service.delete_company("company0")
+        self.data_service.add_role("company1", Role(uuid="role3", title="Lead", applied_date=date(2026, 8, 1),
+                                                    work_location=WorkLocation.REMOTE))
+        with patch("backend.data_service.FieldIndexes") as mock_field_indexes:
+            roles = self.data_service.find_roles(criterion)
+        mock_field_indexes.assert_not_called()
+        self.assertEqual(sorted(role.uuid for role in roles), ["role1", "role2", "role3"])
+
+    def test_indexes_rebuilt_after_external_write(self):
+        """Test the indexes are rebuilt when the rows were changed by another writer"""
+        criterion = equals("roles", "work_location", WorkLocation.ON_SITE)
+        self.assertEqual(len(self.data_service.find_roles(criterion)), 1)
+        self.data_service.db.table("roles").update({"work_location": "Remote"}, Query().uuid == "role2")
+        self.assertEqual(self.data_service.find_roles(criterion), [])
+        self.data_service.db.table("roles").insert({"uuid": "role3", "title": "Lead", "applied_date": "2026-08-01",
+                                                    "work_location": "On site", "company_uuid": "company0"})
+        self.assertEqual([role.uuid for role in self.data_service.find_roles(criterion)], ["role3"])
+
+    def test_search_in_db_query(self):
+        """Test search_in_db evaluates the criteria with the indexes and scans the rest"""
+        result = self.data_service.searcher.search_in_db("location:remote")
+        self.assertEqual(sorted(company.uuid for company in result), ["company0", "company1"])
+        result = self.data_service.searcher.search_in_db('type:team after:2026-06-01 name:"company 1"')
+        self.assertEqual([company.uuid for company in result], ["company1"])
+        result = self.data_service.searcher.search_in_db("location:remote title:manager")
+        self.assertEqual([company.uuid for company in result], ["company1"])
+        self.assertEqual(self.data_service.searcher.search_in_db("type:team before:2026-06-30"), [])
+
+    def test_search_in_db_invalid_query(self):
+        """Test search_in_db raises QueryError for an invalid value"""
+        with self.assertRaises(QueryError):
+            self.data_service.searcher.search_in_db("after:yesterday")
+
+    def test_search_in_db_ranked(self):
+        """Test a ranked search orders the companies by relevance and follows the writes"""
+        self.data_service.insert_company(Company(uuid="company2", name="Manager Company", roles=[
+            Role(uuid="role3", title="Engineer", applied_date=date(2026, 1, 1))]))
+        result = self.data_service.searcher.search_in_db("manager")
+        self.assertEqual([company.uuid for company in result], ["company1", "company2"])
+        result = self.data_service.searcher.search_in_db("manager", ranked=True)
+        self.assertEqual([company.uuid for company in result], ["company2", "company1"])
+
+        self.data_service.update_role(Role(uuid="role2", title="Manager manager", applied_date=date(2026, 6, 15)))
+        self.data_service.add_role("company1", Role(title="Manager", applied_date=date(2026, 6, 20)))
+        with patch("backend.companysearch.TextIndex") as mock_text_index:
+            result = self.data_service.searcher.search_in_db("manager", ranked=True)
+        mock_text_index.assert_not_called()
+        self.assertEqual(self.data_service.searcher.text_index.field_lengths["company1"]["title"], 4)
+
+    def test_search_in_db_fuzzy(self):
+        """Test a fuzzy search matches misspelled words"""
+        self.data_service.add_person("company1", Person(name="Jonathan Smith", title=TITLE.MR))
+        self.assertEqual(self.data_service.searcher.search_in_db("jonatan"), [])
+        result = self.data_service.searcher.search_in_db("jonatan", fuzzy=True)
+        self.assertEqual([company.uuid for company in result], ["company1"])
+        result = self.data_service.searcher.search_in_db('"jonatan smiht" compnay', fuzzy=True)
+        self.assertEqual([company.uuid for company in result], ["company1"])
+        self.data_service.update_person(Person(uuid=result[0].recruiters[0].uuid, name="Jane", title=TITLE.MS))
+        self.assertEqual(self.data_service.searcher.search_in_db("jonatan", fuzzy=True), [])
+
+    def test_prepare_fuzzy_search(self):
+        """Test prepare_fuzzy_search builds the dictionary used by the next fuzzy search"""
+        self.data_service.searcher.prepare_fuzzy_search()
+        dictionary = self.data_service.searcher.text_index.dictionary
+        self.data_service.add_person("company1", Person(name="Jonathan Smith", title=TITLE.MR))
+        result = self.data_service.searcher.search_in_db("jonatan", fuzzy=True)
+        self.assertEqual([company.uuid for company in result], ["company1"])
+        self.assertIs(self.data_service.searcher.text_index.dictionary, dictionary)
+
+    def test_search_matches(self):
+        """Test search returns the matched fields of each company with snippets"""
+        self.data_service.add_person("company1", Person(name="Jonathan Smith", title=TITLE.MR))
+        self.mock_blob_store.put.return_value = "role-ref"
+        self.mock_blob_store.get.return_value = "<p>Lots of text about the Manager position</p>"
+        self.data_service.update_role(Role(uuid="role1", title="Engineer", applied_date=date(2026, 7, 1),
+                                           work_location=WorkLocation.REMOTE, description="<p>Text</p>"))
+        results = self.data_service.searcher.search("manager location:remote")
+        self.assertEqual([result.company.uuid for result in results], ["company1"])
+        self.assertEqual(results[0].matches, (
+            SearchMatch("roles[0].work_location", "Remote"),
+            SearchMatch("roles[0].description_ref", "Lots of text about the Manager position"),
+            SearchMatch("roles[1].title", "Manager"),
+        ))
+        results = self.data_service.searcher.search("jonatan", fuzzy=True)
+        self.assertEqual(results[0].matches, (SearchMatch("recruiters[0].name", "Jonathan Smith"),))
+
+
+class TestDataServiceThreads(unittest.TestCase):
+    """Testing DataService used from many threads"""
+
+    @patch('backend.data_service.BlobStore')
+    @patch('backend.data_service.TinyDB')
+    def setUp(self, MockTinyDB, _MockBlobStore): # pylint: disable=arguments-differ
+        MockTinyDB.side_effect = lambda *args, **kwargs: TinyDB(storage=MemoryStorage)
+        self.data_service = DataService()
+        self.data_service.insert_companies([
+            Company(uuid=f"company{number}", name=f"Company {number} version 0", roles=[
+                Role(uuid=f"role{number}", title="Engineer", applied_date=date(2026, 5, number + 1),
+                     work_location=WorkLocation.REMOTE),
+            ])
+            for number in range(20)
+        ])
+
+    def test_searches_during_writes(self):
+        """Test parallel searches see every write whole while the companies are written"""
+        stop = threading.Event()
+
+        def write():
+            try:
+                for version in range(1, 51):
+                    companies = [company.model_copy(deep=True) for company in self.data_service.get_companies()]
+                    for company in companies[:2]:
+                        company.name = f"{company.name.split(' version')[0]} version {version}"
+                    companies[2].roles[0].title = f"Engineer {version}"
+                    self.data_service.update_companies(companies[:3])
+            finally:
+                stop.set()
+
+        def search(options):
+            versions = set()
+            while not stop.is_set():
+                results = self.data_service.searcher.search("version location:remote", **options)
+                self.assertEqual(len(results), 20)
+                names = {result.company.uuid: result.company.name for result in results}
+                versions.add(names["company19"].split()[-1])
+                self.assertEqual(names["company19"].split()[-1], names["company18"].split()[-1])
+                self.assertEqual(len(self.data_service.find_companies(
+                    equals("roles", "work_location", WorkLocation.REMOTE))), 20)
+            return versions
+
+        with ThreadPoolExecutor(5) as executor:
+            searches = [
+                executor.submit(search, options)
+                for options in [{}, {"ranked": True}, {"fuzzy": True}, {"ranked": True, "fuzzy": True}]
+            ]
+            executor.submit(write).result()
+            for searched in searches:
+                self.assertTrue(searched.result())
+        self.assertEqual(self.data_service.get_company_by_uuid("company19").name, "Company 19 version 50")
+        self.assertEqual(
+            [result.company.uuid for result in self.data_service.searcher.search('"Engineer 50"', ranked=True)],
+            ["company17"]
+        )
@@ -1,6 +1,6 @@
 import unittest
 
-from backend.datautils import flatten_dict
+from backend.datautils import Change, apply_changes, diff_documents, flatten_dict, iter_leaves
 
 
 class TestDataUtils(unittest.TestCase):
@@ -41,3 +41,64 @@ class TestDataUtils(unittest.TestCase):
         # Call flatten_dict function and compare with expected output
         flattened_data = flatten_dict(nested_data)
         self.assertEqual(flattened_data, expected_flattened_data)
+        self.assertEqual(
+            flatten_dict({"a": 1, "b": [2, {"c": 3}]}, "doc"),
+            {"doc.a": "1", "doc.b[0]": "2", "doc.b[1].c": "3"}
+        )
+
+    def test_iter_leaves(self):
+        """Tests the iter_leaves function yields the leaves lazily, in order."""
+        nested_data = {
+            "name": "Acme",
+            "roles": [{"title": "Engineer", "description_ref": "blob1", "tags": ["a", "b"]}],
+            "website": None,
+        }
+        self.assertEqual(
+            list(iter_leaves(nested_data)),
+            [("name", "Acme"), ("roles[0].title", "Engineer"), ("roles[0].description_ref", "blob1"),
+             ("roles[0].tags[0]", "a"), ("roles[0].tags[1]", "b"), ("website", "None")]
+        )
+        self.assertEqual(
+            list(iter_leaves(nested_data, keys=False, exclude=("description_ref",))),
+            ["Acme", "Engineer", "a", "b", "None"]
+        )
+        leaves = iter_leaves(nested_data, keys=False)
+        self.assertEqual(next(leaves), "Acme")
+        self.assertEqual(next(leaves), "Engineer")
+
+    def test_diff_documents(self):
+        """Tests the diff_documents function."""
+        old = {
+            "name": "Acme",
+            "website": "acme.com",
+            "roles": [{"uuid": "r1", "title": "Engineer"}, {"uuid": "r2", "title": "Manager"}],
+            "recruiters": [{"uuid": "p1", "name": "Jane"}],
+        }
+        new = {
+            "name": "Acme",
+            "roles": [{"uuid": "r1", "title": "Engineer"}, {"uuid": "r2", "title": "Director"}],
+            "recruiters": [{"uuid": "p2", "name": "John"}],
+        }
+        self.assertEqual(
+            diff_documents(old, new),
+            [
+                Change(("website",), remove=True),
+                Change(("roles", "r2", "title"), "Director"),
+                Change(("recruiters",), [{"uuid": "p2", "name": "John"}]),
+            ]
+        )
+        self.assertEqual(diff_documents(new, new), [])
+
+    def test_apply_changes(self):
+        """Tests the apply_changes function."""
+        old = {
+            "name": "Acme",
+            "website": "acme.com",
+            "roles": [{"uuid": "r1", "interviews": [{"uuid": "i1", "title": "Team"}]}],
+        }
+        new = {
+            "name": "Acme Inc",
+            "roles": [{"uuid": "r1", "interviews": [{"uuid": "i1", "title": "Code", "date": "2026-01-01"}]}],
+        }
+        apply_changes(old, diff_documents(old, new))
+        self.assertEqual(old, new)
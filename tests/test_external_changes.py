@@ -0,0 +1,121 @@
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+from backend.changes import ChangeEvent, ChangeType
+from backend.data_service import DataService, StaleCompanyError
+from backend.models import Company, Interview, InterviewType, Role
+
+
+class TestDataServiceExternalChanges(unittest.TestCase):
+    """Testing DataService sharing its database file with other processes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        data_file = Path(self.temp_dir.name) / "db.json"
+        for patcher in [patch("backend.data_service.get_data_file", return_value=data_file),
+                        patch("backend.data_service.BlobStore")]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.service = DataService()
+        self.other_service = DataService()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(self.other_service.close)
+        self.addCleanup(self.service.close)
+
+    @staticmethod
+    def company(number):
+        """Returns a company with a role"""
+        return Company(uuid=f"company{number}", name=f"Company {number}", roles=[
+            Role(uuid=f"role{number}", title="Engineer", applied_date=date(2026, 5, number + 1))
+        ])
+
+    def test_reload_external_changes(self):
+        """Test only the companies changed by another process are reloaded"""
+        self.service.insert_companies([self.company(1), self.company(2)])
+        self.service.db.storage.flush()
+        self.assertEqual(self.other_service.reload_external_changes(), {"company1", "company2"})
+        unchanged = self.other_service.get_company_by_uuid("company1")
+        self.assertEqual(self.other_service.reload_external_changes(), set())
+
+        self.service.add_interview("role2", Interview(uuid="interview2", sequence=1, title="Team",
+                                                      type=InterviewType.TEAM, date=date(2026, 6, 1)))
+        self.service.db.storage.flush()
+        published = []
+        self.other_service.subscribe(published.append)
+        self.assertEqual(self.other_service.reload_external_changes(), {"company2"})
+        self.assertEqual(published, [[ChangeEvent(ChangeType.UPDATED, "companies", "company2", "company2", 2)]])
+        self.assertIs(self.other_service.get_company_by_uuid("company1"), unchanged)
+        self.assertEqual(self.other_service.get_company_by_interview_uuid("interview2").uuid, "company2")
+        self.assertEqual(len(self.other_service.searcher.search("team", ranked=True)), 1)
+
+    def test_writes_follow_external_changes(self):
+        """Test the writes of two processes changing different companies are both kept"""
+        self.service.insert_companies([self.company(1), self.company(2)])
+        self.service.db.storage.flush()
+        self.other_service.reload_external_changes()
+
+        company1 = self.service.get_company_by_uuid("company1").model_copy(deep=True)
+        company1.name = "Acme"
+        self.service.update_company(company1)
+        self.service.insert_company(self.company(3))
+        self.service.db.storage.flush()
+        self.other_service.delete_company("company2")
+        self.other_service.db.storage.flush()
+
+        self.assertEqual(self.service.reload_external_changes(), {"company2"})
+        self.assertEqual(self.other_service.reload_external_changes(), set())
+        for service in (self.service, self.other_service):
+            self.assertEqual([company.name for company in service.get_companies()], ["Company 3", "Acme"])
+
+    def test_stale_update_of_other_process(self):
+        """Test a company changed by another process can not be updated from a copy read before"""
+        self.service.insert_company(self.company(1))
+        self.service.db.storage.flush()
+        self.other_service.reload_external_changes()
+        stale = self.other_service.get_company_by_uuid("company1").model_copy(deep=True)
+
+        company = self.service.get_company_by_uuid("company1").model_copy(deep=True)
+        company.website = "a.com"
+        self.service.update_company(company)
+        self.service.db.storage.flush()
+        stale.name = "Acme"
+        with self.assertRaises(StaleCompanyError):
+            self.other_service.update_company(stale)
+        self.assertEqual(self.other_service.get_company_by_uuid("company1").model_dump(include={"website", "version"}),
+                         {"website": "a.com", "version": 2})
+
+    def test_undo_after_write_of_other_process(self):
+        """Test an operation is not undone over the rows another process wrote after it"""
+        self.service.insert_company(self.company(1))
+        self.service.db.storage.flush()
+        self.service.add_role("company1", Role(uuid="mine", title="Mine", applied_date=date(2026, 6, 1)))
+        self.service.db.storage.flush()
+        self.other_service.add_role("company1", Role(uuid="theirs", title="Theirs", applied_date=date(2026, 6, 2)))
+        self.other_service.db.storage.flush()
+
+        self.assertFalse(self.service.history.undo())
+        roles = self.service.get_company_by_uuid("company1").roles
+        self.assertEqual([role.uuid for role in roles], ["role1", "mine", "theirs"])
+        self.assertTrue(self.other_service.history.undo())
+        self.other_service.db.storage.flush()
+        self.service.reload_external_changes()
+        roles = self.service.get_company_by_uuid("company1").roles
+        self.assertEqual([role.uuid for role in roles], ["role1", "mine"])
+
+    def test_prune_keeps_descriptions_of_other_process(self):
+        """Test the blobs referred to by the rows another process wrote to the file are not removed"""
+        self.service.blob_store.put.return_value = "role-ref"
+        company = self.company(1)
+        company.roles[0].description = "<p>Role</p>"
+        self.other_service.insert_company(company)
+        self.other_service.db.storage.flush()
+        with patch.object(self.service.blob_store, "prune") as mock_prune:
+            self.service.prune_descriptions()
+        self.assertEqual(set(mock_prune.call_args.args[0]), {"role-ref"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from datetime import date
+
+from backend.fieldindex import Criterion, FieldIndexes, SortedIndex, equals
+from backend.models import InterviewType, WorkLocation
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Testing SortedIndex"""
+
+    def setUp(self):
+        self.index = SortedIndex()
+        for doc_id, value in [(1, "2026-03-01"), (2, "2026-01-15"), (3, "2026-03-01"), (4, "2026-06-30")]:
+            self.index.add(doc_id, value)
+
+    def test_find_range(self):
+        """Test rows between low and high, inclusive, are found in value order"""
+        self.assertEqual(self.index.find("2026-01-15", "2026-03-01"), [2, 1, 3])
+
+    def test_find_open_ends(self):
+        """Test an end which is None is open"""
+        self.assertEqual(self.index.find(low="2026-03-01"), [1, 3, 4])
+        self.assertEqual(self.index.find(high="2026-02-01"), [2])
+        self.assertEqual(self.index.find(), [2, 1, 3, 4])
+
+    def test_reindex_and_remove(self):
+        """Test a row is reindexed with its new value and removed"""
+        self.index.add(1, "2026-12-01")
+        self.index.remove(3)
+        self.index.remove(5)
+        self.assertEqual(self.index.find(), [2, 4, 1])
+
+    def test_row_without_value(self):
+        """Test a row without a value is not indexed"""
+        self.index.add(2, None)
+        self.assertEqual(self.index.find(), [1, 3, 4])
+
+
+class TestFieldIndexes(unittest.TestCase):
+    """Testing FieldIndexes"""
+
+    def setUp(self):
+        self.data = {
+            "roles": {
+                "1": {"uuid": "role1", "applied_date": "2026-05-01", "work_location": "Remote"},
+                "2": {"uuid": "role2", "applied_date": "2026-07-01", "work_location": "On site"},
+            },
+            "interviews": {
+                "1": {"uuid": "interview1", "date": "2026-07-10", "type": "Team"},
+            },
+        }
+        self.indexes = FieldIndexes(self.data)
+
+    def test_find_with_models_values(self):
+        """Test dates and enums of criteria are compared as stored"""
+        self.assertEqual(self.indexes.find(Criterion("roles", "applied_date", date(2026, 6, 1))), [2])
+        self.assertEqual(self.indexes.find(equals("roles", "work_location", WorkLocation.REMOTE)), [1])
+        self.assertEqual(self.indexes.find(equals("interviews", "type", InterviewType.TEAM)), [1])
+
+    def test_find_unindexed_field(self):
+        """Test a criterion on a field without an index raises ValueError"""
+        with self.assertRaises(ValueError):
+            self.indexes.find(equals("roles", "title", "Engineer"))
+
+    def test_is_current(self):
+        """Test indexes with a different number of rows than the data are not current"""
+        self.assertTrue(self.indexes.is_current(self.data))
+        self.indexes.remove_row("roles", 2)
+        self.assertFalse(self.indexes.is_current(self.data))
+        self.indexes.add_row("roles", 2, self.data["roles"]["2"])
+        self.assertTrue(self.indexes.is_current(self.data))
+
+    def test_criterion_matches(self):
+        """Test a criterion matches the rows with a value in its range"""
+        criterion = Criterion("interviews", "date", date(2026, 7, 1), date(2026, 7, 10))
+        self.assertTrue(criterion.matches(self.data["interviews"]["1"]))
+        self.assertFalse(criterion.matches({"date": "2026-07-11"}))
+        self.assertFalse(criterion.matches({}))
@@ -0,0 +1,49 @@
+import unittest
+
+from backend.fuzzyindex import SymmetricDeleteIndex, edit_distance, get_max_distance
+
+
+class TestEditDistance(unittest.TestCase):
+    """Testing edit_distance"""
+
+    def test_edits(self):
+        """Test insertions, deletions, substitutions and swaps count as one edit"""
+        self.assertEqual(edit_distance("gogle", "google", 2), 1)
+        self.assertEqual(edit_distance("google", "gogle", 2), 1)
+        self.assertEqual(edit_distance("amazon", "amazen", 2), 1)
+        self.assertEqual(edit_distance("acme", "amce", 2), 1)
+        self.assertEqual(edit_distance("same", "same", 0), 0)
+
+    def test_bounded(self):
+        """Test a distance over the maximum is None"""
+        self.assertIsNone(edit_distance("kitten", "sitting", 2))
+        self.assertEqual(edit_distance("kitten", "sitting", 3), 3)
+        self.assertIsNone(edit_distance("a", "abcd", 2))
+
+    def test_max_distance(self):
+        """Test shorter words allow fewer edits"""
+        self.assertEqual([get_max_distance(word) for word in ("aws", "gogle", "microsft")], [0, 1, 2])
+
+
+class TestSymmetricDeleteIndex(unittest.TestCase):
+    """Testing SymmetricDeleteIndex"""
+
+    def setUp(self):
+        self.index = SymmetricDeleteIndex(["google", "goggles", "amazon", "microsoft", "microscope"])
+
+    def test_lookup(self):
+        """Test words within the edit distance are found with their distance"""
+        self.assertEqual(self.index.lookup("gogle"), {"google": 1})
+        self.assertEqual(self.index.lookup("microsfot"), {"microsoft": 1})
+        self.assertEqual(self.index.lookup("googles", 2), {"google": 1, "goggles": 1})
+        self.assertEqual(self.index.lookup("amazonian"), {})
+
+    def test_lookup_beyond_prefix(self):
+        """Test edits after the indexed prefix are found"""
+        self.assertEqual(self.index.lookup("microscpoe"), {"microscope": 1})
+
+    def test_remove(self):
+        """Test a removed word is not found"""
+        self.index.remove("google")
+        self.index.remove("unknown")
+        self.assertEqual(self.index.lookup("googles", 2), {"goggles": 1})
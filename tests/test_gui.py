@@ -1,4 +1,14 @@
-from PySide6.QtWidgets import QWidget
+from datetime import date
+
+from PySide6.QtCore import QItemSelectionModel, QSettings, Qt
+from PySide6.QtWidgets import QTreeView, QWidget
+
+from backend.changes import ChangeEvent, ChangeFeed, ChangeType
+from backend.models import Company, Interview, InterviewType, Person, Role, TITLE
+from backend.searchresult import SearchMatch
+from gui.guiutils import keep_company_version
+from gui.mainwindow import CompaniesTreeModel, DataChangeSignals, get_match_cell
+from gui.viewstate import TreeViewState
 
 
 def test_widget_creation(qtbot):
@@ -8,3 +18,120 @@ def test_widget_creation(qtbot):
     widget.show()
 
     assert widget.isVisible()  # Check if the widget is visible
+
+
+def test_companies_tree_model_matches(qtbot):  # pylint: disable=unused-argument
+    """Test the matched cells are highlighted with a snippet and their parents are expanded."""
+    company = Company(name="Acme", roles=[
+        Role(title="Engineer", applied_date=date(2026, 1, 5), interviews=[
+            Interview(sequence=1, title="Team", type=InterviewType.TEAM, date=date(2026, 2, 1),
+                      interviewers=[Person(name="Kube Master", title=TITLE.MR)])
+        ])
+    ])
+    matches = {company.uuid: [SearchMatch("roles[0].interviews[0].interviewers[0].name", "Kube Master")]}
+    model = CompaniesTreeModel(["Name", "Details", "People"], [company], matches=matches)
+
+    interview_index = model.index(0, 2, model.index(0, 0, model.index(0, 0)))
+    assert model.data(interview_index, Qt.ItemDataRole.ToolTipRole) == "Kube Master"
+    assert model.data(interview_index, Qt.ItemDataRole.BackgroundRole) is not None
+    assert model.data(model.index(0, 0), Qt.ItemDataRole.ToolTipRole) is None
+    assert sorted(index.data() for index in model.get_matched_parent_indexes()) == ["Acme", "Engineer"]
+
+
+def test_get_match_cell():
+    """Test the cells showing matched fields."""
+    company = Company(name="Acme", recruiters=[Person(name="Jane", title=TITLE.MS)], roles=[
+        Role(title="Engineer", applied_date=date(2026, 1, 5), interviews=[
+            Interview(sequence=1, title="Team", type=InterviewType.TEAM, date=date(2026, 2, 1))
+        ])
+    ])
+    role, interview = company.roles[0], company.roles[0].interviews[0]
+    assert get_match_cell(company, "name") == (company.uuid, 0)
+    assert get_match_cell(company, "recruiters[0].name") == (company.uuid, 2)
+    assert get_match_cell(company, "roles[0].work_location") == (role.uuid, 2)
+    assert get_match_cell(company, "roles[0].description_ref") == (role.uuid, 0)
+    assert get_match_cell(company, "roles[0].interviews[0].date") == (interview.uuid, 1)
+
+
+def test_companies_tree_model_update_companies(qtbot):  # pylint: disable=unused-argument
+    """Test only the rows of the changed companies are replaced, in the order of the companies."""
+    acme, globex, initech = (Company(name=name) for name in ["Acme", "Globex", "Initech"])
+    model = CompaniesTreeModel(["Name", "Details", "People"], [acme, globex])
+    globex_item = model.get_item(model.index(1, 0))
+
+    renamed = acme.model_copy(update={"name": "Acme Inc"})
+    model.update_companies([initech, globex, renamed], {acme.uuid, initech.uuid})
+
+    assert [model.index(row, 0).data() for row in range(model.rowCount())] == ["Initech", "Globex", "Acme Inc"]
+    assert model.get_item(model.index(1, 0)) is globex_item
+
+
+def test_companies_tree_model_keeps_companies(qtbot):  # pylint: disable=unused-argument
+    """Test the rows keep the model of their company, for the edit windows."""
+    role = Role(title="Engineer", applied_date=date(2026, 1, 1),
+                interviews=[Interview(sequence=1, title="Screening", type=InterviewType.RECRUITER,
+                                      date=date(2026, 1, 2))])
+    acme = Company(name="Acme", roles=[role])
+    model = CompaniesTreeModel(["Name", "Details", "People"], [acme])
+    company_index = model.index(0, 0)
+    role_index = model.index(0, 0, company_index)
+    interview_index = model.index(0, 0, role_index)
+    assert [model.get_item(index).data(5) for index in (company_index, role_index, interview_index)] == [acme] * 3
+    assert model.get_item(company_index).data(5) is acme
+
+
+def test_data_change_signals(qtbot):
+    """Test the change events are emitted as signals, until unsubscribed."""
+    feed = ChangeFeed()
+    signals = DataChangeSignals(feed)
+    events = [ChangeEvent(ChangeType.INSERTED, "roles", "role1", "company1"),
+              ChangeEvent(ChangeType.DELETED, "persons", "person1", "company2")]
+    with qtbot.waitSignals([signals.changed, signals.inserted, signals.deleted]):
+        with qtbot.waitSignal(signals.companies_changed) as companies_changed:
+            feed.publish(events)
+    assert companies_changed.args == [["company1", "company2"]]
+
+    signals.unsubscribe()
+    with qtbot.assertNotEmitted(signals.changed):
+        feed.publish(events)
+
+
+def test_keep_company_version():
+    """Test a copy of a company gets the version of its company written in the block only."""
+    feed = ChangeFeed()
+    company = Company(name="Acme", version=2)
+    with keep_company_version(feed, company):
+        feed.publish([ChangeEvent(ChangeType.INSERTED, "persons", "person1", company.uuid, 3),
+                      ChangeEvent(ChangeType.UPDATED, "companies", "company2", "company2", 7)])
+    feed.publish([ChangeEvent(ChangeType.UPDATED, "companies", company.uuid, company.uuid, 4)])
+    assert company.version == 3
+
+
+def test_tree_view_state(qtbot, tmp_path):
+    """Test the expanded and selected rows are restored by uuid on a new model and session."""
+    companies = [Company(name=f"Company {number}", roles=[Role(title="Engineer", applied_date=date(2026, 1, 1))])
+                 for number in range(3)]
+    view = QTreeView()
+    qtbot.addWidget(view)
+    state = TreeViewState(view)
+    view.setModel(CompaniesTreeModel(["Name", "Details", "People"], companies))
+    view.expand(view.model().get_index(companies[1].uuid))
+    view.selectionModel().setCurrentIndex(
+        view.model().get_index(companies[1].roles[0].uuid),
+        QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows,
+    )
+
+    state.capture()
+    view.setModel(CompaniesTreeModel(["Name", "Details", "People"], [companies[2], companies[1]]))
+    state.restore()
+    role_index = view.model().get_index(companies[1].roles[0].uuid)
+    assert view.isExpanded(role_index.parent())
+    assert view.selectionModel().selectedRows() == [role_index]
+    assert view.currentIndex() == role_index
+
+    settings = QSettings(str(tmp_path / "settings.ini"), QSettings.Format.IniFormat)
+    state.save(settings)
+    loaded = TreeViewState(QTreeView())
+    loaded.load(settings)
+    role_uuid = companies[1].roles[0].uuid
+    assert (loaded.expanded, loaded.selected, loaded.current) == ({companies[1].uuid}, [role_uuid], role_uuid)
@@ -0,0 +1,172 @@
+import unittest
+from contextlib import nullcontext
+from datetime import date
+from unittest.mock import patch
+
+from tinydb import TinyDB
+from tinydb.storages import MemoryStorage
+from tinydb.table import Document
+
+from backend.changes import ChangeEvent, ChangeType
+from backend.data_service import DataService
+from backend.fieldindex import equals
+from backend.history import OperationLog, RowChange
+from backend.models import Company, Person, Role, TITLE, WorkLocation
+
+
+def make_companies(count):
+    """Returns the given number of companies with a role"""
+    return [
+        Company(uuid=f"company{number}", name=f"Company {number}",
+                roles=[Role(uuid=f"role{number}", title="Engineer", applied_date=date(2026, 1, 1))])
+        for number in range(count)
+    ]
+
+
+class TestOperationLog(unittest.TestCase):
+    """Testing OperationLog"""
+
+    def setUp(self):
+        self.applied = []
+        self.log = OperationLog(self.apply, nullcontext, max_operations=2)
+
+    def apply(self, operation):
+        """Records the operation and commits its inverse, as a transaction writing it back does"""
+        self.applied.append(operation)
+        for change in operation:
+            self.log.record(change.table, change.doc_id, change.after)
+        self.log.commit({change.table: {str(change.doc_id): change.before} for change in operation})
+
+    def commit(self, name):
+        """Commits an operation renaming the company with doc id 1"""
+        self.log.record("companies", 1, {"name": "before"})
+        self.log.commit({"companies": {"1": {"name": name}}})
+
+    def test_undo_redo(self):
+        """Test undo applies the last operation and redo applies its inverse"""
+        self.commit("Acme")
+        self.assertTrue(self.log.undo())
+        self.assertEqual(self.applied, [(RowChange("companies", 1, {"name": "before"}, {"name": "Acme"}),)])
+        self.assertTrue(self.log.redo())
+        self.assertEqual(self.applied[1], (RowChange("companies", 1, {"name": "Acme"}, {"name": "before"}),))
+        self.assertTrue(self.log.can_undo)
+        self.assertFalse(self.log.can_redo)
+
+    def test_max_operations(self):
+        """Test only the last operations are kept and unchanged rows are not"""
+        for name in ["Acme", "Globex", "Initech"]:
+            self.commit(name)
+        self.commit("before")
+        self.assertTrue(self.log.undo())
+        self.assertTrue(self.log.undo())
+        self.assertFalse(self.log.undo())
+        self.assertEqual([operation[0].after for operation in self.applied], [{"name": "Initech"}, {"name": "Globex"}])
+
+    def test_failed_undo(self):
+        """Test an operation which could not be undone can be undone again"""
+        self.log = OperationLog(self.fail_apply, nullcontext)
+        self.commit("Acme")
+        with self.assertRaises(OSError):
+            self.log.undo()
+        self.assertTrue(self.log.can_undo)
+        self.assertFalse(self.log.can_redo)
+
+    def clear_log(self):
+        """Clears the log, as a reload finding changes of other writers does"""
+        self.log.clear()
+
+    def test_reload_before_undo(self):
+        """Test nothing is undone when the reload of the changes of other writers cleared the log"""
+        self.log = OperationLog(self.apply, nullcontext, reload=self.clear_log)
+        self.commit("Acme")
+        self.assertFalse(self.log.undo())
+        self.assertEqual(self.applied, [])
+
+    @staticmethod
+    def fail_apply(_operation):
+        """Fails to apply the operation"""
+        raise OSError("disk full")
+
+
+class TestDataServiceHistory(unittest.TestCase):
+    """Testing the undo and redo of the writes of DataService on an in-memory database"""
+
+    @patch('backend.data_service.BlobStore')
+    @patch('backend.data_service.TinyDB')
+    def setUp(self, MockTinyDB, MockBlobStore): # pylint: disable=arguments-differ
+        MockTinyDB.side_effect = lambda *args, **kwargs: TinyDB(storage=MemoryStorage)
+        self.mock_blob_store = MockBlobStore.return_value
+        self.data_service = DataService()
+        self.storage = self.data_service.db.storage
+
+    def test_undo_redo(self):
+        """Test undo and redo write back the rows changed by the operations, in their places"""
+        self.data_service.insert_companies(make_companies(3))
+        self.data_service.add_person("company1", Person(uuid="person1", name="Jane", title=TITLE.MS))
+        stored = self.storage.read()
+        self.data_service.delete_company("company1")
+        self.data_service.update_role(Role(uuid="role2", title="Manager", applied_date=date(2026, 1, 1)))
+
+        self.assertTrue(self.data_service.history.undo())
+        self.assertTrue(self.data_service.history.undo())
+        self.assertEqual({table: rows for table, rows in self.storage.read().items() if table != "companies"},
+                         {table: rows for table, rows in stored.items() if table != "companies"})
+        self.assertEqual([c.uuid for c in self.data_service.get_companies()], ["company0", "company1", "company2"])
+        self.assertEqual(self.data_service.get_company_by_uuid("company1").recruiters[0].name, "Jane")
+        self.assertEqual(self.data_service.get_company_by_uuid("company1").version, 3)
+
+        self.assertTrue(self.data_service.history.redo())
+        self.assertEqual([c.uuid for c in self.data_service.get_companies()], ["company0", "company2"])
+        self.assertIsNone(self.data_service.get_company_by_role_uuid("role1"))
+        self.assertEqual(sorted(r.uuid for r in self.data_service.find_roles(
+            equals("roles", "work_location", WorkLocation.HYBRID))), ["role0", "role2"])
+        self.assertTrue(self.data_service.history.can_redo)
+        self.data_service.delete_company("company0")
+        self.assertFalse(self.data_service.history.can_redo)
+        self.assertFalse(self.data_service.history.redo())
+
+    def test_undo_keeps_changed_rows_only(self):
+        """Test an operation keeps the rows its transaction changed, as they were"""
+        self.data_service.insert_companies(make_companies(50))
+        company = self.data_service.get_company_by_uuid("company7").model_copy(deep=True)
+        company.name = "Acme"
+        self.data_service.update_company(company)
+        operation = self.data_service.history._undo_stack[-1]  # pylint: disable=protected-access
+        self.assertEqual([(change.table, change.before["name"], change.after["name"]) for change in operation],
+                         [("companies", "Company 7", "Acme")])
+
+        published = []
+        self.data_service.subscribe(published.append)
+        self.data_service.history.undo()
+        self.assertEqual(published, [[ChangeEvent(ChangeType.UPDATED, "companies", "company7", "company7", 3)]])
+        self.assertEqual(self.data_service.get_company_by_uuid("company7").name, "Company 7")
+        self.assertEqual(self.data_service.searcher.search("acme"), [])
+
+    def test_undo_finds_rows_by_uuid(self):
+        """Test undo changes the rows it recorded when other rows took their document ids"""
+        self.data_service.insert_companies(make_companies(1))
+        self.data_service.add_role("company0", Role(uuid="mine", title="Mine", applied_date=date(2026, 1, 1)))
+        roles = self.data_service.db.table("roles")
+        mine = roles.get(doc_id=2)
+        roles.remove(doc_ids=[2])
+        roles.insert(Document({**mine, "uuid": "theirs", "title": "Theirs"}, doc_id=2))
+        roles.insert(dict(mine))
+
+        self.assertTrue(self.data_service.history.undo())
+        self.assertEqual([r.uuid for r in self.data_service.get_company_by_uuid("company0").roles], ["role0", "theirs"])
+        self.assertTrue(self.data_service.history.redo())
+        self.assertEqual([r.uuid for r in self.data_service.get_company_by_uuid("company0").roles],
+                         ["role0", "theirs", "mine"])
+
+    def test_prune_keeps_undoable_descriptions(self):
+        """Test the descriptions of the rows which can be restored are not pruned"""
+        self.data_service.insert_companies(make_companies(1))
+        self.data_service.update_role(Role(uuid="role0", title="Engineer", applied_date=date(2026, 1, 1),
+                                           description_ref="blob1"))
+        self.data_service.delete_role("role0")
+        self.data_service.prune_descriptions()
+        self.assertEqual(set(self.mock_blob_store.prune.call_args.args[0]), {"blob1"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import patch
-from backend.htmlextractor import get_html_text, HTMLTextExtractor
+from backend.htmlextractor import get_html_text, get_html_texts, HTMLTextExtractor
 
 
 class TestHTMLTextExtractor(unittest.TestCase):
@@ -42,3 +42,27 @@ class TestHTMLTextExtractor(unittest.TestCase):
         html = "<html><body>Test text</body></html>"
         get_html_text(html)
         mock_feed.assert_called_once()
+
+
+class TestGetHTMLTexts(unittest.TestCase):
+    """Tests the get_html_texts function."""
+
+    def test_keeps_input_order(self):
+        """Tests that the texts are returned in the order of the descriptions."""
+        descriptions = ["<body>First</body>", None, "<p>Second</p>", ""]
+        self.assertEqual(get_html_texts(descriptions), ["First", "", "Second", ""])
+
+    def test_deduplicates_identical_descriptions(self):
+        """Tests that identical descriptions are extracted only once."""
+        descriptions = ["<p>Same</p>", "<p>Other</p>", "<p>Same</p>", "<p>Same</p>"]
+        with patch("backend.htmlextractor.get_html_text", side_effect=get_html_text) as mock_get:
+            texts = get_html_texts(descriptions, max_workers=1)
+        self.assertEqual(texts, ["Same", "Other", "Same", "Same"])
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_parallel_extraction_matches_serial(self):
+        """Tests that extraction in a process pool gives the same texts as serial extraction."""
+        descriptions = [f"<html><body><p>Item {i % 50}</p></body></html>" for i in range(200)]
+        with patch("backend.htmlextractor.PARALLEL_THRESHOLD", 10):
+            parallel_texts = get_html_texts(descriptions, max_workers=2, chunksize=5)
+        self.assertEqual(parallel_texts, [get_html_text(d) for d in descriptions])
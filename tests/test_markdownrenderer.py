@@ -0,0 +1,37 @@
+import unittest
+from unittest.mock import patch
+
+from markdown import Markdown, markdown
+
+from backend.markdownrenderer import MarkdownRenderer, render_markdown
+
+
+class TestMarkdownRenderer(unittest.TestCase):
+    """Testing MarkdownRenderer"""
+
+    def test_render(self):
+        """Test the rendered HTML is the same as the markdown function"""
+        source = "# Title\n\nSome *text*\n\n- one\n- two"
+        self.assertEqual(MarkdownRenderer().render(source), markdown(source))
+        self.assertEqual(render_markdown(source), markdown(source))
+
+    def test_render_cached(self):
+        """Test a source is converted only once"""
+        renderer = MarkdownRenderer()
+        with patch.object(Markdown, "convert", return_value="<p>x</p>") as mock_convert:
+            renderer.render("x")
+            renderer.render("x")
+        mock_convert.assert_called_once_with("x")
+
+    def test_render_resets_converter(self):
+        """Test state of a conversion does not leak into the next one"""
+        renderer = MarkdownRenderer()
+        renderer.render("[job][ad]\n\n[ad]: https://example.com")
+        self.assertNotIn("href", renderer.render("[job][ad]"))
+
+    def test_cache_size(self):
+        """Test only the most recently rendered sources are cached"""
+        renderer = MarkdownRenderer(cache_size=2)
+        for source in ["a", "b", "c"]:
+            renderer.render(source)
+        self.assertEqual(len(renderer._cache), 2)  # pylint: disable=protected-access
@@ -0,0 +1,103 @@
+import json
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+from tinydb import TinyDB
+from tinydb.storages import MemoryStorage
+
+from backend.data_service import DataService
+from backend.models import Company, Interview, InterviewType, Person, Role, TITLE
+from backend.searchresult import SearchMatch
+
+# A description as written by QTextEdit, the way earlier versions stored it in the company document.
+QT_DESCRIPTION = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.0//EN" "http://www.w3.org/TR/REC-html40/strict.dtd">\n'
+    '<html><head><meta name="qrichtext" content="1" /><meta charset="utf-8" /><style type="text/css">\n'
+    "p, li { white-space: pre-wrap; }\n"
+    "</style></head><body style=\" font-family:'Sans Serif'; font-size:9pt; font-weight:400;\">\n"
+    '<p style=" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; '
+    '-qt-block-indent:0; text-indent:0px;">Runs <span style=" font-weight:700;">Kubernetes</span> '
+    "clusters</p></body></html>"
+)
+
+
+class TestDataServiceMigration(unittest.TestCase):
+    """Testing the migration of nested company documents to separate tables"""
+
+    @patch('backend.data_service.BlobStore')
+    @patch('backend.data_service.TinyDB')
+    def test_migrate_nested_companies(self, mock_tiny_db, _mock_blob_store):
+        """Test companies with nested roles, interviews and persons are split into rows"""
+        db = TinyDB(storage=MemoryStorage)
+        company = Company(
+            uuid="12345",
+            name="Test Company",
+            recruiters=[Person(uuid="recruiter123", name="Recruiter", title=TITLE.MR)],
+            roles=[Role(uuid="role123", title="Engineer", applied_date=date.today(),
+                        interviews=[Interview(uuid="interview123", sequence=1, title="Recruiter",
+                                              type=InterviewType.RECRUITER, date=date.today())])]
+        )
+        db.table("companies").insert_multiple([
+            {"uuid": "67890", "name": "Migrated Company"},
+            json.loads(company.model_dump_json(exclude_none=True)),
+        ])
+        mock_tiny_db.return_value = db
+        with patch.object(db.storage, "write", wraps=db.storage.write) as mock_write:
+            data_service = DataService()
+        mock_write.assert_called_once()
+
+        self.assertEqual(db.table("companies").all(), [{"uuid": "67890", "name": "Migrated Company"},
+                                                       {"uuid": "12345", "name": "Test Company", "version": 1}])
+        self.assertEqual(len(db.table("roles")), 1)
+        self.assertEqual(len(db.table("interviews")), 1)
+        self.assertEqual(len(db.table("persons")), 1)
+        self.assertEqual(data_service.get_company_by_uuid("12345"), company.model_copy(update={"version": 1}))
+
+    @patch('backend.data_service.BlobStore')
+    @patch('backend.data_service.TinyDB')
+    def test_migrate_without_nested_companies(self, mock_tiny_db, _mock_blob_store):
+        """Test nothing is written when there is nothing to migrate"""
+        db = TinyDB(storage=MemoryStorage)
+        db.table("companies").insert({"uuid": "67890", "name": "Migrated Company"})
+        mock_tiny_db.return_value = db
+        with patch.object(db.storage, "write") as mock_write:
+            DataService()
+        mock_write.assert_not_called()
+
+    def test_migrate_database_file_with_descriptions(self):
+        """Test the inline descriptions of a database file of earlier versions are moved to the
+        blob store in canonical form, and are indexed and searched as text"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_file = Path(temp_dir) / "db.json"
+            data_file.write_text(json.dumps({"companies": {"1": {
+                "uuid": "company1", "name": "Acme",
+                "recruiters": [{"uuid": "person1", "name": "Jane", "title": "Ms", "description": QT_DESCRIPTION}],
+                "roles": [{"uuid": "role1", "title": "Engineer", "applied_date": "2026-01-01",
+                           "employment_type": "Full time", "work_location": "Hybrid",
+                           "description": QT_DESCRIPTION, "interviews": []}],
+            }}}))
+            with patch("backend.data_service.get_data_file", return_value=data_file), \
+                    patch("backend.data_service.get_blob_dir", return_value=Path(temp_dir) / "blobs"):
+                data_service = DataService()
+                data_service.close()
+                migrated = json.loads(data_file.read_text())
+                rows = [*migrated["roles"].values(), *migrated["persons"].values()]
+                self.assertTrue(all("description" not in row for row in rows))
+                self.assertEqual(len({row["description_ref"] for row in rows}), 1)
+                self.assertNotIn("qrichtext", data_file.read_text())
+
+                data_service = DataService()
+                [role] = data_service.load_descriptions(data_service.get_company_by_uuid("company1").roles)
+                self.assertIn("Kubernetes", role.description)
+                results = data_service.searcher.search("kubernets", ranked=True, fuzzy=True)
+                self.assertEqual([result.company.uuid for result in results], ["company1"])
+                self.assertIn(SearchMatch("roles[0].description_ref", "Runs Kubernetes clusters"),
+                              results[0].matches)
+                data_service.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
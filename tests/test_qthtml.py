@@ -0,0 +1,66 @@
+import unittest
+
+from PySide6.QtWidgets import QTextEdit
+
+from backend.qthtml import canonicalize_html, restore_html, QT_HTML_HEAD, QT_HTML_TAIL
+
+QT_DOCUMENT = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.0//EN" "http://www.w3.org/TR/REC-html40/strict.dtd">\n'
+    '<html><head><meta name="qrichtext" content="1" /><meta charset="utf-8" /><style type="text/css">\n'
+    "p, li { white-space: pre-wrap; }\n"
+    "</style></head><body style=\" font-family:'Sans Serif'; font-size:9pt; font-weight:400;\">\n"
+    '<p style=" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; '
+    '-qt-block-indent:0; text-indent:0px;">Hello <span style=" font-weight:700;">bo</span>'
+    '<span style=" font-weight:700;">ld</span></p></body></html>'
+)
+
+
+class TestQtHtml(unittest.TestCase):
+    """Testing the qthtml module."""
+
+    def test_canonicalize_html(self):
+        """Tests that the head, default declarations and redundant spans are removed."""
+        self.assertEqual(
+            canonicalize_html(QT_DOCUMENT),
+            '<p style="margin-top:12px;margin-bottom:12px">Hello <span style="font-weight:700">bold</span></p>',
+        )
+
+    def test_canonicalize_html_is_idempotent(self):
+        """Tests that canonicalizing a canonical description does not change it."""
+        canonical = canonicalize_html(QT_DOCUMENT)
+        self.assertEqual(canonicalize_html(restore_html(canonical)), canonical)
+
+    def test_canonicalize_html_without_body(self):
+        """Tests that a description which is not a Qt document is kept as it is."""
+        self.assertEqual(canonicalize_html("plain text"), "plain text")
+        self.assertEqual(canonicalize_html(None), "")
+
+    def test_restore_html(self):
+        """Tests that a canonical description is restored to a complete document."""
+        self.assertEqual(restore_html("<p>x</p>"), f"{QT_HTML_HEAD}<p>x</p>{QT_HTML_TAIL}")
+        self.assertEqual(restore_html(QT_DOCUMENT), QT_DOCUMENT)
+        self.assertEqual(restore_html(None), "")
+
+
+def test_canonical_html_renders_same_document(qtbot):
+    """Tests that QTextEdit loads the restored canonical description as the original document."""
+    original = QTextEdit()
+    qtbot.addWidget(original)
+    original.setHtml(
+        "<h1>Title</h1><p>Some <b>bold</b>   text</p><ul><li>one</li><li>two</li></ul>"
+        "<p style='margin-left:20px'><span style='color:red'>r</span><span style='color:red'>ed</span></p>"
+    )
+    html = original.toHtml()
+
+    restored = QTextEdit(restore_html(canonicalize_html(html)))
+    qtbot.addWidget(restored)
+
+    assert len(canonicalize_html(html)) < len(html) / 2
+    assert restored.toHtml() == html
+
+
+def test_empty_document_is_empty_string(qtbot):
+    """Tests that an empty QTextEdit document is stored as an empty string."""
+    text_edit = QTextEdit()
+    qtbot.addWidget(text_edit)
+    assert canonicalize_html(text_edit.toHtml()) == ""
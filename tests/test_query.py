@@ -0,0 +1,57 @@
+import unittest
+from datetime import date
+
+from backend.fieldindex import Criterion, equals
+from backend.models import InterviewType, WorkLocation
+from backend.query import QueryError, QueryPlan, ScanFilter, parse_query
+
+TODAY = date(2026, 3, 10)
+
+
+class TestParseQuery(unittest.TestCase):
+    """Testing parse_query"""
+
+    def test_plain_text(self):
+        """Test words and quoted phrases are plain text terms"""
+        self.assertEqual(parse_query('acme "senior engineer"', TODAY), QueryPlan(terms=("acme", "senior engineer")))
+
+    def test_conditions(self):
+        """Test the conditions on indexed fields are criteria and the others are filters"""
+        plan = parse_query('type:"Code technical" after:2026-01-01 location:remote name:acme', TODAY)
+        self.assertEqual(plan.criteria, (
+            equals("interviews", "type", InterviewType.TECH_CODE),
+            Criterion("roles", "applied_date", low=date(2026, 1, 1)),
+            equals("roles", "work_location", WorkLocation.REMOTE),
+        ))
+        self.assertEqual(plan.filters, (ScanFilter("name", "acme"),))
+        self.assertEqual(plan.search_terms, ("acme",))
+
+    def test_relative_dates(self):
+        """Test dates relative to today"""
+        plan = parse_query("interview-after:today interview-before:+7d", TODAY)
+        self.assertEqual(plan.criteria, (
+            Criterion("interviews", "date", low=TODAY),
+            Criterion("interviews", "date", high=date(2026, 3, 17)),
+        ))
+
+    def test_enum_names(self):
+        """Test enum values are parsed by name or value, ignoring case and punctuation"""
+        self.assertEqual(parse_query("location:on-site", TODAY).criteria[0].low, WorkLocation.ON_SITE)
+        self.assertEqual(parse_query("type:tech_code", TODAY).criteria[0].low, InterviewType.TECH_CODE)
+
+    def test_unknown_key(self):
+        """Test a condition with an unknown key is plain text"""
+        self.assertEqual(parse_query("https://acme.com", TODAY).terms, ("https://acme.com",))
+
+    def test_invalid_values(self):
+        """Test invalid values raise QueryError"""
+        with self.assertRaises(QueryError):
+            parse_query("after:2026-13-01", TODAY)
+        with self.assertRaises(QueryError):
+            parse_query("location:moon", TODAY)
+
+    def test_scan_filter(self):
+        """Test a filter matches the field without the list indexes"""
+        scan_filter = ScanFilter("roles.title", "engineer")
+        self.assertTrue(scan_filter.matches([("name", "Acme"), ("roles[1].title", "Senior Engineer")]))
+        self.assertFalse(scan_filter.matches([("name", "Engineer"), ("roles[0].title", "Manager")]))
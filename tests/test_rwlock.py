@@ -0,0 +1,78 @@
+import threading
+import unittest
+
+from backend.rwlock import ReadWriteLock
+
+
+class TestReadWriteLock(unittest.TestCase):
+    """Testing ReadWriteLock"""
+
+    def setUp(self):
+        self.lock = ReadWriteLock()
+
+    def test_readers_share_the_lock(self):
+        """Test readers hold the lock together"""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            with self.lock.read():
+                barrier.wait()
+
+        threads = [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+
+    def test_writer_waits_for_readers(self):
+        """Test a writer waits for the readers, and new readers wait for the waiting writer"""
+        events = []
+        reading = threading.Event()
+        release = threading.Event()
+
+        def read():
+            with self.lock.read():
+                reading.set()
+                release.wait(5)
+                events.append("first read")
+
+        def write():
+            with self.lock.write():
+                events.append("write")
+
+        def read_again():
+            with self.lock.read():
+                events.append("second read")
+
+        first = threading.Thread(target=read)
+        first.start()
+        reading.wait(5)
+        writer = threading.Thread(target=write)
+        writer.start()
+        while not self.lock._waiting_writers:  # pylint: disable=protected-access
+            threading.Event().wait(0.001)
+        second = threading.Thread(target=read_again)
+        second.start()
+        release.set()
+        for thread in (first, writer, second):
+            thread.join()
+        self.assertEqual(events, ["first read", "write", "second read"])
+
+    def test_reentrant(self):
+        """Test the writer can read and write again, and a reader cannot write"""
+        with self.lock.write():
+            with self.lock.read():
+                with self.lock.write():
+                    pass
+        with self.lock.read():
+            with self.lock.read():
+                with self.assertRaises(RuntimeError):
+                    with self.lock.write():
+                        pass
+        with self.lock.write():
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
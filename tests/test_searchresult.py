@@ -0,0 +1,26 @@
+import unittest
+
+from backend.searchresult import find_match, get_snippet
+
+
+class TestSearchResult(unittest.TestCase):
+    """Testing the search match helpers"""
+
+    def test_find_match(self):
+        """Test the first phrase found is located, ignoring case"""
+        self.assertEqual(find_match("Senior Python Engineer", ["java", "python"]), (7, 13))
+        self.assertIsNone(find_match("Senior Python Engineer", ["java"]))
+
+    def test_find_similar_word(self):
+        """Test a similar word is located when no phrase is found"""
+        self.assertEqual(find_match("Worked at Google", ["gogle"], {"google"}), (10, 16))
+
+    def test_get_snippet(self):
+        """Test the snippet is cut around the match with ellipses"""
+        text = "word " * 40 + "kubernetes" + " word" * 40
+        snippet = get_snippet(text, 200, 210, width=30)
+        self.assertTrue(snippet.startswith("…"))
+        self.assertTrue(snippet.endswith("…"))
+        self.assertIn("kubernetes", snippet)
+        self.assertLessEqual(len(snippet), 32)
+        self.assertEqual(get_snippet("Short  text", 0, 5), "Short text")
@@ -0,0 +1,176 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from tinydb import TinyDB
+from tinydb.storages import JSONStorage, MemoryStorage
+
+from backend.storage import WriteBehindMiddleware, merge_data
+
+
+class RecordingStorage(MemoryStorage):
+    """Memory storage recording its writes, which wait for the release event"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.writes = []
+        self.fail = False
+
+    def write(self, data):
+        self.release.wait(5)
+        if self.fail:
+            raise OSError("disk full")
+        self.writes.append(data)
+        super().write(data)
+
+
+class TestWriteBehindMiddleware(unittest.TestCase):
+    """Testing WriteBehindMiddleware"""
+
+    def setUp(self):
+        self.errors = []
+        self.db = TinyDB(storage=WriteBehindMiddleware(RecordingStorage, self.errors.append))
+        self.middleware = self.db.storage
+        self.backing = self.middleware.storage
+
+    def test_reads_see_writes_before_they_are_written(self):
+        """Test the data is read from memory while the writer thread waits"""
+        self.db.table("companies").insert({"name": "Acme"})
+
+        self.assertEqual(self.db.table("companies").all(), [{"name": "Acme"}])
+        self.assertEqual(self.backing.writes, [])
+        self.backing.release.set()
+        self.middleware.flush()
+        self.assertEqual(self.backing.read(), {"companies": {"1": {"name": "Acme"}}})
+
+    def test_writes_in_order(self):
+        """Test the queued writes are written in order, the last one written last"""
+        for name in ["Acme", "Globex", "Initech"]:
+            self.middleware.write({"companies": {"1": {"name": name}}})
+        self.backing.release.set()
+        self.db.close()
+
+        self.assertEqual(self.backing.writes[-1], {"companies": {"1": {"name": "Initech"}}})
+        self.assertLessEqual(len(self.backing.writes), 3)
+
+    def test_failed_write(self):
+        """Test a failed write is reported and the next write writes the whole data"""
+        self.backing.fail = True
+        self.backing.release.set()
+        self.middleware.write({"companies": {"1": {"name": "Acme"}}})
+        self.middleware.flush()
+        self.backing.fail = False
+        self.middleware.write({"companies": {"1": {"name": "Acme"}, "2": {"name": "Globex"}}})
+        self.middleware.flush()
+
+        self.assertEqual([str(error) for error in self.errors], ["disk full"])
+        self.assertEqual(self.backing.read(), {"companies": {"1": {"name": "Acme"}, "2": {"name": "Globex"}}})
+
+    def test_queued_writes_are_written_at_exit(self):
+        """Test the queued data is written when the interpreter exits without closing the storage"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "db.json"
+            script = (
+                "import sys, time\n"
+                "from tinydb import TinyDB\n"
+                "from tinydb.storages import JSONStorage\n"
+                "from backend.storage import WriteBehindMiddleware\n"
+                "class SlowStorage(JSONStorage):\n"
+                "    def write(self, data):\n"
+                "        time.sleep(0.5)\n"
+                "        super().write(data)\n"
+                "TinyDB(sys.argv[1], storage=WriteBehindMiddleware(SlowStorage)).insert({'name': 'Acme'})\n"
+            )
+            subprocess.run([sys.executable, "-c", script, str(path)], check=True, timeout=30,
+                           env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)})
+            self.assertEqual(TinyDB(path).all(), [{"name": "Acme"}])
+
+
+class TestMergeData(unittest.TestCase):
+    """Testing merge_data"""
+
+    def test_merge_data(self):
+        """Test the rows changed since the base are applied to the data of the other writer"""
+        acme, globex, initech = ({"uuid": uuid, "name": uuid.title()} for uuid in ["acme", "globex", "initech"])
+        base = {"companies": {"1": acme, "2": globex}, "roles": {}}
+        mine = {"companies": {"1": {**acme, "name": "Acme Inc"}, "3": initech}, "roles": base["roles"]}
+        theirs = {"companies": {"1": acme, "2": globex, "3": {"uuid": "hooli", "name": "Hooli"}},
+                  "roles": {"1": {"uuid": "role"}}}
+
+        self.assertEqual(merge_data(base, mine, theirs), {
+            "companies": {"1": {**acme, "name": "Acme Inc"}, "3": {"uuid": "hooli", "name": "Hooli"}, "4": initech},
+            "roles": {"1": {"uuid": "role"}},
+        })
+
+    def test_removed_row_changed_by_other_writer_is_kept(self):
+        """Test a row removed since the base is kept when the other writer changed it"""
+        base = {"companies": {"1": {"uuid": "acme", "name": "Acme"}}}
+        theirs = {"companies": {"1": {"uuid": "acme", "name": "Acme Inc"}}}
+
+        self.assertEqual(merge_data(base, {"companies": {}}, theirs), theirs)
+
+    def test_row_changed_by_both_writers(self):
+        """Test the fields each writer changed in a row are merged, after both of their versions"""
+        acme = {"uuid": "acme", "name": "Acme", "website": None, "version": 1}
+        base = {"companies": {"1": acme}}
+        mine = {"companies": {"1": {**acme, "name": "Acme Inc", "version": 2}}}
+        theirs = {"companies": {"1": {**acme, "website": "a.com", "version": 3}}}
+
+        self.assertEqual(merge_data(base, mine, theirs), {
+            "companies": {"1": {"uuid": "acme", "name": "Acme Inc", "website": "a.com", "version": 4}},
+        })
+
+
+class TestWriteBehindMiddlewareFile(unittest.TestCase):
+    """Testing WriteBehindMiddleware sharing a file with other processes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.temp_dir.cleanup)
+        path = Path(self.temp_dir.name) / "db.json"
+        self.db = TinyDB(path, storage=WriteBehindMiddleware(JSONStorage))
+        self.other_db = TinyDB(path, storage=WriteBehindMiddleware(JSONStorage))
+        self.addCleanup(self.other_db.close)
+        self.addCleanup(self.db.close)
+
+    def test_changed_on_disk(self):
+        """Test the writes of the other process are detected and reloaded"""
+        self.other_db.storage.read()
+        self.db.table("companies").insert({"uuid": "acme"})
+        self.db.storage.flush()
+        self.assertFalse(self.db.storage.changed_on_disk())
+        self.assertTrue(self.other_db.storage.changed_on_disk())
+
+        self.other_db.table("companies").insert({"uuid": "globex"})
+        self.other_db.storage.flush()
+        merged = {"companies": {"1": {"uuid": "acme"}, "2": {"uuid": "globex"}}}
+        self.assertTrue(self.db.storage.changed_on_disk())
+        self.assertEqual(self.db.storage.reload(), merged)
+        self.assertFalse(self.db.storage.changed_on_disk())
+        self.assertEqual(self.other_db.storage.reload(), merged)
+        self.assertTrue(Path(f"{self.db.storage.path}.lock").exists())
+
+    def test_same_row_written_by_both(self):
+        """Test a row the other process changed since it was read is merged, not overwritten"""
+        acme = {"uuid": "acme", "name": "Acme", "website": None, "version": 1}
+        self.db.storage.write({"companies": {"1": acme}})
+        self.db.storage.flush()
+        self.other_db.storage.read()
+
+        self.db.storage.write({"companies": {"1": {**acme, "website": "a.com", "version": 2}}})
+        self.db.storage.flush()
+        self.other_db.storage.write({"companies": {"1": {**acme, "name": "Acme Inc", "version": 2}}})
+        self.other_db.storage.flush()
+
+        merged = {"companies": {"1": {"uuid": "acme", "name": "Acme Inc", "website": "a.com", "version": 3}}}
+        self.assertEqual(self.db.storage.reload(), merged)
+        self.assertEqual(self.other_db.storage.reload(), merged)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from backend.fuzzyindex import SymmetricDeleteIndex
+from backend.textindex import TextIndex, get_company_fields, tokenize
+
+
+class TestTextIndex(unittest.TestCase):
+    """Testing TextIndex"""
+
+    def setUp(self):
+        self.index = TextIndex()
+        self.index.add("name", {"name": ["python", "works"], "description": ["consulting"]})
+        self.index.add("description", {"name": ["acme"], "description": ["python"] + ["filler"] * 50})
+        self.index.add("other", {"name": ["other"], "description": ["java"]})
+
+    def test_rank_by_field_weight(self):
+        """Test a match in a heavier field ranks first"""
+        self.assertEqual(self.index.rank(["description", "name", "other"], ["python"]),
+                         ["name", "description", "other"])
+
+    def test_rank_keeps_order_of_equal_scores(self):
+        """Test companies with equal scores keep their order"""
+        self.assertEqual(self.index.rank(["other", "description"], ["missing"]), ["other", "description"])
+
+    def test_rare_words_score_higher(self):
+        """Test a word found in fewer companies scores higher"""
+        self.index.add("more", {"name": ["python", "java"]})
+        self.assertGreater(self.index.score("other", ["java"]), 0)
+        self.assertGreater(self.index.score("name", ["works"]), self.index.score("name", ["python"]))
+
+    def test_reindex_and_remove(self):
+        """Test a company is reindexed and removed with its words"""
+        self.index.add("other", {"name": ["python"]})
+        self.assertGreater(self.index.score("other", ["python"]), 0)
+        self.assertNotIn("java", self.index.postings)
+        self.index.remove("other")
+        self.assertEqual(set(self.index.uuids), {"name", "description"})
+        self.assertEqual(self.index.score("other", ["python"]), 0)
+
+    def test_set_dictionary(self):
+        """Test a dictionary built apart catches up with the words indexed and removed since"""
+        words = set(self.index.postings)
+        dictionary = SymmetricDeleteIndex(words)
+        self.index.add("more", {"name": ["kubernetes"]})
+        self.index.remove("other")
+        self.index.set_dictionary(dictionary, words)
+        self.assertEqual(self.index.similar_words("kubernets"), {"kubernets", "kubernetes"})
+        self.assertEqual(self.index.similar_words("jave"), {"jave"})
+        self.assertEqual(self.index.similar_words("pyton"), {"pyton", "python"})
+
+    def test_get_company_fields(self):
+        """Test the words of a company document are grouped by weighted field"""
+        document = {
+            "name": "Acme Corp",
+            "recruiters": [{"name": "Jane Doe", "description_ref": "ref"}],
+            "roles": [{"title": "Data Engineer", "interviews": [
+                {"title": "Team", "interviewers": [{"name": "John"}]}
+            ]}],
+        }
+        fields = get_company_fields(document, {"ref": "Met at PyCon"}.get)
+        self.assertEqual(fields["name"], ["acme", "corp"])
+        self.assertEqual(fields["title"], ["data", "engineer"])
+        self.assertEqual(fields["interview"], ["team"])
+        self.assertEqual(fields["person"], ["jane", "doe", "john"])
+        self.assertEqual(fields["description"], ["met", "at", "pycon"])
+
+    def test_tokenize(self):
+        """Test tokenize returns lowercase words"""
+        self.assertEqual(tokenize("Senior C++ Engineer, Berlin"), ["senior", "c", "engineer", "berlin"])
+        self.assertEqual(tokenize(None), [])
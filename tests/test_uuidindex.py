@@ -0,0 +1,56 @@
+import unittest
+
+from backend.schema import get_child_rows
+from backend.uuidindex import IndexedChildRows, RowLocation, UuidIndex
+
+
+def make_data():
+    """Returns the raw data of a company with two roles, the first one with an interview"""
+    return {
+        "companies": {"1": {"uuid": "c1", "name": "Company"}},
+        "roles": {
+            "1": {"uuid": "r1", "title": "Engineer", "company_uuid": "c1"},
+            "2": {"uuid": "r2", "title": "Manager", "company_uuid": "c1"},
+        },
+        "interviews": {"1": {"uuid": "i1", "sequence": 1, "role_uuid": "r1"}},
+    }
+
+
+class TestUuidIndex(unittest.TestCase):
+    """Testing UuidIndex"""
+
+    def setUp(self):
+        self.data = make_data()
+        self.index = UuidIndex(self.data)
+
+    def test_child_rows_as_grouped(self):
+        """Test the indexed child rows are the rows grouped by get_child_rows"""
+        self.assertEqual(dict(IndexedChildRows(self.index, self.data)), dict(get_child_rows(self.data)))
+        self.assertTrue(self.index.is_current(self.data))
+
+    def test_add_and_remove(self):
+        """Test added rows are kept in document id order and removed rows are forgotten"""
+        self.data["roles"]["3"] = {"uuid": "r3", "title": "Lead", "company_uuid": "c1"}
+        self.index.add(RowLocation("roles", 3), self.data["roles"]["3"])
+        self.index.add(RowLocation("roles", 3), self.data["roles"]["3"])
+        removed = self.data["roles"].pop("1")
+        self.index.remove(RowLocation("roles", 1), removed)
+
+        self.assertEqual(self.index.get_children("roles", "c1"), [2, 3])
+        self.assertIsNone(self.index.get("r1"))
+        self.assertEqual(self.index.get("r3"), RowLocation("roles", 3))
+
+    def test_not_current_after_external_change(self):
+        """Test the index is not current when rows were added behind its back"""
+        self.data["roles"]["3"] = {"uuid": "r3", "title": "Lead", "company_uuid": "c1"}
+        self.assertFalse(self.index.is_current(self.data))
+
+    def test_missing_parent(self):
+        """Test a parent without children is not in the indexed child rows"""
+        child_rows = IndexedChildRows(self.index, self.data)
+        self.assertNotIn(("interviews", "r2"), child_rows)
+        self.assertEqual(child_rows.get(("interviews", "r2"), []), [])
+
+
+if __name__ == "__main__":
+    unittest.main()